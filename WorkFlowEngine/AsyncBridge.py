@@ -0,0 +1,52 @@
+import asyncio
+from .Packages import *
+
+
+class QtAsyncBridge(QObject):
+    """在Qt事件循环中驱动asyncio事件循环（类似qasync）
+
+    定时器每次触发时让asyncio事件循环运行一轮，协程在GUI线程中分段执行，
+    两轮之间Qt可以处理界面事件，长时间的工作流执行期间编辑器保持响应。
+    """
+    finished = pyqtSignal(object)  # 协程正常结束，参数为返回值
+    failed = pyqtSignal(object)  # 协程抛出异常，参数为异常对象
+
+    def __init__(self, interval=5, parent=None):
+        """
+        Args:
+            interval: 驱动asyncio事件循环的间隔（毫秒）
+        """
+        super().__init__(parent)
+        self.loop = asyncio.new_event_loop()
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self._step)
+
+    def submit(self, coro):
+        """提交协程，返回对应的asyncio.Task"""
+        task = self.loop.create_task(self._run(coro))
+        if not self.timer.isActive():
+            self.timer.start()
+        return task
+
+    def is_running(self):
+        """是否还有未完成的协程"""
+        return bool(asyncio.all_tasks(self.loop))
+
+    def _step(self):
+        """让asyncio事件循环运行一轮，处理所有已就绪的回调"""
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        if not self.is_running():
+            self.timer.stop()
+
+    async def _run(self, coro):
+        """执行协程并在任务内发出结果信号（任务结束后定时器可能已经停止）"""
+        try:
+            result = await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed.emit(e)
+        else:
+            self.finished.emit(result)
@@ -1,16 +1,40 @@
 from ..Packages import *
 from .Node.Node import Node, NodePin
+from .Node.Pin import PinEditorItem
 from .Node.ConnectionLine import ConnectionLine
+from .PinSpatialIndex import PinSpatialIndex
+from ..Engine.GraphIndex import GraphIndex
 # QGraphicsScene: Qt图形框架中的场景类，用于管理所有的图形项（QGraphicsItem）
 # 场景是一个二维空间，可以包含各种图形项，如线条、矩形、文本等
 # QGraphicsView用于显示场景的内容，提供缩放、平移等视图功能
 class CanvasScene(QGraphicsScene):
     """画布场景类 - 管理所有图形项的容器"""
+    SNAP_DISTANCE = 24  # 拖拽连接时吸附到引脚的距离（屏幕像素）
+    
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.nodes = []  # 按添加顺序存储所有节点，保存工作流时的节点索引即在该列表中的位置
         self.connections = []  # 存储所有连接线的列表
+        self.index = GraphIndex()  # 节点、引脚和连接的持久ID
+        self.pin_index = PinSpatialIndex(self)  # 引脚位置的网格索引，拖拽连接时吸附到附近的引脚
+        self.snap_pin = None  # 拖拽连接时当前吸附的输入引脚
         self.temp_connection = None  # 临时连接线（拖拽时显示）
         self.dragging_pin = None  # 当前正在拖拽的引脚
+        self.revision = 0  # 图结构版本号，节点或连接变化时递增，Run据此判断执行计划是否失效
+        self.value_revision = 0  # 引脚值版本号，输入框或类型下拉框变化时递增，优化后的执行计划据此判断是否失效
+        self.dirty_nodes = set()  # 输入值发生变化、增量执行时需要重新执行的节点
+        self.unsaved_nodes = set()  # 上次自动保存后移动过、重命名或修改过输入值的节点
+        
+        # 移动过的节点，在下一次事件循环时统一更新它们的连接线
+        self.moved_nodes = set()
+        self.connection_timer = QTimer(self)
+        self.connection_timer.setSingleShot(True)
+        self.connection_timer.setInterval(0)
+        self.connection_timer.timeout.connect(self.flush_connection_updates)
+        
+        # 大图模式（由CanvasWidget.set_large_graph_mode设置）
+        self.large_graph_mode = False
+        self.detail_visible = True  # 节点是否显示标题、引脚和控件
         
         # setBackgroundBrush: 设置场景背景颜色
         # QBrush是画刷，用于填充区域，这里用RGB(240,240,240)的浅灰色
@@ -25,10 +49,106 @@ class CanvasScene(QGraphicsScene):
         """添加节点到场景"""
         # 创建节点对象（Node是自定义的QGraphicsItem子类）
         node = Node(text, x, y)
+        self.prepare_node(node)
         # addItem: 将图形项添加到场景中，使其可见和可交互
         self.addItem(node)
+        self.nodes.append(node)
+        self.index.add_node(node)
+        self.pin_index.add_node(node)
+        self.mark_changed()
         return node
     
+    def remove_nodes(self, nodes):
+        """从场景中删除节点（连接线需要先由调用方清理）"""
+        removed = set(nodes)
+        for node in removed:
+            self.removeItem(node)
+            self.index.remove_node(node)
+            self.pin_index.remove_node(node)
+        self.nodes = [node for node in self.nodes if node not in removed]
+        self.mark_changed()
+    
+    def clear(self):
+        """清空场景中的所有图形项、节点和连接"""
+        super().clear()
+        self.nodes = []
+        self.connections = []
+        self.index.clear()
+        self.pin_index.invalidate()
+        self.dirty_nodes = set()
+        self.unsaved_nodes = set()
+        self.moved_nodes = set()
+        self.mark_changed()
+    
+    def prepare_node(self, node):
+        """按当前显示模式设置新节点（大图模式的缓存、是否显示细节）"""
+        if self.large_graph_mode:
+            node.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        if not self.detail_visible:
+            node.set_detail_visible(False)
+    
+    def add_items_bulk(self, nodes, connections, node_ids=None, connection_ids=None):
+        """批量添加已在场景外创建好的节点和连接线（导入工作流时使用）
+        
+        插入期间关闭场景索引和视图刷新，全部插入后再一次性重建BSP索引，
+        避免每添加一个图形项都更新索引和重绘。
+        节点和连接在加入场景时才登记到GraphIndex，导入中途失败不会留下场景中没有的ID。
+        
+        Args:
+            nodes: 节点列表
+            connections: 连接线列表
+            node_ids: 与nodes对应的(节点ID, 输入引脚ID列表, 输出引脚ID列表)，None表示分配新ID
+            connection_ids: 与connections对应的连接ID，None表示分配新ID
+        """
+        views = self.views()
+        for view in views:
+            view.setUpdatesEnabled(False)
+        index_method = self.itemIndexMethod()
+        self.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        try:
+            for node in nodes:
+                self.prepare_node(node)
+                self.addItem(node)
+            self.nodes.extend(nodes)
+            for node, ids in zip(nodes, node_ids or [()] * len(nodes)):
+                self.index.add_node(node, *ids)
+                self.pin_index.add_node(node)
+            for connection, connection_id in zip(connections, connection_ids or [None] * len(connections)):
+                self.index.add_connection(connection, connection_id)
+            for connection in connections:
+                connection.setVisible(self.detail_visible)
+                self.addItem(connection)
+            self.connections.extend(connections)
+        finally:
+            self.setItemIndexMethod(index_method)
+            for view in views:
+                view.setUpdatesEnabled(True)
+        self.mark_changed()
+    
+    def mark_changed(self):
+        """标记图结构已变化，使缓存的执行计划失效"""
+        self.revision += 1
+    
+    def mark_dirty(self, node):
+        """标记节点的输入值已变化，增量执行时重新执行该节点及其下游节点"""
+        self.dirty_nodes.add(node)
+        self.unsaved_nodes.add(node)
+        self.value_revision += 1
+    
+    def mark_unsaved(self, node):
+        """标记节点的保存内容（位置、名称、引脚值）已变化，自动保存时重新序列化该节点"""
+        self.unsaved_nodes.add(node)
+    
+    def take_unsaved(self):
+        """取出并清空上次自动保存后变化过的节点"""
+        nodes, self.unsaved_nodes = self.unsaved_nodes, set()
+        return nodes
+    
+    def take_dirty(self):
+        """取出并清空被标记的节点"""
+        nodes, self.dirty_nodes = self.dirty_nodes, set()
+        return nodes
+    
     def mousePressEvent(self, event):
         """鼠标按下事件 - QGraphicsScene的鼠标事件处理"""
         if event.button() == Qt.MouseButton.LeftButton:
@@ -80,15 +200,44 @@ class CanvasScene(QGraphicsScene):
         
         super().mousePressEvent(event)
     
+    def snap_target(self, start_pin, pos):
+        """查找pos处或附近可以与start_pin连接的输入引脚
+        
+        pos正好落在未连接的输入引脚上时直接返回该引脚（与之前的精确命中相同，由create_connection检查类型）；
+        否则在吸附距离内查找不属于同一节点的未连接输入引脚，优先选择数据类型相同的最近引脚。
+        吸附距离按屏幕像素计算，缩小查看时在场景中的范围相应变大
+        """
+        transform = self.views()[0].transform() if self.views() else QTransform()
+        item = self.itemAt(pos, transform)
+        if isinstance(item, NodePin) and item.pin_type == 'input' and not item.connected and item is not start_pin:
+            return item
+        
+        radius = self.SNAP_DISTANCE / transform.m11()
+        node = start_pin.parentItem()
+        data_type = start_pin.data_type
+        
+        def accept(pin):
+            return pin.pin_type == 'input' and not pin.connected and pin.parentItem() is not node
+        
+        def accept_same_type(pin):
+            return pin.data_type == data_type and accept(pin)
+        
+        target = self.pin_index.nearest(pos, radius, accept_same_type)
+        if target is None:
+            target = self.pin_index.nearest(pos, radius, accept)
+        return target
+    
     def mouseMoveEvent(self, event):
         """鼠标移动事件"""
         if self.dragging_pin and self.temp_connection:
-            # 更新临时连接线的终点
+            # 更新临时连接线的终点，附近有可连接的输入引脚时吸附到该引脚
+            self.snap_pin = self.snap_target(self.dragging_pin, event.scenePos())
+            end_pos = self.snap_pin.scenePos() if self.snap_pin is not None else event.scenePos()
             self.temp_connection.setLine(
                 self.dragging_pin.scenePos().x()+self.dragging_pin.rect().width()/2,
                 self.dragging_pin.scenePos().y(),
-                event.scenePos().x(),
-                event.scenePos().y()
+                end_pos.x(),
+                end_pos.y()
             )
         
         super().mouseMoveEvent(event)
@@ -96,12 +245,12 @@ class CanvasScene(QGraphicsScene):
     def mouseReleaseEvent(self, event):
         """鼠标释放事件"""
         if self.dragging_pin and self.temp_connection:
-            # 检查是否释放在输入引脚上
+            # 检查释放位置附近是否有可连接的输入引脚（不需要精确落在引脚上）
             self.dragging_pin.update_appearance()
-            item = self.itemAt(event.scenePos(), self.views()[0].transform())
-            if isinstance(item, NodePin) and item.pin_type == 'input' and not item.connected:
-                if item != self.dragging_pin:
-                    self.create_connection(self.dragging_pin, item)
+            item = self.snap_target(self.dragging_pin, event.scenePos())
+            if item is not None:
+                self.create_connection(self.dragging_pin, item)
+            self.snap_pin = None
             
             # 清理临时连接
             self.removeItem(self.temp_connection)
@@ -123,6 +272,7 @@ class CanvasScene(QGraphicsScene):
             connection = ConnectionLine(start_pin, end_pin, start_pin.color)
             self.addItem(connection)
             self.connections.append(connection)
+            self.index.add_connection(connection)
             
             # 添加到引脚的连接列表
             start_pin.connections.append(connection)
@@ -133,11 +283,13 @@ class CanvasScene(QGraphicsScene):
             end_pin.connected = len(end_pin.connections) > 0
             start_pin.update_appearance()
             end_pin.update_appearance()
+            self.mark_changed()
     
     def remove_connection(self, connection):
         """移除连接"""
         if connection in self.connections:
             self.connections.remove(connection)
+            self.index.remove_connection(connection)
             
             # 从引脚的连接列表中移除
             if connection in connection.start_pin.connections:
@@ -155,15 +307,82 @@ class CanvasScene(QGraphicsScene):
             
             # 从场景中移除
             self.removeItem(connection)
+            self.mark_changed()
+    
+    def schedule_connection_update(self, node):
+        """记录移动过的节点，当前事件处理完后统一更新连接线
+        
+        拖动多个选中节点时，同一次鼠标移动会触发每个节点的位置变化，
+        合并后每条连接线只更新一次，且只更新与移动节点相连的连接线
+        """
+        self.moved_nodes.add(node)
+        if not self.connection_timer.isActive():
+            self.connection_timer.start()
+    
+    def flush_connection_updates(self):
+        """立即更新移动过的节点的连接线"""
+        self.connection_timer.stop()
+        moved_nodes, self.moved_nodes = self.moved_nodes, set()
+        # 两端节点都移动时连接线只更新一次
+        connections = set()
+        for node in moved_nodes:
+            connections.update(node.connections())
+            self.pin_index.move_node(node)
+        for connection in connections:
+            connection.update_position()
+        if not self.detail_visible:
+            # 隐藏细节时连接线绘制在背景层，需要刷新背景缓存
+            self.invalidate(QRectF(), QGraphicsScene.SceneLayer.BackgroundLayer)
     
     def update_connections(self):
         """更新所有连接线位置"""
         for connection in self.connections:
             connection.update_position()
+    def set_large_graph_mode(self, enabled):
+        """大图模式下节点使用设备坐标缓存，只在内容变化时重新绘制"""
+        self.large_graph_mode = enabled
+        cache_mode = (QGraphicsItem.CacheMode.DeviceCoordinateCache if enabled
+                      else QGraphicsItem.CacheMode.NoCache)
+        for node in self.get_all_node():
+            node.setCacheMode(cache_mode)
+    
+    def set_detail_visible(self, visible):
+        """显示或隐藏所有节点的细节（标题、引脚和控件）
+        
+        隐藏细节时连接线图形项也一起隐藏，由CanvasWidget在背景层中批量绘制为细线，
+        避免逐条调用Python实现的ConnectionLine.paint
+        """
+        if visible == self.detail_visible:
+            return
+        self.detail_visible = visible
+        for node in self.get_all_node():
+            node.set_detail_visible(visible)
+        for connection in self.connections:
+            connection.setVisible(visible)
+        self.invalidate(QRectF(), QGraphicsScene.SceneLayer.BackgroundLayer)
+    
+    def materialize_editors(self, rect):
+        """为区域内的引脚占位图形项创建真正的控件"""
+        for item in self.items(rect):
+            if isinstance(item, PinEditorItem) and item.isVisible():
+                item.pin.materialize_editor()
+    
+    def show_profile(self, profiler):
+        """把性能分析结果（平均耗时等）显示在对应节点下方"""
+        self.clear_profile()
+        for item in profiler.summary():
+            node = item['node']
+            if node.scene() is self:
+                text = f"{item['avg_wall_ms']:.3f} ms"
+                if item['alloc_bytes'] is not None:
+                    text += f" | {item['alloc_bytes'] / 1024:.1f} KB"
+                node.show_timing(text)
+    
+    def clear_profile(self):
+        """清除节点上显示的性能分析结果"""
+        for node in self.get_all_node():
+            node.clear_timing()
+    
     def get_all_node(self):
-        """根据名称获取所有节点"""
-        nodes = []
-        for item in self.items():
-            if isinstance(item, Node):
-                nodes.append(item)
-        return nodes
+        """获取所有节点（按添加顺序，与Graph.get_all_node相同）"""
+        return self.nodes
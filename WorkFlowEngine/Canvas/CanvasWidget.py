@@ -45,6 +45,7 @@ class CanvasWidget(QGraphicsView):
         # 右键菜单相关变量
         self.right_click_timer = None  # 右键计时器
         self.right_click_pos = None  # 右键点击位置
+        self.context_menu = None  # 右键菜单（第一次打开时创建）
         self.is_long_press = False  # 是否为长按
         self.LONG_PRESS_THRESHOLD = 100  # 长按阈值（毫秒）
         
@@ -58,6 +59,14 @@ class CanvasWidget(QGraphicsView):
         # 网格设置
         self.grid_size = 20  # 网格大小
         self.grid_color = QColor(220, 220, 220)  # 网格颜色
+        self.grid_tile = None  # 大图模式下缓存的网格贴图
+        
+        # 大图模式：缓存背景和节点、缩小时隐藏节点细节、只更新变化区域
+        self.large_graph_mode = False
+        self.LOD_THRESHOLD = 0.5  # 大图模式下缩放比例低于该值时只显示节点矩形
+        self.MIN_SCALE = 0.5  # 最小缩放比例
+        self.LARGE_GRAPH_MIN_SCALE = 0.05  # 大图模式下的最小缩放比例
+        self.EDITOR_SCALE = 1.5  # 放大到该比例以上时为可见的引脚创建真正的输入控件
         
         # 设置接受拖拽
         self.setAcceptDrops(True)
@@ -74,10 +83,73 @@ class CanvasWidget(QGraphicsView):
             # 默认显示箭头指针
             self.setCursor(Qt.CursorShape.ArrowCursor)
     
+    def set_large_graph_mode(self, enabled):
+        """切换大图模式
+        
+        开启后：
+        1. 网格背景使用缓存的贴图平铺绘制，并开启视图背景缓存
+        2. 节点使用DeviceCoordinateCache，只在内容变化时重新绘制
+        3. 缩小到LOD_THRESHOLD以下时隐藏标题、引脚和控件，节点只绘制矩形
+        4. 视口只重绘变化项的包围矩形，而不是每次重绘整个视口
+        """
+        self.large_graph_mode = enabled
+        if enabled:
+            self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.BoundingRectViewportUpdate)
+            self.setCacheMode(QGraphicsView.CacheModeFlag.CacheBackground)
+            self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
+            # 大量连接线时抗锯齿开销很大
+            self.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        else:
+            self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+            self.setCacheMode(QGraphicsView.CacheModeFlag.CacheNone)
+            self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, False)
+            self.setRenderHint(QPainter.RenderHint.Antialiasing)
+            # 退出大图模式时恢复允许的缩放范围
+            if self.transform().m11() < self.MIN_SCALE:
+                factor = self.MIN_SCALE / self.transform().m11()
+                self.scale(factor, factor)
+        self.scene.set_large_graph_mode(enabled)
+        self.update_level_of_detail()
+        self.resetCachedContent()
+        self.viewport().update()
+    
+    def update_level_of_detail(self):
+        """根据当前缩放比例显示或隐藏节点细节"""
+        scale = self.transform().m11()
+        show_detail = not self.large_graph_mode or scale >= self.LOD_THRESHOLD
+        self.scene.set_detail_visible(show_detail)
+        if scale >= self.EDITOR_SCALE:
+            # 放大查看时可见的节点不多，直接创建真正的控件
+            self.scene.materialize_editors(self.mapToScene(self.viewport().rect()).boundingRect())
+    
+    def grid_pixmap(self):
+        """返回缓存的网格贴图（包含8x8个网格）"""
+        if self.grid_tile is None:
+            size = self.grid_size * 8
+            self.grid_tile = QPixmap(size, size)
+            self.grid_tile.fill(self.backgroundBrush().color())
+            painter = QPainter(self.grid_tile)
+            painter.setPen(QPen(self.grid_color, 1))
+            for i in range(0, size, self.grid_size):
+                painter.drawLine(i, 0, i, size)
+                painter.drawLine(0, i, size, i)
+            painter.end()
+        return self.grid_tile
+    
     def drawBackground(self, painter, rect):
         """绘制网格背景"""
         super().drawBackground(painter, rect)
         
+        if self.large_graph_mode:
+            # 平铺缓存的网格贴图，贴图原点对齐到网格，避免逐条绘制网格线
+            tile = self.grid_pixmap()
+            size = tile.width()
+            offset = QPointF(rect.left() % size, rect.top() % size)
+            painter.drawTiledPixmap(rect, tile, offset)
+            if not self.scene.detail_visible:
+                self.draw_connection_lines(painter)
+            return
+        
         # 设置网格画笔
         painter.setPen(QPen(self.grid_color, 1))
         
@@ -97,6 +169,17 @@ class CanvasWidget(QGraphicsView):
             painter.drawLine(int(rect.left()), y, int(rect.right()), y)
             y += self.grid_size
     
+    def draw_connection_lines(self, painter):
+        """缩小查看大图时，按颜色分组一次性绘制所有连接线（1像素宽的细线）"""
+        lines = {}
+        for connection in self.scene.connections:
+            lines.setdefault(connection.color.name(), []).append(connection.line())
+        for color, color_lines in lines.items():
+            pen = QPen(QColor(color), 1)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawLines(color_lines)
+    
     def keyPressEvent(self, event):
         """键盘按下事件 - 处理删除键删除选中节点"""
         if event.key() == Qt.Key.Key_Delete:
@@ -126,12 +209,13 @@ class CanvasWidget(QGraphicsView):
             # 删除所有相关连接线，先清理连接关系
             for connection in connections_to_remove:
                 connection.cleanup_connections()
+                self.scene.index.remove_connection(connection)
                 self.scene.removeItem(connection)
+            # 同时从场景的连接列表中移除，缩小查看时连接线按该列表绘制
+            self.scene.connections = [c for c in self.scene.connections if c not in connections_to_remove]
             
             # 删除选中的节点
-            for item in selected_items:
-                if isinstance(item, Node):
-                    self.scene.removeItem(item)
+            self.scene.remove_nodes([item for item in selected_items if isinstance(item, Node)])
             
             event.accept()
             return
@@ -161,9 +245,11 @@ class CanvasWidget(QGraphicsView):
         else:
             # 向下滚动，缩小视图
             # 检查当前缩放是否大于最小限制（0.5倍）
-            if current_scale > 0.5:  # 最小0.5倍
+            min_scale = self.LARGE_GRAPH_MIN_SCALE if self.large_graph_mode else self.MIN_SCALE
+            if current_scale > min_scale:  # 最小0.5倍，大图模式下可以缩得更小
                 # 缩小时使用倒数因子，实现缩小效果
                 self.scale(1.0 / zoom_factor, 1.0 / zoom_factor)
+        self.update_level_of_detail()
 
     def mousePressEvent(self, event):
         """鼠标按下事件 - QGraphicsView的鼠标事件处理"""
@@ -298,19 +384,17 @@ class CanvasWidget(QGraphicsView):
 
     def show_context_menu(self, pos):
         """显示右键菜单（短按触发）"""
-        
-        def create_new_node(name):
-            """创建新节点"""
-            if self.right_click_pos:
-                scene_pos = self.mapToScene(self.right_click_pos)
-                # 在点击位置创建新节点
-                self.scene.add_node(name, scene_pos.x(), scene_pos.y())
-        # 创建右键菜单
-        menu = RightClickMenu(self,create_new_node)
-        #menu.add_node_action.triggered.connect(lambda:create_new_node("加法节点"))
-        
+        # 菜单只在第一次打开时创建，之后重复使用
+        if self.context_menu is None:
+            self.context_menu = RightClickMenu(self, self.create_node_at_click)
         # 在指定位置显示菜单
-        menu.exec(self.mapToGlobal(pos))   
+        self.context_menu.popup_at(self.mapToGlobal(pos))
+
+    def create_node_at_click(self, name):
+        """在右键点击位置创建新节点"""
+        if self.right_click_pos:
+            scene_pos = self.mapToScene(self.right_click_pos)
+            self.scene.add_node(name, scene_pos.x(), scene_pos.y())
     
     def dragEnterEvent(self, event):
         """拖拽进入事件处理"""
@@ -9,6 +9,7 @@ class ConnectionLine(QGraphicsLineItem):
         self.start_pin = start_pin
         self.end_pin = end_pin
         self.color=color
+        self.id = None  # GraphIndex分配的持久ID
         # 设置连接线样式
         # 使用 QPen 设置连接线的颜色和宽度，此处颜色为 RGB(52, 73, 94)，宽度为 8 像素
         self.setPen(QPen(QColor(color), 8))
@@ -1,14 +1,29 @@
 from ..InfoTemplate import InfoTemplate
+from ..BatchColumn import int_columns
 class Info(InfoTemplate):
     def __init__(self):
         super().__init__("Add(int)","加(int)")
         #self.logic=False
         self.input=[["int",True],["int",True]]
         self.output=[["int",False]]
+        self.run_mode="inline"
+        self.pure=True
+        self.vectorized=True
     def run(self,arg):
         """ for i in arg: """
         int_arg=[]
         for i in arg:
             int_arg.append(int(i))
         return [sum(int_arg)]
+    def fuse_expr(self,args):
+        if not args:
+            return ["0"]
+        return ["(" + " + ".join(f"int({arg})" for arg in args) + ")"]
+    def run_batch(self,args,size):
+        import numpy as np
+        # 可能超出int64时使用Python整数求和，结果与run相同
+        total=0
+        for column in int_columns(args,np):
+            total=total+column
+        return [total]
         
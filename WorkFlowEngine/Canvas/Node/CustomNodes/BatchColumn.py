@@ -0,0 +1,102 @@
+"""批量执行（BatchRun）使用的列数据工具
+
+一列数据是numpy数组（每行一个值），所有行相同的值直接用标量表示。
+节点的run_batch返回的结果与逐行调用run相同：数值放在数值数组中，
+字符串和超出int64范围的整数保留为Python对象（object数组）。
+需要numpy，只在批量执行时导入。
+"""
+INT64_MAX = 2 ** 63 - 1
+
+
+def is_column(value, np):
+    """是否为一列数据（而不是所有行相同的标量）"""
+    return isinstance(value, np.ndarray) and value.ndim > 0
+
+
+def to_column(values, np):
+    """把逐行得到的值转换为一列：全部为数字时使用数值数组，否则使用object数组"""
+    types = set(map(type, values))
+    if types and types <= {int, float, bool}:
+        try:
+            return np.array(values)
+        except OverflowError:
+            # 超出int64范围的整数保留为Python对象
+            pass
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def run_rows(run, args, size, np):
+    """逐行调用run，返回每个输出的一列结果（不支持向量化的节点使用）
+
+    Args:
+        run: 节点的run（或带输出缓存的MemoRun）
+        args: 每个输入一列数据或标量
+        size: 行数
+    """
+    # 先转换为Python列表，节点得到的是int/str等普通值而不是numpy标量
+    args = [(column.tolist(), True) if is_column(column, np) else (column, False) for column in args]
+    results = []
+    for row in range(size):
+        results.append(run([column[row] if column_of_rows else column for column, column_of_rows in args]))
+    output_count = max((len(_output) for _output in results), default=0)
+    # 输出比其他行少的行（如停止时返回[False]）用None补齐
+    return [to_column([_output[i] if i < len(_output) else None for _output in results], np)
+            for i in range(output_count)]
+
+
+def _int_or_values(value, np):
+    """转换为整数：整数/布尔数组转换为int64数组，其余按int()逐个转换为Python整数（与逐行执行相同）"""
+    value = np.asarray(value) if not isinstance(value, (int, str, float)) else value
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in "bi" or (value.dtype.kind == "u" and value.dtype.itemsize < 8):
+            return value.astype(np.int64)
+        if value.ndim == 0:
+            return int(value.item())
+        return [int(item) for item in value.tolist()]
+    return int(value)
+
+
+def _magnitude(value):
+    """整数列中绝对值的最大值"""
+    if isinstance(value, int):
+        return abs(value)
+    if isinstance(value, list):
+        return max((abs(item) for item in value), default=0)
+    if value.size == 0:
+        return 0
+    return max(abs(int(value.max())), abs(int(value.min())))
+
+
+def int_columns(args, np):
+    """把多列输入转换为整数列，求和的结果与逐行执行的Python整数相同
+
+    所有列的绝对值之和不超过int64时每一列都是int64数组（或Python整数），
+    否则每一列都是Python整数的object数组，求和时不会溢出。
+    """
+    columns = [_int_or_values(value, np) for value in args]
+    if sum(_magnitude(column) for column in columns) <= INT64_MAX:
+        return [np.array(column, dtype=np.int64) if isinstance(column, list) else column for column in columns]
+    return [column if isinstance(column, int) else to_object(column, np) for column in columns]
+
+
+def int_column(value, np):
+    """把一列输入转换为整数列（与逐行执行的int()相同）"""
+    return int_columns([value], np)[0]
+
+
+def to_object(values, np):
+    """转换为Python对象的object数组（numpy标量转换为int/float/str等）"""
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def str_column(value, np):
+    """与逐行执行的str()相同的字符串列（Python str的object数组），标量返回str"""
+    if not is_column(value, np):
+        return str(value.item() if isinstance(value, np.ndarray) else value)
+    return to_object([str(item) for item in value.tolist()], np)
@@ -1,9 +1,16 @@
 from ..InfoTemplate import InfoTemplate
+from ..BatchColumn import int_column, is_column, str_column
 class Info(InfoTemplate):
     def __init__(self):
         super().__init__("TypeChange","类型转换")
         self.input=[["logic",False],["none",True]]
         self.output=[["logic",False],["none",True]]
+        self.run_mode="inline"
+        self.pure=True
+        self.vectorized=True
+    def memo_key(self,arg):
+        # 输出类型由下拉框决定，也要作为缓存键的一部分
+        return (self.output[1][0],super().memo_key(arg))
     def run(self,arg):
         """
         类型转换
@@ -14,4 +21,16 @@ class Info(InfoTemplate):
             return [True,type_dict[self.output[1][0]](arg[1])]
         return [False,None]
             #return [True,arg[1]]
+    def run_batch(self,args,size):
+        import numpy as np
+        convert={"int":int_column,"str":str_column}[self.output[1][0]]
+        # 逻辑输入为False的行输出False，由BatchRun停止这些行；与run相同，这些行不做类型转换
+        logic=np.asarray(args[0],dtype=object)!=False
+        value=args[1]
+        if logic.all() or not is_column(value,np):
+            return [logic,convert(value,np) if logic.any() else None]
+        converted=np.full(size,None,dtype=object)
+        rows=np.flatnonzero(logic)
+        converted[rows]=list(convert(value[rows],np))
+        return [logic,converted]
         
\ No newline at end of file
@@ -0,0 +1,57 @@
+class ImageValue:
+    """img引脚传递的图片值
+
+    直接包装截图得到的BGRA缓冲区（如mss的ScreenShot.raw），整个传递过程不拷贝像素：
+        array    - 按需创建的 (高, 宽, 4) BGRA numpy视图，与缓冲区共享内存
+        bgr      - 去掉alpha通道的视图，可直接交给cv2等库
+        to_pixmap - 只有在需要显示时才转换为QPixmap，结果会缓存
+    """
+    def __init__(self, buffer, width, height, channels=4):
+        self.buffer = buffer  # bytearray / memoryview 等支持缓冲区协议的对象
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self._array = None
+        self._pixmap = None
+
+    @classmethod
+    def from_mss(cls, shot):
+        """包装mss的截图结果（不拷贝）"""
+        return cls(shot.raw, shot.width, shot.height)
+
+    @property
+    def array(self):
+        """BGRA numpy视图"""
+        if self._array is None:
+            import numpy as np
+            self._array = np.frombuffer(self.buffer, dtype=np.uint8).reshape(self.height, self.width, self.channels)
+        return self._array
+
+    @property
+    def bgr(self):
+        """BGR视图（不拷贝，非连续内存）"""
+        return self.array[:, :, :3]
+
+    @property
+    def shape(self):
+        return (self.height, self.width, self.channels)
+
+    def __array__(self, dtype=None, copy=None):
+        """支持 np.asarray(img)，返回共享内存的视图"""
+        if dtype is None:
+            return self.array
+        return self.array.astype(dtype)
+
+    def to_qimage(self):
+        """转换为QImage，QImage直接引用缓冲区，需要在ImageValue存活期间使用"""
+        from PyQt6.QtGui import QImage
+        bytes_per_line = self.width * self.channels
+        # BGRA在小端内存中的排列即为Format_RGB32（alpha通道被忽略）
+        return QImage(self.array.data, self.width, self.height, bytes_per_line, QImage.Format.Format_RGB32)
+
+    def to_pixmap(self):
+        """转换为QPixmap（按需转换并缓存）"""
+        if self._pixmap is None:
+            from PyQt6.QtGui import QPixmap
+            self._pixmap = QPixmap.fromImage(self.to_qimage())
+        return self._pixmap
@@ -7,9 +7,18 @@ class InfoTemplate:
         self.zh_name=zh_name
         self.input=[]
         self.output=[]
+        # 执行方式提示，并行执行时决定节点的调度位置：
+        # 'io' - I/O密集，放入线程池；'cpu' - CPU密集，配置了进程池时放入进程池；
+        # 'gui' - 必须在GUI线程（调用Run的线程）执行；'inline' - 计算量很小，在调用线程直接执行，
+        # 放入线程池/进程池的调度和pickle开销比计算本身更大
+        self.run_mode="io"
+        # 纯节点：输出只由输入决定且没有副作用，输入相同时直接使用缓存的输出
+        self.pure=False
+        # 向量化节点：批量执行时由run_batch一次处理整批输入，否则BatchRun逐行调用run
+        self.vectorized=False
     def run(self):
         f"""
-        节点运行
+        节点运行，也可以在子类中定义为 async def run，由AsyncRun并发等待
         Args:
             input:[pin:value]
         Returns:
@@ -17,6 +26,36 @@ class InfoTemplate:
         """
 
         return []
+    def run_batch(self,args,size):
+        """
+        批量运行，默认逐行调用run；vectorized为True的节点在子类中实现整列处理
+        Args:
+            args:[每个输入一列numpy数组，或所有行相同的标量]
+            size:批量的行数
+        Returns:
+            每个输出一列numpy数组（或所有行相同的标量），第一个输出为False的行停止执行
+        """
+        import numpy as np
+        from .BatchColumn import run_rows
+        return run_rows(self.run,args,size,np)
+    def fuse_expr(self,args):
+        """
+        算子融合：返回计算每个输出的Python表达式，相邻的可融合纯节点会被合并为一个生成的函数执行
+        Args:
+            args:[每个输入对应的表达式（变量名）]
+        Returns:
+            [每个输出的表达式]，不支持融合时返回None
+        """
+        return None
+    def memo_key(self,arg):
+        """
+        纯节点输出缓存的键，输出还依赖输入以外的配置时在子类中重写
+        Args:
+            input:[pin:value]
+        Returns:
+            可哈希的键（带上类型，避免1、1.0、True被当作同一个输入）
+        """
+        return tuple((type(value),value) for value in arg)
     def logic_check(self,arg):
         if arg[0] != False:
             return True
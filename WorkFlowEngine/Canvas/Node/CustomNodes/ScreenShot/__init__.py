@@ -1,29 +1,35 @@
 from ..InfoTemplate import InfoTemplate
-import cv2
+from ..ImageValue import ImageValue
 import mss
-import numpy as np
-from .....Packages import *
 
 class Info(InfoTemplate):
-    def __init__(self):
+    def __init__(self, region=None, monitor=0):
         super().__init__("ScreenShot","屏幕截图")
         self.input=[["logic",False]]
         self.output=[["logic",False],["img",True]]
+        self.run_mode="gui"  # 复用的mss实例只能在创建它的线程中使用
+        self.region=region  # 截图区域 (left, top, width, height)，None时截取整个显示器
+        self.monitor=monitor  # 显示器编号，0为所有显示器组成的整个桌面
+        self.img=None
+        self._sct=None  # 复用mss实例，避免每帧重新建立截图连接
     def run(self,arg):
-        with mss.mss() as sct:
-            monitor = sct.monitors[0]  # 获取主显示器
-            self.img = sct.grab(monitor)    # 捕获整个屏幕
-            self.img = np.array(self.img)        # 将截图转换为numpy数组
-            #cv2.imshow("1",img)
-            #cv2.waitKey(1)
-            self.set_img()
-            return [True,self.img]
+        if self._sct is None:
+            self._sct = mss.mss()
+        # 截图结果直接包装为ImageValue，不拷贝为numpy数组，也不在这里转换为QPixmap
+        self.img = ImageValue.from_mss(self._sct.grab(self.capture_area()))
+        return [True,self.img]
+    def capture_area(self):
+        """返回截图区域"""
+        if self.region is not None:
+            left, top, width, height = self.region
+            return {"left": left, "top": top, "width": width, "height": height}
+        return self._sct.monitors[self.monitor]
     def set_img(self):
-        """设置原始图片"""
-        # 彩色图片转换
-        # 将numpy数组转换为QPixmap
-        height, width, channel = self.img.shape
-        bytes_per_line = width * channel
-        q_img = QImage(self.img.data, width, height, bytes_per_line, QImage.Format.Format_BGR888)
-        self.original_pixmap = QPixmap.fromImage(q_img)
-        return self.original_pixmap
\ No newline at end of file
+        """设置原始图片（按需转换为QPixmap）"""
+        self.original_pixmap = self.img.to_pixmap()
+        return self.original_pixmap
+    def __getstate__(self):
+        # mss实例不能跨进程传递
+        state = self.__dict__.copy()
+        state["_sct"] = None
+        return state
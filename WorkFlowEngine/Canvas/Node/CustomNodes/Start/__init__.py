@@ -4,6 +4,9 @@ class Info(InfoTemplate):
         super().__init__("Start","开始")
         self.input=[]
         self.output=[["logic",False]]
+        self.vectorized=True
     def run(self,arg):
         return [True]
+    def run_batch(self,args,size):
+        return [True]
 
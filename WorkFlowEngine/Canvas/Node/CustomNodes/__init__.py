@@ -1,5 +1,10 @@
 import os
+import sys
+import json
+import hashlib
+import tempfile
 import importlib
+from collections.abc import Mapping
 
 def search(lib:dict,key):
     for k in lib:
@@ -7,24 +12,142 @@ def search(lib:dict,key):
             return lib[k]
     return None
 
+def _cache_dir():
+    """用户缓存目录，节点清单不写入（可能只读的）安装目录"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "WorkFlowEngine")
+
+
+_PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
+# 节点清单缓存：保存每个节点包的元数据，启动时不需要导入节点模块（及其依赖的mss、numpy等）
+# 文件名带上安装路径的哈希，多份安装互不影响
+MANIFEST_PATH = os.path.join(
+    _cache_dir(), f"node_manifest_{hashlib.sha1(_PACKAGE_PATH.encode('utf-8')).hexdigest()[:12]}.json")
+# 清单中缓存的NodeInfo属性，修改后已有的清单自动失效
+META_FIELDS = ("node_name", "zh_name", "input", "output", "run_mode", "pure", "vectorized")
+
+
+def _signature(path):
+    """节点包中所有.py文件的修改时间和大小，任一文件变化时清单中的元数据失效"""
+    signature = []
+    for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+        if entry.name.endswith(".py"):
+            stat = entry.stat()
+            signature.append([entry.name, stat.st_mtime_ns, stat.st_size])
+    return signature
+
+
+class NodeRegistry(Mapping):
+    """节点注册表 - 节点名称(node_name) -> 节点模块，首次访问某个节点时才导入其模块
+
+    节点名称、中文名和引脚配置等元数据来自用户缓存目录中的清单文件（MANIFEST_PATH），
+    清单缺失或节点包的文件有变化时导入该节点包读取元数据并更新清单：
+        node_dict["Start"].Info()      # 导入Start模块并创建NodeInfo
+        node_dict.meta("Start")        # 只读取元数据，不导入模块
+    """
+    def __init__(self, package, path):
+        self.package = package
+        self.path = path
+        self.folders = {}  # 节点名称 -> 节点包文件夹名
+        self.metadata = {}  # 节点名称 -> 元数据字典
+        self.modules = {}  # 节点名称 -> 已导入的模块
+        self.discover()
+
+    def discover(self):
+        """扫描CustomNodes文件夹，按清单注册所有节点"""
+        manifest = self._load_manifest()
+        # InfoTemplate等公共文件或缓存的属性列表变化时，所有节点的元数据都需要重新读取
+        template_signature = {"fields": list(META_FIELDS), "files": _signature(self.path)}
+        if manifest.get("template") != template_signature:
+            manifest = {}
+        cached = manifest.get("nodes", {})
+        nodes = {}
+        # 遍历 CustomNodes 文件夹中的所有子文件夹
+        for item in sorted(os.listdir(self.path)):
+            item_path = os.path.join(self.path, item)
+            # 检查子文件夹中是否有 __init__.py 文件
+            if not os.path.exists(os.path.join(item_path, "__init__.py")):
+                continue
+            signature = _signature(item_path)
+            entry = cached.get(item)
+            if entry is None or entry["signature"] != signature:
+                entry = {"signature": signature, "meta": self._read_meta(item)}
+            nodes[item] = entry
+            meta = entry["meta"]
+            self.folders[meta["node_name"]] = item
+            self.metadata[meta["node_name"]] = meta
+        if nodes != cached or manifest.get("template") != template_signature:
+            self._save_manifest({"template": template_signature, "nodes": nodes})
+
+    def _read_meta(self, folder):
+        """导入节点包，读取需要缓存的元数据"""
+        module = importlib.import_module(f".{folder}", package=self.package)
+        info = module.Info()
+        self.modules[info.node_name] = module
+        return {field: getattr(info, field, None) for field in META_FIELDS}
+
+    def _load_manifest(self):
+        try:
+            with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest):
+        """先写临时文件再替换：多个进程（如作业服务的工作进程）同时启动时，读到的总是完整的清单"""
+        temp_path = None
+        try:
+            folder = os.path.dirname(MANIFEST_PATH)
+            os.makedirs(folder, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".node_manifest_", suffix=".tmp", dir=folder)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, MANIFEST_PATH)
+        except OSError:
+            # 缓存目录不可写时每次启动都重新读取元数据，不影响使用
+            if temp_path is not None and os.path.exists(temp_path):
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+
+    def meta(self, node_name):
+        """节点元数据（META_FIELDS中的属性），不导入节点模块"""
+        return self.metadata[node_name]
+
+    def is_loaded(self, node_name):
+        """节点模块是否已经导入"""
+        return node_name in self.modules
+
+    def __getitem__(self, node_name):
+        module = self.modules.get(node_name)
+        if module is None:
+            folder = self.folders[node_name]
+            module = importlib.import_module(f".{folder}", package=self.package)
+            self.modules[node_name] = module
+        return module
+
+    def __iter__(self):
+        return iter(self.folders)
+
+    def __len__(self):
+        return len(self.folders)
+
+    def __contains__(self, node_name):
+        return node_name in self.folders
+
+
 def get_all_node_names():
     """获取 CustomNodes 文件夹中的所有节点名称"""
-    node_names = []
-    custom_nodes_path = os.path.dirname(os.path.abspath(__file__))
-    
-    # 遍历 CustomNodes 文件夹中的所有子文件夹
-    for item in os.listdir(custom_nodes_path):
-        item_path = os.path.join(custom_nodes_path, item)
-        if os.path.isdir(item_path):
-            # 检查子文件夹中是否有 Node.py 文件
-            node_file_path = os.path.join(item_path, "__init__.py")
-            if os.path.exists(node_file_path):
-                globals()[item] = importlib.import_module(f".{item}", package=__name__)
-                node_dict[globals()[item].Info().node_name]=globals()[item]
-    return node_names
-node_dict={}
-
-
-node_names=get_all_node_names()
+    return list(node_dict)
+
+
+node_dict = NodeRegistry(__name__, os.path.dirname(os.path.abspath(__file__)))
+node_names = get_all_node_names()
 """ {"Start":Module}
 print(node_dict["Start"].Info().node_name) """
@@ -5,6 +5,7 @@ class NodeBase(QGraphicsRectItem):
     def __init__(self, name, x=0, y=0, parent=None,input_nums=1,output_nums=1):
         super().__init__(parent)
         self.name = name  
+        self.id = None  # GraphIndex分配的持久ID
         self.input_pins = []
         self.output_pins = []
         self.input_nums=input_nums
@@ -15,26 +16,45 @@ class NodeBase(QGraphicsRectItem):
         self.setBrush(QBrush(QColor(255, 255, 255)))
         self.setPen(QPen(QColor(200, 200, 200), 3))
         self.setRect(0, 0, 10, max(input_nums,output_nums)*40)
+        self.timing_text = None  # 性能分析时显示在节点下方的耗时
         # 设置节点可移动和可选择
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, True)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, True)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges, True)
         # 创建节点文本
-        self.title = QGraphicsTextItem(name, self)
-        self.title.setDefaultTextColor(QColor(0, 0, 0))
-        self.title.setFont(QFont("Arial", 15))
-        # 获取节点文本项的边界矩形，该矩形定义了文本项在局部坐标系中的范围
-        text_rect = self.title.boundingRect()
-        self.title.setPos(
-            (self.rect().width() - text_rect.width()) /2,
-            (-text_rect.height())/3*2
-        )
+        self.title = create_text_item(name, self)
+        self.re_position_title()
     def rename(self,name):
         self.name=name
-        self.title.setPlainText(name)
+        self.title.setText(name)
+        # 名称也会保存到文件中，自动保存时需要重新序列化
+        if self.scene():
+            self.scene().mark_unsaved(self)
+    def set_detail_visible(self, visible):
+        """显示或隐藏节点细节，缩小查看大图时只绘制节点矩形"""
+        self.title.setVisible(visible)
+        for pin in self.input_pins + self.output_pins:
+            # 隐藏引脚会同时隐藏其中的文字和输入控件，连接线仍按引脚位置绘制
+            pin.setVisible(visible)
+        if self.timing_text is not None:
+            self.timing_text.setVisible(visible)
+    def show_timing(self, text):
+        """在节点下方显示性能分析结果"""
+        if self.timing_text is None:
+            self.timing_text = QGraphicsSimpleTextItem(self)
+            self.timing_text.setBrush(QBrush(QColor(200, 60, 0)))
+            self.timing_text.setFont(QFont("Arial", 10))
+        self.timing_text.setText(text)
+        self.timing_text.setPos(0, self.rect().height() + 4)
+        self.timing_text.show()
+    def clear_timing(self):
+        """隐藏性能分析结果"""
+        if self.timing_text is not None:
+            self.timing_text.hide()
     def re_position_title(self):
-        text_rect = self.title.boundingRect()
-        self.title.setPos(
+        # 获取节点文本项的边界矩形，该矩形定义了文本项在局部坐标系中的范围
+        text_rect = text_item_rect(self.title)
+        place_text_item(self.title,
             (self.rect().width() - text_rect.width()) /2,
             (-text_rect.height())/3*2
         )
@@ -67,8 +87,9 @@ class Node(NodeBase):
         max_length = max((pin.length for pin in pins_list), default=0)
         if max_length > 0:
             self.setRect(0, 0, self.rect().width() + max_length, self.rect().height())
-        if self.title.boundingRect().width()>self.rect().width() and pin_type=='output':
-            self.setRect(0, 0, self.title.boundingRect().width(), self.rect().height())
+        title_width = text_item_rect(self.title).width()
+        if title_width>self.rect().width() and pin_type=='output':
+            self.setRect(0, 0, title_width, self.rect().height())
         # 设置引脚位置
         for i, pin in enumerate(pins_list):
             if pin_type == 'input':
@@ -91,11 +112,12 @@ class Node(NodeBase):
         self.re_position_title()
     def itemChange(self, change, value):
         """节点状态变化时处理"""
-        #位置变化
-        if change == QGraphicsItem.GraphicsItemChange.ItemPositionChange:
-            # 通知场景更新连接线
+        #位置变化（位置已生效后再更新连接线）
+        if change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged:
+            # 通知场景更新本节点的连接线，同一帧内移动的多个节点合并为一次更新
             if self.scene():
-                self.scene().update_connections()
+                self.scene().schedule_connection_update(self)
+                self.scene().mark_unsaved(self)
         #选中变化
         elif change == QGraphicsItem.GraphicsItemChange.ItemSelectedHasChanged:
             # 节点选中状态变化时更新边框颜色
@@ -108,6 +130,12 @@ class Node(NodeBase):
         
         
         return super().itemChange(change, value)
+    def connections(self):
+        """与本节点相连的所有连接线"""
+        for pin in self.input_pins:
+            yield from pin.connections
+        for pin in self.output_pins:
+            yield from pin.connections
     def run(self):
         """节点运行"""
         print(self.name)
\ No newline at end of file
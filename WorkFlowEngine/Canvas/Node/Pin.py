@@ -2,6 +2,32 @@ from PyQt6.QtWidgets import QLabel
 from ...Packages import *
 from .CustomNodes.pin_colors import pin_colors
 
+# 节点和引脚的文字使用QGraphicsSimpleTextItem，不像QGraphicsTextItem那样为每个文字创建QTextDocument，
+# 加载大型工作流时创建速度快很多；TEXT_MARGIN模拟QGraphicsTextItem的文档边距，保持原来的布局
+TEXT_MARGIN = 4
+_text_style = []  # 共享的字体和画刷，第一次创建文字项时初始化（需要先创建QApplication）
+
+
+def create_text_item(text, parent):
+    """创建黑色Arial 15号文字项"""
+    if not _text_style:
+        _text_style.extend((QFont("Arial", 15), QBrush(QColor(0, 0, 0))))
+    item = QGraphicsSimpleTextItem(text, parent)
+    item.setFont(_text_style[0])
+    item.setBrush(_text_style[1])
+    return item
+
+
+def text_item_rect(item):
+    """文字项包含边距的矩形（与QGraphicsTextItem.boundingRect相同）"""
+    return item.boundingRect().adjusted(0, 0, TEXT_MARGIN * 2, TEXT_MARGIN * 2)
+
+
+def place_text_item(item, x, y):
+    """按包含边距的矩形左上角放置文字项"""
+    item.setPos(x + TEXT_MARGIN, y + TEXT_MARGIN)
+
+
 class BaseItem(QGraphicsEllipseItem):
     def __init__(self, pin_type, data_type, parent=None):
         super().__init__(parent)
@@ -15,32 +41,37 @@ class BaseItem(QGraphicsEllipseItem):
         # 设置引脚的矩形区域，前两个参数 (-6, -6) 表示矩形左上角的坐标，
         # 后两个参数 (12, 12) 分别表示矩形的宽度和高度，以此创建一个边长为 12 的正方形引脚。
         self.setAcceptHoverEvents(True)
-        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, False)
-        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, False)
+        # QGraphicsItem默认既不可移动也不可选择，不需要再调用setFlag（每个节点有多个引脚，加载大图时可省下不少调用）
 class NodePin(BaseItem):
-    """引脚类"""
+    """引脚类
+
+    引脚控件的值保存在引脚自身（value / data_type），WorkflowIO和Run只读写这些值；
+    控件先以PinEditorItem绘制外观，鼠标悬停、点击或放大查看时才创建真正的QWidget。
+    """
     def __init__(self, pin_type, data_type, parent,i):
         super().__init__(pin_type, data_type, parent)
+        self.index = i  # 在节点输入/输出引脚列表中的位置，保存连接时直接使用
+        self.id = None  # GraphIndex分配的持久ID
         # 设置引脚颜色
         self.color=pin_colors[self.data_type]
         self.pin_shape()
-        self.line_edit = None  # 初始化line_edit为None
-        self.combo_box = None  # 初始化combo_box为None
+        self.line_edit = None  # 已创建的输入框控件
+        self.combo_box = None  # 已创建的类型下拉框控件
+        self.pic_label = None  # 已创建的图片预览控件
+        self.editor = None  # 引脚控件类型：'line_edit' / 'combo_box' / 'img' / None
+        self.editor_item = None  # 控件创建前的占位图形项
+        self.value = ""  # 输入框中的字面值；图片引脚为最近一次显示的图片
         NodeInfo=self.parent.NodeInfo
         self.pin_info=getattr(NodeInfo,pin_type)[i]
-        if self.pin_info[0]=="none":
-            # 创建NodeText和PinComboBox
-            node_text = NodeText(self.pin_type, self.data_type, self, self.pin_info)
-            self.combo_box = node_text.combo_box
-            # 连接PinComboBox的选择改变信号到更新引脚颜色的函数
-            if self.combo_box:
-                self.combo_box.selection_changed.connect(self._update_pin_color)
-                # 在combo_box创建完成后立即更新引脚颜色
-                self._update_pin_color(self.combo_box.currentText())
-        else:
-            # 创建NodeText和PinLineEdit
-            node_text = NodeText(self.pin_type, self.data_type, self, self.pin_info)
-            self.line_edit = node_text.line_edit
+        self.node_text = NodeText(self.pin_type, self.data_type, self, self.pin_info)
+        self.editor_item = self.node_text.editor_item
+        if self.editor_item is not None:
+            self.editor = self.editor_item.widget_type
+        if self.editor == 'img':
+            self.value = None
+        if self.editor == 'combo_box':
+            # 与PinTypeComboBox一样默认选中第一项
+            self._update_pin_color(PIN_TYPES[0])
         
         self.update_appearance()
     def update_appearance(self):
@@ -53,12 +84,95 @@ class NodePin(BaseItem):
         if self.combo_box:
             #self.combo_box.hide() if has_connection else self.combo_box.show()
             self.combo_box.setEnabled(not self.connected)
+        if self.editor_item is not None:
+            # 已连接的输入框不显示，下拉框的占位项按禁用状态绘制
+            self.editor_item.setVisible(not (self.editor == 'line_edit' and self.connected))
+            self.editor_item.update()
         
         # 更新引脚外观
         brush = QBrush(self.color) if self.connected else QBrush(Qt.GlobalColor.transparent)
         self.setBrush(brush)
         self.setPen(QPen(self.color, 2))
-    
+
+    def uses_link(self):
+        """输入引脚是否从连接读取数据（已连接，或为类型下拉框引脚）"""
+        return self.connected or self.editor == 'combo_box'
+
+    def show_value(self, value):
+        """在引脚控件上显示运行结果（目前用于图片预览）"""
+        if self.editor == 'img' and value is not None:
+            self.value = value
+            self.materialize_editor()
+            self.pic_label.set_pic(value)
+
+    def literal(self):
+        """返回引脚输入框中的字面值，没有输入框时返回None"""
+        if self.editor == 'line_edit':
+            return self.value
+        return None
+
+    def set_value(self, value):
+        """设置输入框的字面值（不需要创建控件）"""
+        if value == self.value:
+            return
+        self.value = value
+        if self.line_edit is not None and self.line_edit.text() != value:
+            self.line_edit.setText(value)
+        if self.editor_item is not None:
+            self.editor_item.update()
+        self._mark_dirty()
+
+    def set_data_type(self, data_type):
+        """设置类型下拉框选择的数据类型（不需要创建控件）"""
+        if data_type not in PIN_TYPES or data_type == self.data_type:
+            return
+        if self.combo_box is not None:
+            # 由下拉框的信号更新引脚
+            self.combo_box.setCurrentIndex(PIN_TYPES.index(data_type))
+            return
+        self._update_pin_color(data_type)
+        self._mark_dirty()
+
+    def materialize_editor(self, activate=False):
+        """创建真正的引脚控件，替换占位图形项
+
+        Args:
+            activate: 是否让控件获得焦点（点击占位项时）
+        """
+        if self.editor is None:
+            return None
+        widget = getattr(self, WIDGET_ATTRS[self.editor])
+        if widget is None:
+            proxy_widget, widget = PinWidgetFactory.create_widget(self.editor, self.pin_type, self.node_text.text_rect)
+            proxy_widget.setParentItem(self.node_text)
+            setattr(self, WIDGET_ATTRS[self.editor], widget)
+            if self.editor == 'line_edit':
+                widget.setText(self.value)
+                widget.textChanged.connect(self.set_value)
+            elif self.editor == 'combo_box':
+                widget.setCurrentIndex(PIN_TYPES.index(self.data_type))
+                widget.selection_changed.connect(self._update_pin_color)
+                widget.selection_changed.connect(self._mark_dirty)
+            # 移除占位图形项
+            if self.editor_item.scene() is not None:
+                self.editor_item.scene().removeItem(self.editor_item)
+            else:
+                self.editor_item.setParentItem(None)
+            self.editor_item = None
+            self.update_appearance()
+        if activate:
+            if self.editor == 'line_edit':
+                widget.setFocus()
+            elif self.editor == 'combo_box' and widget.isEnabled():
+                widget.showPopup()
+        return widget
+
+    def _mark_dirty(self, *args):
+        """输入框或类型下拉框修改后，通知场景该节点需要重新执行"""
+        scene = self.scene()
+        if scene is not None:
+            scene.mark_dirty(self.parentItem())
+
     def hoverEnterEvent(self, event):
         """鼠标悬停事件"""
         self.setToolTip(f"{self.pin_type}: {self.data_type}")
@@ -82,8 +196,7 @@ class NodeText(BaseItem):
     def __init__(self, pin_type, data_type, parent,pin_info):
         super().__init__(pin_type, data_type, parent)
         self.text=data_type
-        self.line_edit=None
-        self.combo_box=None
+        self.editor_item=None
         self.pin_text()
         if pin_info[1]:
             if pin_info[0]=="none":
@@ -96,40 +209,95 @@ class NodeText(BaseItem):
         """将文本放入引脚"""
         if self.text=="logic" or self.text=="none":
             self.text=""
-        self.text_item = QGraphicsTextItem(self.text, self)
-        self.text_item.setDefaultTextColor(QColor(0, 0, 0))
-        self.text_item.setFont(QFont("Arial", 15))
+        self.text_item = create_text_item(self.text, self)
         # 获取节点文本项的边界矩形，该矩形定义了文本项在局部坐标系中的范围
-        self.text_rect = self.text_item.boundingRect()
+        self.text_rect = text_item_rect(self.text_item)
         if self.pin_type == 'input':
-            self.text_item.setPos(
+            place_text_item(self.text_item,
                 0,
                 (-self.text_rect.height()) /2,
             )
         else:
-            self.text_item.setPos(
+            place_text_item(self.text_item,
                 (-self.text_rect.width()),
                 (-self.text_rect.height()) /2,
             )
         self.parent.length+=self.text_rect.width()
     
     def create_pin_widget(self, widget_type):
-        """创建引脚控件（动态合并pin_line_edit和pin_combo_box功能）
+        """为引脚控件创建占位图形项，真正的控件由NodePin.materialize_editor按需创建
         
         Args:
-            widget_type: 控件类型 ('line_edit' 或 'combo_box')
+            widget_type: 控件类型 ('line_edit' / 'combo_box' / 'img')
         """
-        # 使用工厂类创建控件
-        proxy_widget, widget = PinWidgetFactory.create_widget(widget_type, self.pin_type, self.text_rect)
-        
-        # 使用动态变量设置引用
-        setattr(self, widget_type, widget)
-        
-        # 将代理组件添加到当前项
-        proxy_widget.setParentItem(self)
-        self.parent.length += widget.width()
+        size = PinWidgetFactory.widget_size(widget_type)
+        self.editor_item = PinEditorItem(self.parent, widget_type, size, self)
+        self.editor_item.setPos(PinWidgetFactory.widget_pos(self.pin_type, self.text_rect, size))
+        self.parent.length += size.width()
+
+
+# 类型下拉框的选项
+PIN_TYPES = ["int", "str", "bool", "float"]
+# 控件类型对应的NodePin属性
+WIDGET_ATTRS = {'line_edit': 'line_edit', 'combo_box': 'combo_box', 'img': 'pic_label'}
+
+
+class PinEditorItem(QGraphicsItem):
+    """引脚控件的占位图形项
+
+    只绘制控件的外观（边框、文字、下拉箭头），不创建QWidget和QGraphicsProxyWidget；
+    鼠标悬停或点击时由引脚创建真正的控件并替换自己。
+    """
+    def __init__(self, pin, widget_type, size, parent=None):
+        super().__init__(parent)
+        self.pin = pin
+        self.widget_type = widget_type
+        self.rect = QRectF(0, 0, size.width(), size.height())
+        self.setAcceptHoverEvents(True)
+
+    def boundingRect(self):
+        return self.rect
+
+    def paint(self, painter, option, widget=None):
+        if self.widget_type == 'img':
+            # 图片引脚在显示图片时才创建控件，之前没有可绘制的内容
+            return
+        enabled = not self.pin.connected
+        painter.setPen(QPen(QColor(200, 200, 200), 2))
+        painter.setBrush(QBrush(QColor(255, 255, 255)))
+        painter.drawRect(self.rect.adjusted(1, 1, -1, -1))
+        text_rect = self.rect.adjusted(4, 0, -4, 0)
+        if self.widget_type == 'line_edit':
+            text = self.pin.value
+            if not text:
+                text = "输入"
+                painter.setPen(QColor(160, 160, 160))
+            else:
+                painter.setPen(QColor(0, 0, 0))
+        else:
+            text = self.pin.data_type
+            painter.setPen(QColor(0, 0, 0) if enabled else QColor(160, 160, 160))
+            # 下拉箭头
+            x = self.rect.right() - 10
+            y = self.rect.center().y()
+            painter.drawLine(QPointF(x - 3, y - 2), QPointF(x, y + 2))
+            painter.drawLine(QPointF(x, y + 2), QPointF(x + 3, y - 2))
+            text_rect.setRight(x - 5)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+
+    def hoverEnterEvent(self, event):
+        self.pin.materialize_editor()
+        super().hoverEnterEvent(event)
+
+    def mousePressEvent(self, event):
+        self.pin.materialize_editor(activate=True)
+        event.accept()
+
+
 class PinWidgetFactory:
     """引脚控件工厂类，负责创建和配置各种引脚控件实例"""
+    _sizes = {}  # 各类控件放入QGraphicsProxyWidget后的尺寸
+
     @staticmethod
     def create_widget(widget_type, pin_type, text_rect):
         """创建并配置引脚控件实例
@@ -156,13 +324,27 @@ class PinWidgetFactory:
         proxy_widget.setWidget(widget)
         
         # 设置控件的位置
+        proxy_widget.setPos(PinWidgetFactory.widget_pos(pin_type, text_rect, QSizeF(widget.width(), widget.height())))
+        return proxy_widget, widget
+
+    @staticmethod
+    def widget_pos(pin_type, text_rect, size):
+        """控件相对于引脚文字的位置"""
         if pin_type == 'input':
             # 输入引脚的控件放在引脚左侧
-            proxy_widget.setPos(text_rect.width(), -widget.height()/2)
-        else:
-            # 输出引脚的控件放在引脚右侧
-            proxy_widget.setPos(-text_rect.width() - widget.width(), -widget.height()/2)
-        return proxy_widget, widget
+            return QPointF(text_rect.width(), -size.height()/2)
+        # 输出引脚的控件放在引脚右侧
+        return QPointF(-text_rect.width() - size.width(), -size.height()/2)
+
+    @classmethod
+    def widget_size(cls, widget_type):
+        """控件的尺寸（每类控件只创建一次样本来测量），占位图形项据此布局"""
+        size = cls._sizes.get(widget_type)
+        if size is None:
+            proxy_widget, widget = cls.create_widget(widget_type, 'input', QRectF())
+            size = cls._sizes[widget_type] = QSizeF(widget.width(), widget.height())
+            proxy_widget.deleteLater()
+        return size
 
 
 
@@ -180,7 +362,7 @@ class PinTypeComboBox(QComboBox):
     def __init__(self,parent=None):
         super().__init__(parent)
         self.setStyleSheet("background-color: rgb(255, 255, 255); border: 2px solid rgb(200, 200, 200); color: rgb(0, 0, 0);")
-        self.addItems(["int","str","bool","float"])
+        self.addItems(PIN_TYPES)
         # 连接当前索引改变的信号到内部处理函数
         self.currentIndexChanged.connect(self._on_selection_changed)
     
@@ -192,8 +374,25 @@ class PinTypeComboBox(QComboBox):
 class PinPicLabel(QLabel):
     def __init__(self,parent=None):
         super().__init__(parent)
+        self.pending_img=None  # 不可见时暂存的图片，显示时再转换
     def set_pic(self,img):
-        #设置为截图图片
-        self.setPixmap(img)
+        """设置为截图图片
+
+        Args:
+            img: QPixmap或ImageValue；ImageValue只有在控件可见时才转换为QPixmap
+        """
+        if isinstance(img, QPixmap):
+            self.pending_img=None
+            self.setPixmap(img)
+        elif self.isVisible():
+            self.pending_img=None
+            self.setPixmap(img.to_pixmap().scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio))
+        else:
+            self.pending_img=img
+            return
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.pending_img is not None:
+            self.set_pic(self.pending_img)
 
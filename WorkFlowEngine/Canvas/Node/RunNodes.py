@@ -1,157 +1,431 @@
-class Run:
+import asyncio
+import inspect
+import time
+import weakref
+from collections import OrderedDict, deque
+
+
+class CycleError(Exception):
+    """工作流中存在循环依赖"""
     def __init__(self, nodes):
-        self.nodes = nodes
-        self.execution_order = []  # 节点的执行顺序
-        self.pin_execution_order = []  # 引脚的访问顺序 [(node_index, pin_index, pin_type), ...]
-        self.input_link={} # 链表，{当前引脚:前驱引脚的索引}
-        self.output_link={} # 链表，{当前引脚:当前引脚的值}
+        self.nodes = nodes  # 构成环的节点
+        names = ", ".join(node.name for node in nodes)
+        super().__init__(f"工作流存在循环依赖: {names}")
+
+
+class ExecutionPlan:
+    """编译后的执行计划（不可变）
+
+    按执行顺序展开为平铺数组，运行时只需按下标读写引脚值槽位：
+        nodes: 原始节点列表
+        order: 节点执行顺序（nodes中的索引）
+        runs: 每一步要调用的 NodeInfo.run
+        inputs: 每一步的输入 ((slot, pin), ...)，slot>=0 读取槽位，slot==-1 读取引脚字面值
+        outputs: 每一步输出写入的槽位 (slot, ...)
+        output_pins: 槽位对应的输出引脚，槽位0保留给未连接的输入（值恒为None）
+        successors: 每一步的后继步骤 (step, ...)
+        dependency_counts: 每一步依赖的步骤数量，并行调度时据此判断节点是否就绪
+        step_of: {节点: 步骤}，增量执行时据此找到被修改节点对应的步骤
+        initial_values: 每次执行开始时槽位的初始值（优化后的计划在其中保存常量，默认全部为None）
+    """
+    __slots__ = ("nodes", "order", "runs", "inputs", "outputs", "output_pins", "slot_count",
+                 "successors", "dependency_counts", "step_of", "initial_values")
+    LITERAL = -1  # 输入取引脚字面值
+    EMPTY = 0  # 未连接输入读取的空槽位
+
+    def __init__(self, nodes, order, runs, inputs, outputs, output_pins, successors, dependency_counts,
+                 initial_values=None):
+        object.__setattr__(self, "nodes", tuple(nodes))
+        object.__setattr__(self, "order", tuple(order))
+        object.__setattr__(self, "runs", tuple(runs))
+        object.__setattr__(self, "inputs", tuple(inputs))
+        object.__setattr__(self, "outputs", tuple(outputs))
+        object.__setattr__(self, "output_pins", tuple(output_pins))
+        object.__setattr__(self, "slot_count", len(output_pins))
+        object.__setattr__(self, "successors", tuple(tuple(steps) for steps in successors))
+        object.__setattr__(self, "dependency_counts", tuple(dependency_counts))
+        object.__setattr__(self, "step_of", {self.nodes[node_idx]: step for step, node_idx in enumerate(self.order)})
+        object.__setattr__(self, "initial_values",
+                           tuple(initial_values) if initial_values is not None else (None,) * len(output_pins))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ExecutionPlan是不可变对象")
+
+
+class SyncRun:
+    """把 async def run 包装为同步调用，供顺序执行和线程池/进程池使用"""
+    def __init__(self, run):
+        self.run = run
+
+    def __call__(self, _input):
+        return asyncio.run(self.run(_input))
+
 
-        """执行工作流，返回节点和引脚的访问顺序"""
+class MemoRun:
+    """纯节点（NodeInfo.pure）的输出缓存：输入相同时直接返回上一次的输出
+
+    缓存键由 NodeInfo.memo_key 生成，无法哈希的输入不缓存。
+    每个NodeInfo只对应一个MemoRun（保存在NodeInfo._memo_run中，随节点一起释放），
+    图结构变化重新编译执行计划后缓存仍然有效。
+    """
+    _missing = object()
+
+    def __init__(self, info, size=128):
+        """
+        Args:
+            info: 节点信息（NodeInfo）
+            size: 最多缓存的输入组合数量，超出时丢弃最久未使用的结果
+        """
+        self.info = info
+        self.run = info.run
+        self.size = size
+        self.cache = OrderedDict()
+
+    @classmethod
+    def of(cls, info):
+        """获取节点信息对应的MemoRun"""
+        memo = getattr(info, "_memo_run", None)
+        if memo is None:
+            memo = info._memo_run = cls(info)
+        return memo
+
+    def __call__(self, _input):
+        try:
+            key = self.info.memo_key(_input)
+            _output = self.cache.get(key, self._missing)
+        except TypeError:
+            # 输入无法哈希（如list），直接执行
+            return self.run(_input)
+        if _output is self._missing:
+            _output = self.cache[key] = self.run(_input)
+            if len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return _output
+
+
+class PlanCompiler:
+    """执行计划编译器：构建依赖图、拓扑排序并分配引脚值槽位"""
+    def __init__(self, nodes):
+        self.nodes = list(nodes)
+
+    def compile(self):
         # 构建节点依赖图
         dependencies = self._build_dependencies()
         
         # 使用拓扑排序获取执行顺序
-        self.execution_order = self._topological_sort(dependencies)
+        order = self._topological_sort(dependencies)
         
-        # 生成引脚访问顺序
-        self.pin_execution_order = self._generate_pin_order()
+        # 按执行顺序为每个输出引脚分配槽位
+        output_pins = [None]
+        slot_of = {}
+        for node_idx in order:
+            for pin in self.nodes[node_idx].output_pins:
+                slot_of[pin] = len(output_pins)
+                output_pins.append(pin)
         
-        """ return {
-            'node_order': self.execution_order,
-            'pin_order': self.pin_execution_order
-        } """
-    
-    def _build_dependencies(self):
-        """构建节点依赖图"""
-        #当前节点：[依赖节点1,依赖节点2,...]
-        dependencies = {i: [] for i in range(len(self.nodes))}
+        runs, inputs, outputs = [], [], []
+        for node_idx in order:
+            node = self.nodes[node_idx]
+            run = node.NodeInfo.run
+            # 异步节点和纯节点在编译时包装好，顺序执行时不增加额外判断；AsyncRun直接使用NodeInfo.run
+            if inspect.iscoroutinefunction(run):
+                runs.append(SyncRun(run))
+            elif node.NodeInfo.pure:
+                runs.append(MemoRun.of(node.NodeInfo))
+            else:
+                runs.append(run)
+            step_inputs = []
+            for pin in node.input_pins:
+                if pin.uses_link():
+                    if pin.connected:
+                        step_inputs.append((slot_of[pin.connections[0].start_pin], pin))
+                    else:
+                        step_inputs.append((ExecutionPlan.EMPTY, pin))
+                elif pin.literal() is not None:
+                    step_inputs.append((ExecutionPlan.LITERAL, pin))
+            inputs.append(tuple(step_inputs))
+            outputs.append(tuple(slot_of[pin] for pin in node.output_pins))
         
+        # 将节点级的依赖关系转换为步骤下标
+        step_of = {node_idx: step for step, node_idx in enumerate(order)}
+        successors = [[step_of[succ] for succ in self.successors[node_idx]] for node_idx in order]
+        dependency_counts = [len(dependencies[node_idx]) for node_idx in order]
+        return ExecutionPlan(self.nodes, order, runs, inputs, outputs, output_pins,
+                             successors, dependency_counts)
+
+    def _build_dependencies(self):
+        """构建节点依赖图（邻接表）
+
+        同时生成 self.node_index（节点到索引的映射）和 self.successors（每个节点的后继列表），
+        整体为 O(节点数+连接数)
+
+        Returns:
+            list: 当前节点：[依赖节点1,依赖节点2,...]
+        """
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        dependencies = [[] for _ in self.nodes]
+        self.successors = [[] for _ in self.nodes]
+    
         for node_idx, node in enumerate(self.nodes):
+            providers = set()  # 同一个前驱节点只记录一次
             # 对于每个节点的输入引脚，找到提供数据的节点
             for pin in node.input_pins:
                 for connection in pin.connections:
                     # 找到连接的起始节点（数据提供者）
-                    if connection.end_pin == pin:  # 当前引脚是终点
-                        provider_node = connection.start_pin.parentItem()
-                        provider_idx = self.nodes.index(provider_node)
-                        if provider_idx not in dependencies[node_idx]:
+                    if connection.end_pin is pin:  # 当前引脚是终点
+                        provider_idx = self.node_index[connection.start_pin.parentItem()]
+                        if provider_idx not in providers:
+                            providers.add(provider_idx)
                             dependencies[node_idx].append(provider_idx)
-        
-        return dependencies
+                            self.successors[provider_idx].append(node_idx)
     
+        return dependencies
+
     def _topological_sort(self, dependencies):
-        """拓扑排序，确保依赖节点先执行，且从node_name为'Start'的节点开始"""
+        """拓扑排序（Kahn算法），确保依赖节点先执行，且从node_name为'Start'的节点开始
+
+        Raises:
+            CycleError: 存在循环依赖时抛出，包含环上的节点
+        """
         # 计算入度
-        in_degree = {i: 0 for i in range(len(self.nodes))}
-        for node in dependencies:
-            for dep in dependencies[node]:
-                in_degree[node] += 1
-        
+        in_degree = [len(deps) for deps in dependencies]
+    
         # 找到入度为0的节点（起始节点）
-        zero_degree_nodes = [node for node in in_degree if in_degree[node] == 0]
-        
+        zero_degree_nodes = [i for i, degree in enumerate(in_degree) if degree == 0]
+    
         # 优先查找node_name为'start'的节点
         start_node = None
         for node_idx in zero_degree_nodes:
             if self.nodes[node_idx].NodeInfo.node_name == 'Start':
                 start_node = node_idx
                 break
-        
+    
         # 构建队列，如果有start节点则优先处理
-        queue = []
+        queue = deque()
         if start_node is not None:
             queue.append(start_node)
-            # 添加其他入度为0的节点
-            for node in zero_degree_nodes:
-                if node != start_node:
-                    queue.append(node)
-        else:
-            # 如果没有start节点，则按原方式处理
-            queue = zero_degree_nodes
-            
-        result = []
+        # 添加其他入度为0的节点
+        queue.extend(node for node in zero_degree_nodes if node != start_node)
         
+        result = []
+    
         while queue:
             # 删除入度为0的节点
-            current = queue.pop(0)
+            current = queue.popleft()
             result.append(current)
-            
-            # 减少依赖当前节点的其他节点的入度
-            for node in dependencies:
-                if current in dependencies[node]:
-                    in_degree[node] -= 1
-                    if in_degree[node] == 0:
-                        queue.append(node)
-        
-        return result
-    
-    def _generate_pin_order(self):
-        """生成引脚访问顺序"""
-        pin_order = []
         
-        # 按照节点执行顺序访问引脚
-        for node_idx in self.execution_order:
-            node = self.nodes[node_idx]
-            
-            # 先访问输入引脚（获取数据）
-            for pin_idx, pin in enumerate(node.input_pins):
-                pin_order.append((node_idx, pin_idx, 'input'))
-            
-            # 再访问输出引脚（提供数据）
-            for pin_idx, pin in enumerate(node.output_pins):
-                pin_order.append((node_idx, pin_idx, 'output'))
-        
-        return pin_order
+            # 减少依赖当前节点的其他节点的入度
+            for node in self.successors[current]:
+                in_degree[node] -= 1
+                if in_degree[node] == 0:
+                    queue.append(node)
     
+        if len(result) < len(self.nodes):
+            raise CycleError(self._find_cycle_nodes(dependencies, in_degree))
+        return result
+
+    def _find_cycle_nodes(self, dependencies, in_degree):
+        """找出环上的节点
+
+        拓扑排序后剩余的节点包含环以及环的下游节点，
+        反向剥离没有剩余后继的节点，留下的就是构成环的节点
+        """
+        remaining = {i for i, degree in enumerate(in_degree) if degree > 0}
+        out_degree = {i: 0 for i in remaining}
+        for i in remaining:
+            for dep in dependencies[i]:
+                if dep in remaining:
+                    out_degree[dep] += 1
+        queue = deque(i for i in remaining if out_degree[i] == 0)
+        while queue:
+            current = queue.popleft()
+            remaining.discard(current)
+            for dep in dependencies[current]:
+                if dep in remaining:
+                    out_degree[dep] -= 1
+                    if out_degree[dep] == 0:
+                        queue.append(dep)
+        return [self.nodes[i] for i in sorted(remaining)]
+
+
+class Run:
+    # 每个图（CanvasScene或无界面Graph）对应的 (revision, ExecutionPlan)
+    _plan_cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, nodes=None, plan=None):
+        """
+        Args:
+            nodes: 要执行的节点列表
+            plan: 已编译的执行计划，传入时跳过所有规划工作
+        """
+        if plan is None:
+            plan = self.compile(nodes)
+        self.plan = plan
+        self.nodes = list(plan.nodes)
+        self.execution_order = list(plan.order)  # 节点的执行顺序
+        self.values = list(plan.initial_values)  # 引脚值槽位
+        self.dirty = [True] * len(plan.runs)  # 增量执行时需要重新执行的步骤
+
+    @classmethod
+    def from_graph(cls, graph):
+        """为图创建Run，图的结构没有变化时复用缓存的执行计划
+
+        Args:
+            graph: CanvasScene或Graph，需要提供revision和get_all_node()
+        """
+        return cls(plan=cls.plan_for(graph))
+
+    @classmethod
+    def plan_for(cls, graph):
+        """返回图当前的执行计划，图的结构没有变化时返回缓存的同一个对象"""
+        cached = cls._plan_cache.get(graph)
+        if cached is not None and cached[0] == graph.revision:
+            return cached[1]
+        plan = cls.compile(graph.get_all_node())
+        cls._plan_cache[graph] = (graph.revision, plan)
+        return plan
+
+    @classmethod
+    def compile(cls, nodes):
+        """将节点编译为执行计划"""
+        return PlanCompiler(nodes).compile()
+
+    @property
+    def output_link(self):
+        """{输出引脚: 当前引脚的值}"""
+        return {pin: value for pin, value in zip(self.plan.output_pins, self.values) if pin is not None}
+
     def debug_(self):
         """调试输出执行顺序"""
         """ print("节点执行顺序:")
         for idx in self.execution_order:
-            print(f"  {idx}: {self.nodes[idx].NodeInfo.node_name}")
-        
-        print("\n引脚访问顺序:")
-        for node_idx, pin_idx, pin_type in self.pin_execution_order:
-            node = self.nodes[node_idx]
-            pins = node.input_pins if pin_type == 'input' else node.output_pins
-            if pin_idx < len(pins):
-                pin = pins[pin_idx]
-                print(f"  节点{node_idx}({node.name}) -> {pin_type}引脚{pin_idx}: {pin.data_type}") """
+            print(f"  {idx}: {self.nodes[idx].NodeInfo.node_name}") """
         self.run_node()
+
     def run_node(self):
-        for node_idx in self.execution_order:
-            node = self.nodes[node_idx]
-            # 先访问引脚（获取数据）
-            for pin_idx, pin in enumerate(node.output_pins):
-                self.output_link[pin]=None
-        for node_idx in self.execution_order:
-            node = self.nodes[node_idx]
-            # 先访问引脚（获取数据）
-            for pin_idx, pin in enumerate(node.input_pins):
-                if pin.connected:
-                    start=pin.connections[0].start_pin
-                    for input_key in self.output_link:
-                        if input_key==start:
-                            self.input_link[pin]=input_key
-                            break
-        # 执行节点
-        for node_idx in self.execution_order:
-            _input=[]
-            #[value]
-            node = self.nodes[node_idx]
-            for pin_idx, pin in enumerate(node.input_pins):
-                if (pin.connected and pin.combo_box==None) or pin.combo_box:
-                    _input.append(self.output_link[self.input_link[pin]])
-                elif pin.line_edit:
-                    _input.append(pin.line_edit.text())
-                
-            #print(_input)
-            _output=node.NodeInfo.run(_input)
+        """按执行计划执行节点"""
+        plan = self.plan
+        values = self.values = list(plan.initial_values)
+        for run, inputs, outputs in zip(plan.runs, plan.inputs, plan.outputs):
+            # 只通过引脚接口取值，节点既可以是画布上的Node，也可以是无界面的GraphNode
+            _input = [values[slot] if slot >= 0 else pin.literal() for slot, pin in inputs]
+            _output = run(_input)
             if _output and _output[0]==False:
                 break
-            for i in range(len(node.output_pins)):
-                self.output_link[node.output_pins[i]]=_output[i]
+            for slot, value in zip(outputs, _output):
+                values[slot] = value
 
-                
+    def run_incremental(self, changed_nodes=()):
+        """增量执行：只执行输入发生变化的节点及其下游节点，其余节点沿用上一次的输出
 
-        
-            
+        第一次调用时所有步骤都需要执行；节点要求停止时，与run_node相同，停止的步骤及之后的步骤
+        没有输出，并且全部留到下一次执行。
+
+        Args:
+            changed_nodes: 输入（引脚字面值、类型下拉框）发生变化的节点
+        """
+        plan = self.plan
+        dirty = self.dirty
+        for node in changed_nodes:
+            step = plan.step_of.get(node)
+            if step is not None:
+                self._mark_dirty(step)
+        values = self.values
+        for step, run in enumerate(plan.runs):
+            if not dirty[step]:
+                continue
+            _input = [values[slot] if slot >= 0 else pin.literal() for slot, pin in plan.inputs[step]]
+            _output = run(_input)
+            if _output and _output[0]==False:
+                self._clear_from(step)
+                break
+            dirty[step] = False
+            for slot, value in zip(plan.outputs[step], _output):
+                values[slot] = value
+
+    def _clear_from(self, step):
+        """清空从step开始所有步骤的输出并标记为需要重新执行（增量执行中途停止时使用）"""
+        plan = self.plan
+        values = self.values
+        for later in range(step, len(plan.runs)):
+            self.dirty[later] = True
+            for slot in plan.outputs[later]:
+                values[slot] = plan.initial_values[slot]
+
+    def _mark_dirty(self, step):
+        """把步骤及其所有下游步骤标记为需要重新执行"""
+        dirty = self.dirty
+        successors = self.plan.successors
+        dirty[step] = True
+        stack = [step]
+        while stack:
+            for succ in successors[stack.pop()]:
+                if not dirty[succ]:
+                    dirty[succ] = True
+                    stack.append(succ)
+
+    def run_node_timed(self, durations, counts):
+        """按执行计划执行节点，同时累计每一步的耗时
+
+        Args:
+            durations: 每一步累计耗时（秒）的列表，长度与执行计划步数相同
+            counts: 每一步累计执行次数的列表
+        """
+        plan = self.plan
+        values = self.values = list(plan.initial_values)
+        clock = time.perf_counter
+        for step, (run, inputs, outputs) in enumerate(zip(plan.runs, plan.inputs, plan.outputs)):
+            _input = [values[slot] if slot >= 0 else pin.literal() for slot, pin in inputs]
+            start = clock()
+            _output = run(_input)
+            durations[step] += clock() - start
+            counts[step] += 1
+            if _output and _output[0]==False:
+                break
+            for slot, value in zip(outputs, _output):
+                values[slot] = value
+
+    def run_node_profiled(self, profiler=None):
+        """按执行计划执行节点，并用Profiler记录每个节点的耗时、内存分配和输出数据量
+
+        Args:
+            profiler: Engine.Profiler.Profiler，多次执行可以共用一个以累计记录；为None时新建
+
+        Returns:
+            Profiler: 记录了本次执行的性能分析器
+        """
+        if profiler is None:
+            from ...Engine.Profiler import Profiler
+            profiler = Profiler()
+        plan = self.plan
+        values = self.values = list(plan.initial_values)
+        profiler.begin_run()
+        try:
+            for step, (run, inputs, outputs) in enumerate(zip(plan.runs, plan.inputs, plan.outputs)):
+                _input = [values[slot] if slot >= 0 else pin.literal() for slot, pin in inputs]
+                _output = profiler.measure(step, plan.nodes[plan.order[step]], run, _input)
+                if _output and _output[0]==False:
+                    break
+                for slot, value in zip(outputs, _output):
+                    values[slot] = value
+        finally:
+            profiler.end_run()
+        return profiler
+
+    def _release(self, step, _output, remaining, ready):
+        """记录节点输出并把依赖已全部满足的后继步骤放入就绪队列（供并行/异步执行使用）
+
+        Returns:
+            bool: 节点要求停止执行时返回False
+        """
+        if _output and _output[0]==False:
+            return False
+        for slot, value in zip(self.plan.outputs[step], _output):
+            self.values[slot] = value
+        for succ in self.plan.successors[step]:
+            remaining[succ] -= 1
+            if remaining[succ] == 0:
+                ready.append(succ)
+        return True
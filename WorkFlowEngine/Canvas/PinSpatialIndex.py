@@ -0,0 +1,103 @@
+import math
+
+
+class PinSpatialIndex:
+    """引脚的网格空间索引 - 拖拽连接时查找鼠标附近的引脚
+
+    场景按CELL_SIZE划分为网格，每个格子保存位于其中的引脚，
+    查找半径内最近的引脚只需要检查覆盖圆的少数几个格子，与场景中的引脚总数无关。
+
+    索引在第一次查询时才建立（加载大型工作流时不增加耗时），之后由CanvasScene在
+    添加、删除、移动节点时增量更新；场景清空时失效，下次查询重新建立。
+    """
+    CELL_SIZE = 64  # 格子边长（场景坐标），略大于节点上相邻引脚的间距
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.cells = {}  # (列, 行) -> [引脚, ...]
+        self.cell_of = {}  # 引脚 -> (列, 行)
+        self.valid = False
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.CELL_SIZE), math.floor(y / self.CELL_SIZE))
+
+    def _insert_pin(self, pin):
+        pos = pin.scenePos()
+        key = self._cell(pos.x(), pos.y())
+        self.cells.setdefault(key, []).append(pin)
+        self.cell_of[pin] = key
+
+    def _remove_pin(self, pin):
+        key = self.cell_of.pop(pin, None)
+        if key is not None:
+            cell = self.cells[key]
+            cell.remove(pin)
+            if not cell:
+                del self.cells[key]
+
+    def rebuild(self):
+        """按场景中的所有节点重新建立索引"""
+        self.cells = {}
+        self.cell_of = {}
+        for node in self.scene.nodes:
+            for pin in node.input_pins + node.output_pins:
+                self._insert_pin(pin)
+        self.valid = True
+
+    def invalidate(self):
+        """使索引失效，下次查询时重新建立"""
+        self.cells = {}
+        self.cell_of = {}
+        self.valid = False
+
+    def add_node(self, node):
+        """登记新节点的引脚"""
+        if self.valid:
+            for pin in node.input_pins + node.output_pins:
+                self._insert_pin(pin)
+
+    def remove_node(self, node):
+        """移除节点的引脚"""
+        if self.valid:
+            for pin in node.input_pins + node.output_pins:
+                self._remove_pin(pin)
+
+    def move_node(self, node):
+        """节点移动后更新其引脚所在的格子"""
+        if not self.valid:
+            return
+        for pin in node.input_pins + node.output_pins:
+            pos = pin.scenePos()
+            key = self._cell(pos.x(), pos.y())
+            if self.cell_of.get(pin) != key:
+                self._remove_pin(pin)
+                self.cells.setdefault(key, []).append(pin)
+                self.cell_of[pin] = key
+
+    def nearest(self, pos, radius, accept=None):
+        """查找距离pos不超过radius的最近引脚
+
+        Args:
+            pos: 场景坐标（QPointF）
+            radius: 查找半径（场景坐标）
+            accept: 过滤函数，返回False的引脚被忽略
+
+        Returns:
+            最近的引脚，没有时返回None
+        """
+        if not self.valid:
+            self.rebuild()
+        x, y = pos.x(), pos.y()
+        min_col, min_row = self._cell(x - radius, y - radius)
+        max_col, max_row = self._cell(x + radius, y + radius)
+        best = None
+        best_distance = radius * radius
+        for col in range(min_col, max_col + 1):
+            for row in range(min_row, max_row + 1):
+                for pin in self.cells.get((col, row), ()):
+                    pin_pos = pin.scenePos()
+                    distance = (pin_pos.x() - x) ** 2 + (pin_pos.y() - y) ** 2
+                    if distance <= best_distance and (accept is None or accept(pin)):
+                        best = pin
+                        best_distance = distance
+        return best
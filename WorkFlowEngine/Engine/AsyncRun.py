@@ -0,0 +1,62 @@
+import asyncio
+import inspect
+from collections import deque
+from ..Canvas.Node.RunNodes import Run
+
+
+class AsyncRun(Run):
+    """asyncio执行引擎 - 支持 async def run 的节点
+
+    输入就绪的节点立即开始执行：
+        async def run      - 作为协程并发等待
+        run_mode 为 'gui' 或 'inline' - 在事件循环所在线程直接调用
+        其它同步节点        - 通过 loop.run_in_executor 放入线程池，不阻塞事件循环
+
+    节点要求停止时与ParallelRun相同：不再开始新节点，已经开始的互不依赖的节点照常执行完毕。
+    """
+    def __init__(self, nodes=None, plan=None, executor=None):
+        """
+        Args:
+            nodes: 要执行的节点列表
+            plan: 已编译的执行计划
+            executor: 同步节点使用的执行器，默认使用事件循环的默认线程池
+        """
+        super().__init__(nodes, plan)
+        self.executor = executor
+
+    def run_node(self):
+        """在新的事件循环中执行（无界面使用）"""
+        asyncio.run(self.run_async())
+
+    async def run_async(self):
+        """按依赖就绪顺序并发执行节点"""
+        loop = asyncio.get_running_loop()
+        plan = self.plan
+        values = self.values = list(plan.initial_values)
+        remaining = list(plan.dependency_counts)
+        ready = deque(step for step, count in enumerate(remaining) if count == 0)
+        pending = {}  # {task: step}
+        stopped = False
+        try:
+            while ready or pending:
+                while ready and not stopped:
+                    step = ready.popleft()
+                    _input = [values[slot] if slot >= 0 else pin.literal() for slot, pin in plan.inputs[step]]
+                    info = plan.nodes[plan.order[step]].NodeInfo
+                    if inspect.iscoroutinefunction(info.run):
+                        pending[asyncio.ensure_future(info.run(_input))] = step
+                    elif info.run_mode == "gui" or info.run_mode == "inline":
+                        stopped = not self._release(step, plan.runs[step](_input), remaining, ready)
+                    else:
+                        pending[loop.run_in_executor(self.executor, plan.runs[step], _input)] = step
+                if stopped:
+                    ready.clear()
+                if pending:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        step = pending.pop(task)
+                        if not self._release(step, task.result(), remaining, ready):
+                            stopped = True
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,123 @@
+from ..Canvas.Node.RunNodes import ExecutionPlan, Run
+from ..Canvas.Node.CustomNodes.BatchColumn import is_column, run_rows
+
+
+def _stopped(column, size, np):
+    """第一个输出为False（与 _output[0]==False 含义相同）的行"""
+    if not is_column(column, np):
+        return np.full(size, bool(column == False))
+    if column.dtype.kind in "biuf":
+        return column == False
+    return np.fromiter((value == False for value in column.tolist()), dtype=bool, count=len(column))
+
+
+def _scatter(column, rows, size, np):
+    """把只包含rows中各行的结果放回完整的一列，其余行（未执行或在这一步停止的行）为None"""
+    scattered = np.full(size, None, dtype=object)
+    if is_column(column, np):
+        # 先转换为Python对象，与逐行执行的结果类型相同
+        values = column.tolist()
+        for i, row in enumerate(rows.tolist()):
+            scattered[row] = values[i]
+    else:
+        value = column.item() if isinstance(column, np.ndarray) else column
+        for row in rows.tolist():
+            scattered[row] = value
+    return scattered
+
+
+class BatchRun(Run):
+    """批量执行引擎 - 用同一个执行计划一次执行多行输入
+
+    输入框引脚可以传入一列数据（numpy数组或列表），每一行对应一组参数，所有行一起执行：
+        vectorized为True的节点 - 调用 NodeInfo.run_batch，一次处理整列数据
+        其它节点              - 逐行调用 NodeInfo.run（纯节点同样使用输出缓存）
+    每一行独立判断停止：节点的第一个输出为False时只有该行停止执行。
+
+    用法：
+        runner = BatchRun(plan=Run.plan_for(graph))
+        runner.run_batch({pin: [1, 2, 3], other_pin: numpy.arange(3)})
+        runner.output_columns[output_pin]    # 输出引脚的一列结果
+        runner.active                         # 执行到最后没有停止的行
+
+    需要numpy。
+    """
+    def __init__(self, nodes=None, plan=None):
+        super().__init__(nodes, plan)
+        self.size = 0
+        self.active = None  # 每一行是否仍在执行
+
+    @property
+    def output_columns(self):
+        """{输出引脚: 该引脚的一列结果}，停止的行为None（与逐行执行时没有写入的输出相同）"""
+        return self.output_link
+
+    def _step_inputs(self, step, columns):
+        """步骤的输入：槽位中的列、传入的列或引脚字面值"""
+        _input = []
+        for slot, pin in self.plan.inputs[step]:
+            if pin in columns:
+                _input.append(columns[pin])
+            elif slot >= 0:
+                _input.append(self.values[slot])
+            else:
+                _input.append(pin.literal())
+        return _input
+
+    def run_batch(self, columns, size=None):
+        """批量执行
+
+        Args:
+            columns: {输入引脚: 一列数据}，只能用于没有连接的输入框引脚
+            size: 行数，默认为各列的长度
+
+        Returns:
+            BatchRun: self，结果保存在values/output_columns中
+        """
+        import numpy as np
+        plan = self.plan
+        literal_pins = set(pin for step_inputs in plan.inputs for slot, pin in step_inputs
+                           if slot == ExecutionPlan.LITERAL)
+        columns = dict(columns)
+        for pin, column in columns.items():
+            if pin not in literal_pins:
+                raise ValueError(f"引脚不是执行计划中的输入框引脚，不能传入批量数据: {pin.parentItem().name}[{pin.index}]")
+            columns[pin] = np.asarray(column)
+        lengths = set(len(column) for column in columns.values() if column.ndim > 0)
+        if size is None:
+            size = lengths.pop() if len(lengths) == 1 else (1 if not lengths else None)
+        if size is None or any(length != size for length in lengths):
+            raise ValueError(f"批量数据的行数不一致: {sorted(lengths)}")
+
+        self.size = size
+        values = self.values = list(plan.initial_values)
+        active = self.active = np.ones(size, dtype=bool)
+        for step, (run, outputs) in enumerate(zip(plan.runs, plan.outputs)):
+            rows = np.flatnonzero(active)
+            if len(rows) == 0:
+                break
+            full = len(rows) == size
+            _input = self._step_inputs(step, columns)
+            if not full:
+                _input = [column[rows] if is_column(column, np) else column for column in _input]
+            info = plan.nodes[plan.order[step]].NodeInfo
+            if info.vectorized:
+                _output = list(info.run_batch(_input, len(rows)))
+            else:
+                # 逐行调用执行计划中的run，纯节点同样使用输出缓存
+                _output = run_rows(run, _input, len(rows), np)
+            kept = None  # 没有在这一步停止的行（None表示全部）
+            if _output:
+                stopped = _stopped(_output[0], len(rows), np)
+                if stopped.any():
+                    active[rows[stopped]] = False
+                    kept = ~stopped
+            for slot, column in zip(outputs, _output):
+                if kept is not None:
+                    # 与逐行执行相同：停止的行不写入这一步的输出
+                    column = _scatter(column[kept] if is_column(column, np) else column, rows[kept], size, np)
+                elif not full:
+                    # 只执行了部分行，其余行的值为None
+                    column = _scatter(column, rows, size, np)
+                values[slot] = column
+        return self
@@ -0,0 +1,245 @@
+"""把工作流编译为Python源代码执行
+
+Run.run_node每次执行都要遍历执行计划、为每个节点构建输入列表并读写槽位；
+WorkflowCompiler把执行计划展开为一个普通的Python函数：引脚值是局部变量，
+每个节点直接调用其NodeInfo.run，引脚字面值作为常量写在代码中。
+
+编译后的代码对象按源代码的哈希缓存，结构和引脚值相同的工作流只编译一次：
+    runner = CompiledRun.from_graph(Graph.load("flow.json"))
+    runner.run_node()
+    runner.output_link
+
+也可以导出为独立的Python模块，部署时不需要编辑器和工作流文件（仍需要WorkFlowEngine中的节点包）：
+    python -m WorkFlowEngine.Engine compile example/1.json flow1.py
+    python flow1.py
+"""
+import hashlib
+import inspect
+import weakref
+from collections import OrderedDict
+from ..Canvas.Node.RunNodes import ExecutionPlan, MemoRun, Run, SyncRun
+
+# 缓存的代码对象数量（按源代码哈希）
+CODE_CACHE_SIZE = 64
+_code_cache = OrderedDict()  # 源代码哈希 -> 代码对象
+
+FACTORY_NAME = "make_workflow"
+
+
+def fit_outputs(_output, count):
+    """节点返回的输出数量与输出引脚数量不同时，与解释执行中的zip相同：多余的丢弃，缺少的为None"""
+    values = list(_output)[:count]
+    return values + [None] * (count - len(values))
+
+
+class WorkflowCompiler:
+    """执行计划 -> Python源代码
+
+    生成的工厂函数 make_workflow(runs, init, fit_outputs) 返回无参数的 workflow()，
+    执行一次工作流并返回所有槽位的值（与Run.values相同），节点输出第一项为False时在该节点处停止。
+    """
+    def __init__(self, plan):
+        self.plan = plan
+
+    def _node_comment(self, step):
+        node = self.plan.nodes[self.plan.order[step]]
+        node_id = getattr(node, 'id', None)
+        # 节点名称可以修改，去掉其中的换行，避免破坏生成的代码
+        name = " ".join(str(node.name).split())
+        return f"# {step}: {node.NodeInfo.node_name} {name}" + (f" (ID {node_id})" if node_id else "")
+
+    def factory_source(self):
+        """生成工厂函数的源代码"""
+        plan = self.plan
+        step_count = len(plan.runs)
+        produced = [slot for outputs in plan.outputs for slot in outputs]
+        produced_slots = set(produced)
+        # 初始值不为None的槽位（Optimizer保存的常量）
+        constants = [slot for slot, value in enumerate(plan.initial_values)
+                     if value is not None and slot != ExecutionPlan.EMPTY]
+        constant_slots = set(constants)
+        lines = [f"def {FACTORY_NAME}(runs, init, fit_outputs):"]
+        if step_count:
+            lines.append(f"    {''.join(f'run_{step}, ' for step in range(step_count))}= runs")
+        for slot in constants:
+            lines.append(f"    c{slot} = init[{slot}]")
+        lines.append("    def workflow():")
+        initial = [f"v{slot} = c{slot}" for slot in produced if slot in constant_slots]
+        pending = [f"v{slot}" for slot in produced if slot not in constant_slots]
+        if pending:
+            lines.append(f"        {' = '.join(pending)} = None")
+        lines.extend(f"        {line}" for line in initial)
+        # 只执行一次的循环，节点要求停止时用break跳到返回语句
+        lines.append("        while True:")
+        for step in range(step_count):
+            args = []
+            for slot, pin in plan.inputs[step]:
+                if slot == ExecutionPlan.LITERAL:
+                    args.append(repr(pin.literal()))
+                elif slot in produced_slots:
+                    args.append(f"v{slot}")
+                elif slot in constant_slots:
+                    args.append(f"c{slot}")
+                else:
+                    args.append("None")
+            lines.append(f"            {self._node_comment(step)}")
+            lines.append(f"            o = run_{step}([{', '.join(args)}])")
+            lines.append("            if o and o[0] == False:")
+            lines.append("                break")
+            outputs = plan.outputs[step]
+            if outputs:
+                targets = "".join(f"v{slot}, " for slot in outputs)
+                lines.append("            try:")
+                lines.append(f"                {targets}= o")
+                lines.append("            except (TypeError, ValueError):")
+                lines.append(f"                {targets}= fit_outputs(o, {len(outputs)})")
+        lines.append("            break")
+        values = []
+        for slot in range(plan.slot_count):
+            if slot in produced_slots:
+                values.append(f"v{slot}")
+            elif slot in constant_slots:
+                values.append(f"c{slot}")
+            else:
+                values.append("None")
+        lines.append(f"        return [{', '.join(values)}]")
+        lines.append("    return workflow")
+        return "\n".join(lines) + "\n"
+
+    def compile(self, runs=None):
+        """编译并返回workflow函数
+
+        Args:
+            runs: 每一步调用的函数，默认为执行计划中的runs（纯节点带输出缓存）
+        """
+        source = self.factory_source()
+        code = compile_source(source)
+        namespace = {}
+        exec(code, namespace)
+        factory = namespace[FACTORY_NAME]
+        return factory(list(self.plan.runs if runs is None else runs), list(self.plan.initial_values), fit_outputs)
+
+    def module_source(self):
+        """生成独立模块的源代码：创建节点、设置类型下拉框，然后执行工作流
+
+        只能导出未经Optimizer/Fuser改写的执行计划（每一步都是节点自己的run）。
+        """
+        plan = self.plan
+        if any(value is not None for value in plan.initial_values):
+            raise ValueError("只能导出未经优化或融合的执行计划")
+        for step, run in enumerate(plan.runs):
+            info = plan.nodes[plan.order[step]].NodeInfo
+            plain = getattr(run, '__func__', None) is getattr(info.run, '__func__', None)
+            if not (plain or isinstance(run, (MemoRun, SyncRun))):
+                raise ValueError("只能导出未经优化或融合的执行计划")
+        lines = [
+            '"""由WorkFlowEngine.Engine.Compiler从工作流生成，不需要编辑器即可执行：',
+            '    python 本文件.py',
+            '"""',
+            "import asyncio",
+            "import inspect",
+            "from WorkFlowEngine.Canvas.Node.CustomNodes import node_dict",
+            "",
+            "",
+            fit_outputs_source(),
+            "",
+            "def bind(info):",
+            '    """节点的run，async def run 包装为同步调用"""',
+            "    run = info.run",
+            "    if inspect.iscoroutinefunction(run):",
+            "        return lambda _input: asyncio.run(run(_input))",
+            "    return run",
+            "",
+            "",
+            self.factory_source(),
+            "",
+            "def create_nodes():",
+            '    """按执行顺序创建每一步的NodeInfo"""',
+            "    infos = [",
+        ]
+        for step in range(len(plan.runs)):
+            info = plan.nodes[plan.order[step]].NodeInfo
+            lines.append(f"        node_dict[{info.node_name!r}].Info(),  {self._node_comment(step)}")
+        lines.append("    ]")
+        for step in range(len(plan.runs)):
+            node = plan.nodes[plan.order[step]]
+            # 类型下拉框选择的类型保存在NodeInfo的引脚配置中
+            for kind in ("input", "output"):
+                for i, pin in enumerate(getattr(node, f"{kind}_pins")):
+                    if pin.editor == "combo_box":
+                        lines.append(f"    infos[{step}].{kind}[{i}][0] = {pin.data_type!r}")
+        lines += [
+            "    return infos",
+            "",
+            "",
+            "def load():",
+            '    """创建节点并返回workflow函数，每次调用workflow()执行一次工作流，返回所有槽位的值"""',
+            f"    return {FACTORY_NAME}([bind(info) for info in create_nodes()], [None] * {plan.slot_count}, fit_outputs)",
+            "",
+            "",
+            'if __name__ == "__main__":',
+            "    load()()",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_module(self, file_path):
+        """把工作流导出为独立的Python模块"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(self.module_source())
+
+
+def fit_outputs_source():
+    """独立模块中fit_outputs的源代码"""
+    return inspect.getsource(fit_outputs)
+
+
+def compile_source(source):
+    """编译生成的源代码，按源代码哈希缓存代码对象"""
+    key = hashlib.sha1(source.encode('utf-8')).digest()
+    code = _code_cache.get(key)
+    if code is not None:
+        _code_cache.move_to_end(key)
+        return code
+    code = compile(source, f"<workflow {key.hex()[:12]}>", "exec")
+    _code_cache[key] = code
+    if len(_code_cache) > CODE_CACHE_SIZE:
+        _code_cache.popitem(last=False)
+    return code
+
+
+class CompiledRun(Run):
+    """编译执行引擎 - 执行WorkflowCompiler生成的函数，结果与Run相同（values/output_link）"""
+    # 每个图对应的 (revision, value_revision, 执行计划, workflow函数)
+    _compiled_cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, nodes=None, plan=None, function=None):
+        super().__init__(nodes, plan)
+        self.function = function or WorkflowCompiler(self.plan).compile()
+
+    @classmethod
+    def from_graph(cls, graph, plan=None):
+        """为图创建CompiledRun，图结构和引脚值都没有变化时复用编译好的函数
+
+        Args:
+            graph: CanvasScene或Graph
+            plan: 要编译的执行计划，默认为Run.plan_for(graph)
+        """
+        if plan is None:
+            plan = cls.plan_for(graph)
+        cached = cls._compiled_cache.get(graph)
+        if cached is not None and cached[:3] == (graph.revision, graph.value_revision, plan):
+            return cls(plan=plan, function=cached[3])
+        runner = cls(plan=plan)
+        cls._compiled_cache[graph] = (graph.revision, graph.value_revision, plan, runner.function)
+        return runner
+
+    def run_node(self):
+        """执行编译后的函数"""
+        self.values = self.function()
+
+
+def compile_workflow(source_path, target_path):
+    """把工作流文件编译为独立的Python模块"""
+    from .Graph import Graph
+    graph = Graph.load(source_path)
+    WorkflowCompiler(Run.plan_for(graph)).write_module(target_path)
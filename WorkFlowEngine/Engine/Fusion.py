@@ -0,0 +1,249 @@
+import inspect
+import itertools
+import linecache
+import weakref
+from ..Canvas.Node.RunNodes import ExecutionPlan, Run
+
+# 融合步骤的状态输出：成员节点要求停止执行时为STOP，否则为True
+STOP = "stop"
+
+_fused_ids = itertools.count(1)
+
+
+class FusedRun:
+    """融合后的步骤：执行生成的函数，依次计算组内所有节点的输出
+
+    返回 [状态, 成员1的输出..., 成员2的输出...]。某个成员的第一个输出为False时，
+    该成员及之后成员的输出为None，状态为STOP，由紧随其后的StopIfRun步骤停止执行。
+    可以pickle（只传递源代码），ParallelRun的进程池可以使用。
+    """
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source  # 生成的Python源代码，调试时查看
+        filename = f"<fused {name}>"
+        # 登记到linecache，出错时回溯信息可以显示生成的代码
+        lines = source.splitlines(True)
+        linecache.cache[filename] = (len(source), None, lines, filename)
+        namespace = {"STOP": STOP}
+        exec(compile(source, filename, "exec"), namespace)
+        self.function = namespace[name]
+
+    def __call__(self, _input):
+        return self.function(_input)
+
+    def __reduce__(self):
+        return (FusedRun, (self.name, self.source))
+
+
+class StopIfRun:
+    """融合步骤之后的检查：组内节点要求停止执行时返回[False]，使执行在原来的位置停止"""
+    def __call__(self, _input):
+        if _input[0] == STOP:
+            return [False]
+        return []
+
+
+class Fuser:
+    """算子融合 - 把执行顺序中相邻的可融合纯节点合并为一个生成的函数，作为一个步骤执行
+
+    可融合的节点是 NodeInfo.pure 为True、NodeInfo.fuse_expr 返回表达式的节点（如加(int)）。
+    只合并执行顺序中相邻的节点，执行顺序和停止执行的位置都与原计划相同；
+    合并后省去了每个节点的调用、输入列表构建和槽位读写。
+
+    用法：
+        fuser = Fuser(Run.plan_for(graph))
+        runner = Run(plan=fuser.fuse())
+        print(fuser.source())      # 查看生成的代码
+    """
+    def __init__(self, plan, min_size=2):
+        """
+        Args:
+            plan: 编译好的ExecutionPlan
+            min_size: 至少多少个相邻节点才合并
+        """
+        self.plan = plan
+        self.min_size = min_size
+        self.groups = []  # 被合并的步骤组（原计划中的步骤下标）
+        self.runs = []  # 每组生成的FusedRun
+
+    def _exprs(self, step, args):
+        """步骤的输出表达式，不可融合时返回None"""
+        info = self.plan.nodes[self.plan.order[step]].NodeInfo
+        if not info.pure or inspect.iscoroutinefunction(info.run):
+            return None
+        exprs = info.fuse_expr(args)
+        if exprs is None or len(exprs) != len(self.plan.outputs[step]):
+            return None
+        return exprs
+
+    def _find_groups(self):
+        """找出执行顺序中相邻的可融合步骤"""
+        groups, group = [], []
+        for step in range(len(self.plan.runs)):
+            args = [f"a{i}" for i in range(len(self.plan.inputs[step]))]
+            if self._exprs(step, args) is not None:
+                group.append(step)
+                continue
+            if len(group) >= self.min_size:
+                groups.append(group)
+            group = []
+        if len(group) >= self.min_size:
+            groups.append(group)
+        return groups
+
+    def _generate(self, group):
+        """为一组步骤生成函数
+
+        Returns:
+            (FusedRun, 外部输入 ((slot, pin), ...), 输出槽位 (slot, ...))
+        """
+        plan = self.plan
+        name = f"fused_{next(_fused_ids)}"
+        external = []  # 组外的输入 (slot, pin)
+        external_name = {}  # 组外输入的键 -> 变量名
+        produced = {}  # 组内节点输出的槽位 -> 变量名
+        body = []
+        member_slots = []
+        for step in group:
+            args = []
+            for slot, pin in plan.inputs[step]:
+                if slot in produced:
+                    args.append(produced[slot])
+                    continue
+                # 同一个槽位只读取一次；字面值按引脚区分
+                key = slot if slot >= 0 else ("literal", id(pin))
+                if key not in external_name:
+                    external_name[key] = f"a{len(external)}"
+                    external.append((slot, pin))
+                args.append(external_name[key])
+            node = plan.nodes[plan.order[step]]
+            exprs = self._exprs(step, args)
+            body.append(f"    # {node.NodeInfo.node_name} {node.name}")
+            outputs = []
+            for slot, expr in zip(plan.outputs[step], exprs):
+                outputs.append(f"v{slot}")
+                body.append(f"    v{slot} = {expr}")
+            if outputs:
+                # 与 _output[0]==False 相同的停止判断：本节点及之后节点的输出不写入
+                written = [var for slots in member_slots for var in slots]
+                pending = ["None"] * (sum(len(plan.outputs[s]) for s in group) - len(written))
+                body.append(f"    if {outputs[0]} == False:")
+                body.append(f"        return [STOP, {', '.join(written + pending)}]")
+            member_slots.append(outputs)
+            for slot, var in zip(plan.outputs[step], outputs):
+                produced[slot] = var
+        lines = [f"def {name}(_input):"]
+        if external:
+            lines.append(f"    {''.join(var + ', ' for var in external_name.values())}= _input")
+        lines.extend(body)
+        lines.append(f"    return [True, {', '.join(var for slots in member_slots for var in slots)}]")
+        source = "\n".join(lines) + "\n"
+        output_slots = tuple(slot for step in group for slot in plan.outputs[step])
+        return FusedRun(name, source), tuple(external), output_slots
+
+    def fuse(self):
+        """返回融合后的新ExecutionPlan（原计划不变）"""
+        plan = self.plan
+        self.groups = self._find_groups()
+        self.runs = []
+        output_pins = list(plan.output_pins)
+        initial_values = list(plan.initial_values)
+        group_of = {group[0]: group for group in self.groups}
+        skipped = set(step for group in self.groups for step in group[1:])
+
+        order, runs, inputs, outputs = [], [], [], []
+        start_of, end_of = {}, {}  # 原步骤 -> 开始执行它的新步骤 / 执行完它的新步骤
+        for step in range(len(plan.runs)):
+            if step in skipped:
+                continue
+            group = group_of.get(step)
+            if group is None:
+                start_of[step] = end_of[step] = len(runs)
+                order.append(plan.order[step])
+                runs.append(plan.runs[step])
+                inputs.append(plan.inputs[step])
+                outputs.append(plan.outputs[step])
+                continue
+            for member in group:
+                start_of[member] = len(runs)
+                end_of[member] = len(runs) + 1
+            run, external, output_slots = self._generate(group)
+            self.runs.append(run)
+            status_slot = len(output_pins)
+            output_pins.append(None)
+            initial_values.append(None)
+            # 融合步骤记在组内第一个节点下，停止检查记在最后一个节点下
+            order.append(plan.order[group[0]])
+            runs.append(run)
+            inputs.append(external)
+            outputs.append((status_slot,) + output_slots)
+            order.append(plan.order[group[-1]])
+            runs.append(StopIfRun())
+            inputs.append(((status_slot, None),))
+            outputs.append(())
+
+        # 按槽位重新计算步骤之间的依赖，并保留原计划中的依赖（如Optimizer为停止步骤加上的屏障）
+        producer = {}
+        for step, step_outputs in enumerate(outputs):
+            for slot in step_outputs:
+                producer[slot] = step
+        dependencies = [set() for _ in runs]
+        for step, step_successors in enumerate(plan.successors):
+            for succ in step_successors:
+                # 同一融合组内的依赖已在生成的函数中按顺序满足
+                if start_of[step] != start_of[succ] and end_of[step] != start_of[succ]:
+                    dependencies[start_of[succ]].add(end_of[step])
+        successors = [[] for _ in runs]
+        dependency_counts = []
+        for step, step_inputs in enumerate(inputs):
+            deps = sorted(dependencies[step] | set(producer[slot] for slot, _ in step_inputs if slot in producer))
+            for dep in deps:
+                successors[dep].append(step)
+            dependency_counts.append(len(deps))
+        return ExecutionPlan(plan.nodes, order, runs, inputs, outputs, output_pins, successors,
+                             dependency_counts, initial_values)
+
+    def source(self):
+        """所有融合步骤生成的代码"""
+        return "\n".join(run.source for run in self.runs)
+
+    def summary(self):
+        """融合结果摘要"""
+        fused = sum(len(group) for group in self.groups)
+        return f"算子融合: {len(self.groups)} 组，合并 {fused} 个节点"
+
+
+# 每个图对应的 (revision, value_revision, optimize, Fuser, 融合后的ExecutionPlan)
+_fused_cache = weakref.WeakKeyDictionary()
+
+
+def _fused(graph, optimize):
+    """返回图当前的 (Fuser, 融合后的执行计划)，图没有变化时返回缓存的结果"""
+    value_revision = graph.value_revision if optimize else None
+    cached = _fused_cache.get(graph)
+    if cached is not None and cached[:3] == (graph.revision, value_revision, optimize):
+        return cached[3:]
+    if optimize:
+        from .Optimizer import optimized_plan_for
+        plan = optimized_plan_for(graph)
+    else:
+        plan = Run.plan_for(graph)
+    fuser = Fuser(plan)
+    plan = fuser.fuse()
+    _fused_cache[graph] = (graph.revision, value_revision, optimize, fuser, plan)
+    return fuser, plan
+
+
+def fused_plan_for(graph, optimize=False):
+    """返回图当前融合后的执行计划，图没有变化时返回缓存的同一个对象
+
+    Args:
+        graph: CanvasScene或Graph
+        optimize: 是否先用Optimizer优化（优化后的计划还依赖引脚值，按value_revision失效）
+    """
+    return _fused(graph, optimize)[1]
+
+
+def fuser_for(graph, optimize=False):
+    """返回生成 fused_plan_for(graph, optimize) 的Fuser，查看实际执行的融合代码"""
+    return _fused(graph, optimize)[0]
@@ -0,0 +1,248 @@
+from ..WorkflowBinary import read_workflow, strip_legacy_ids  # 读取JSON或二进制工作流（按文件头识别）
+from ..Canvas.Node.CustomNodes import node_dict
+from ..Canvas.Node.RunNodes import Run
+from .GraphIndex import GraphIndex
+
+
+class GraphPin:
+    """无界面引脚 - 提供与NodePin相同的接口（connections/connected/parentItem/uses_link/literal），
+    不创建任何Qt图形项，Run可以直接使用"""
+    def __init__(self, pin_type, data_type, parent, i):
+        self.parent = parent
+        self.pin_type = pin_type  # 'input' or 'output'
+        self.data_type = data_type
+        self.index = i
+        self.id = None  # GraphIndex分配的持久ID
+        self.connected = False
+        self.connections = []
+        self.value = ""  # 输入框中的字面值
+        self.editor = None  # 与画布上的引脚控件对应：'line_edit' / 'combo_box' / 'img' / None
+        # 与NodePin一样共享NodeInfo中的引脚配置，下拉框修改类型时节点的run能读到新类型
+        self.pin_info = getattr(parent.NodeInfo, pin_type)[i]
+        if self.pin_info[1]:
+            if self.pin_info[0] == "none":
+                self.editor = "combo_box"
+                # PinTypeComboBox创建后默认选中第一项"int"
+                self.set_data_type("int")
+            elif self.pin_info[0] == "img":
+                self.editor = "img"
+            else:
+                self.editor = "line_edit"
+
+    def parentItem(self):
+        """与QGraphicsItem.parentItem同名，返回引脚所属节点"""
+        return self.parent
+
+    def set_data_type(self, data_type):
+        """设置下拉框选择的数据类型"""
+        self.data_type = data_type
+        self.pin_info[0] = data_type
+
+    def uses_link(self):
+        """输入引脚是否从连接读取数据（已连接，或为类型下拉框引脚）"""
+        return self.connected or self.editor == "combo_box"
+
+    def literal(self):
+        """返回引脚输入框中的字面值，没有输入框时返回None"""
+        if self.editor == "line_edit":
+            return self.value
+        return None
+
+
+class GraphNode:
+    """无界面节点 - 只保存节点信息和引脚，不创建QGraphicsItem"""
+    def __init__(self, node_type, x=0, y=0):
+        self.NodeInfo = node_dict[node_type].Info()
+        self.name = self.NodeInfo.zh_name
+        self.id = None  # GraphIndex分配的持久ID
+        self.x = x
+        self.y = y
+        self.input_pins = [GraphPin('input', info[0], self, i) for i, info in enumerate(self.NodeInfo.input)]
+        self.output_pins = [GraphPin('output', info[0], self, i) for i, info in enumerate(self.NodeInfo.output)]
+
+
+class GraphConnection:
+    """无界面连接"""
+    def __init__(self, start_pin, end_pin, color=None):
+        self.start_pin = start_pin
+        self.end_pin = end_pin
+        self.color = color
+        self.id = None  # GraphIndex分配的持久ID
+
+
+class Graph:
+    """无界面工作流图 - 直接加载WorkflowIO格式的工作流并执行
+
+    用法：
+        graph = Graph.load("example/1.json")
+        graph.run()
+    """
+    def __init__(self):
+        self.nodes = []
+        self.connections = []
+        self.index = GraphIndex()  # 节点、引脚和连接的持久ID（与CanvasScene.index相同）
+        self.revision = 0  # 图结构版本号，与CanvasScene.revision含义相同
+        self.value_revision = 0  # 引脚值版本号，与CanvasScene.value_revision含义相同
+        self.dirty_nodes = set()  # 输入发生变化、增量执行时需要重新执行的节点
+        self._incremental_runner = None
+
+    def add_node(self, node_type, x=0, y=0, node_id=None, input_pin_ids=(), output_pin_ids=()):
+        """添加节点，node_id和引脚ID为文件中保存的ID（None表示分配新ID）"""
+        node = GraphNode(node_type, x, y)
+        self.nodes.append(node)
+        self.index.add_node(node, node_id, input_pin_ids, output_pin_ids)
+        self.revision += 1
+        return node
+
+    def create_connection(self, start_pin, end_pin, color=None, connection_id=None):
+        """创建连接，输入引脚只能有一个连接"""
+        if end_pin.connected:
+            return None
+        connection = GraphConnection(start_pin, end_pin, color)
+        self.connections.append(connection)
+        self.index.add_connection(connection, connection_id)
+        start_pin.connections.append(connection)
+        end_pin.connections.append(connection)
+        start_pin.connected = True
+        end_pin.connected = True
+        self.revision += 1
+        return connection
+
+    def remove_connection(self, connection):
+        """移除连接（与CanvasScene.remove_connection同名）"""
+        if connection not in self.connections:
+            return
+        self.connections.remove(connection)
+        self.index.remove_connection(connection)
+        for pin in (connection.start_pin, connection.end_pin):
+            pin.connections.remove(connection)
+            pin.connected = bool(pin.connections)
+        self.revision += 1
+
+    def get_all_node(self):
+        """获取所有节点（与CanvasScene.get_all_node同名）"""
+        return self.nodes
+
+    def set_value(self, pin, value):
+        """修改输入框的字面值，并标记节点需要重新执行"""
+        pin.value = value
+        self.mark_dirty(pin.parentItem())
+
+    def mark_dirty(self, node):
+        """标记节点的输入已变化（与CanvasScene.mark_dirty同名）"""
+        self.dirty_nodes.add(node)
+        self.value_revision += 1
+
+    def take_dirty(self):
+        """取出并清空被标记的节点"""
+        nodes, self.dirty_nodes = self.dirty_nodes, set()
+        return nodes
+
+    @staticmethod
+    def _restore_pins(pins, values, combo_values):
+        """恢复引脚的输入框值和下拉框值"""
+        for i, value in enumerate(values):
+            if i < len(pins) and pins[i].editor == "line_edit":
+                pins[i].value = value
+        for i, value in enumerate(combo_values):
+            if i < len(pins) and pins[i].editor == "combo_box" and value:
+                pins[i].set_data_type(value)
+
+    @classmethod
+    def from_data(cls, workflow_data):
+        """从WorkflowIO格式的工作流数据构建图
+
+        Args:
+            workflow_data: 包含nodes和connections的字典，没有持久ID标记时忽略其中的id
+
+        Returns:
+            Graph: 构建好的图
+        """
+        workflow_data = strip_legacy_ids(workflow_data)
+        graph = cls()
+        for node_data in workflow_data['nodes']:
+            node = graph.add_node(node_data['node_type'], node_data.get('x', 0), node_data.get('y', 0),
+                                  node_data.get('id'), node_data.get('input_pin_ids', ()),
+                                  node_data.get('output_pin_ids', ()))
+            node.name = node_data.get('name', node.name)
+            cls._restore_pins(node.input_pins,
+                              node_data.get('input_pin_values', []),
+                              node_data.get('input_pin_combo_values', []))
+            cls._restore_pins(node.output_pins,
+                              node_data.get('output_pin_values', []),
+                              node_data.get('output_pin_combo_values', []))
+
+        for connection_data in workflow_data['connections']:
+            try:
+                start_node = graph.nodes[connection_data['start_node']]
+                end_node = graph.nodes[connection_data['end_node']]
+                start_pin = start_node.output_pins[connection_data['start_pin']]
+                end_pin = end_node.input_pins[connection_data['end_pin']]
+            except (IndexError, KeyError) as e:
+                print(f"跳过无效连接: {e}")
+                continue
+            graph.create_connection(start_pin, end_pin, connection_data.get('color'), connection_data.get('id'))
+        return graph
+
+    @classmethod
+    def load(cls, file_path):
+        """从WorkflowIO保存的JSON或二进制文件加载图"""
+        return cls.from_data(read_workflow(file_path))
+
+    def run(self, optimize=False, fuse=False, compiled=False):
+        """执行工作流，返回Run对象（输出值保存在Run.output_link中）
+
+        Args:
+            optimize: 是否使用Optimizer优化后的执行计划（折叠常量、删除无用节点）
+            fuse: 是否把相邻的可融合纯节点合并为生成的函数执行（Fusion）
+            compiled: 是否把执行计划编译为Python函数执行（Compiler）
+        """
+        if fuse:
+            from .Fusion import fused_plan_for
+            plan = fused_plan_for(self, optimize)
+        elif optimize:
+            from .Optimizer import optimized_plan_for
+            plan = optimized_plan_for(self)
+        else:
+            plan = Run.plan_for(self)
+        if compiled:
+            from .Compiler import CompiledRun
+            runner = CompiledRun.from_graph(self, plan)
+        else:
+            runner = Run(plan=plan)
+        runner.run_node()
+        return runner
+
+    def run_batch(self, columns, size=None):
+        """用多行输入批量执行工作流，返回BatchRun（每个输出引脚的一列结果保存在output_columns中）
+
+        Args:
+            columns: {输入引脚或引脚ID: 一列数据}，引脚ID为保存在工作流文件中的持久ID
+            size: 行数，默认为各列的长度
+        """
+        from .BatchRun import BatchRun
+        pins = {}
+        for key, column in columns.items():
+            pin = self.index.pin(key) if isinstance(key, int) else key
+            if pin is None:
+                raise KeyError(f"引脚ID不存在: {key}")
+            pins[pin] = column
+        return BatchRun(plan=Run.plan_for(self)).run_batch(pins, size)
+
+    def run_profiled(self, profiler=None):
+        """执行工作流并记录每个节点的性能数据，返回Profiler"""
+        return Run.from_graph(self).run_node_profiled(profiler)
+
+    def run_incremental(self):
+        """增量执行：只重新执行输入变化的节点及其下游节点，返回Run对象"""
+        plan = Run.plan_for(self)
+        if self._incremental_runner is None or self._incremental_runner.plan is not plan:
+            # 图结构变化后所有节点都需要重新执行
+            self._incremental_runner = Run(plan=plan)
+        self._incremental_runner.run_incremental(self.take_dirty())
+        return self._incremental_runner
+
+
+def run_workflow(file_path, optimize=False, fuse=False, compiled=False):
+    """加载并执行一个工作流文件"""
+    return Graph.load(file_path).run(optimize, fuse, compiled)
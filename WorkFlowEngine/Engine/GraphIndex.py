@@ -0,0 +1,102 @@
+class GraphIndex:
+    """图索引 - 为节点、引脚和连接分配持久的整数ID，并维护 ID -> 对象 和 引脚 -> 连接 的哈希表
+
+    CanvasScene和Graph在添加/删除节点和连接时更新索引，ID随工作流一起保存，
+    重新加载后保持不变，可以用来按ID查找对象或比较两次保存之间的差异：
+        node = scene.index.node(node_id)
+        connections = scene.index.connections_of(pin)
+
+    节点、引脚和连接共用同一个ID序列，对象上的ID保存在 .id 属性中。
+    """
+    def __init__(self):
+        self.next_id = 1
+        self.nodes = {}  # 节点ID -> 节点
+        self.pins = {}  # 引脚ID -> 引脚
+        self.connections = {}  # 连接ID -> 连接
+        self.pin_connections = {}  # 引脚ID -> [连接, ...]
+
+    def _take_id(self, item_id):
+        """使用指定的ID（加载文件时）或分配新ID"""
+        if item_id is None:
+            item_id = self.next_id
+        if item_id >= self.next_id:
+            self.next_id = item_id + 1
+        return item_id
+
+    def _free(self, item_id):
+        """指定的ID是否可以使用"""
+        return isinstance(item_id, int) and item_id > 0 and item_id not in self.nodes \
+            and item_id not in self.pins and item_id not in self.connections
+
+    def _assign(self, item_id, kind):
+        """使用文件中保存的ID，没有ID（None或0）时分配新ID，ID无效或重复时重新分配并打印提示"""
+        if not item_id:
+            return self._take_id(None)
+        if self._free(item_id):
+            return self._take_id(item_id)
+        new_id = self._take_id(None)
+        print(f"{kind}ID {item_id} 无效或重复，重新分配为 {new_id}")
+        return new_id
+
+    def add_node(self, node, node_id=None, input_pin_ids=(), output_pin_ids=()):
+        """登记节点及其引脚
+
+        Args:
+            node: 节点（Node或GraphNode）
+            node_id: 文件中保存的节点ID，None表示分配新ID
+            input_pin_ids, output_pin_ids: 文件中保存的引脚ID，数量不足的引脚分配新ID
+        """
+        node.id = self._assign(node_id, "节点")
+        self.nodes[node.id] = node
+        for pins, pin_ids in ((node.input_pins, input_pin_ids), (node.output_pins, output_pin_ids)):
+            pin_ids = list(pin_ids)
+            for i, pin in enumerate(pins):
+                pin_id = pin_ids[i] if i < len(pin_ids) else None
+                pin.id = self._assign(pin_id, "引脚")
+                self.pins[pin.id] = pin
+                self.pin_connections[pin.id] = []
+        return node.id
+
+    def remove_node(self, node):
+        """移除节点及其引脚（连接需要先移除）"""
+        self.nodes.pop(node.id, None)
+        for pin in node.input_pins + node.output_pins:
+            self.pins.pop(pin.id, None)
+            self.pin_connections.pop(pin.id, None)
+
+    def add_connection(self, connection, connection_id=None):
+        """登记连接"""
+        connection.id = self._assign(connection_id, "连接")
+        self.connections[connection.id] = connection
+        self.pin_connections[connection.start_pin.id].append(connection)
+        self.pin_connections[connection.end_pin.id].append(connection)
+        return connection.id
+
+    def remove_connection(self, connection):
+        """移除连接"""
+        if self.connections.pop(getattr(connection, 'id', None), None) is None:
+            return
+        for pin in (connection.start_pin, connection.end_pin):
+            connections = self.pin_connections.get(pin.id)
+            if connections is not None and connection in connections:
+                connections.remove(connection)
+
+    def clear(self):
+        """清空索引（ID从1重新开始）"""
+        self.__init__()
+
+    def node(self, node_id):
+        """按ID查找节点，不存在时返回None"""
+        return self.nodes.get(node_id)
+
+    def pin(self, pin_id):
+        """按ID查找引脚，不存在时返回None"""
+        return self.pins.get(pin_id)
+
+    def connection(self, connection_id):
+        """按ID查找连接，不存在时返回None"""
+        return self.connections.get(connection_id)
+
+    def connections_of(self, pin):
+        """与引脚相连的所有连接"""
+        return self.pin_connections.get(pin.id, [])
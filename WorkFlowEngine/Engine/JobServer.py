@@ -0,0 +1,358 @@
+"""本地工作流作业服务 - 通过HTTP（TCP或Unix套接字）提交WorkflowIO格式的工作流并执行
+
+服务维护一个预热的工作进程池：每个工作进程启动时导入所有节点模块，
+并按工作流内容缓存已构建的Graph（执行计划随Graph缓存），同一个工作流反复提交时
+不再解析JSON、创建节点和编译执行计划。
+
+接口（请求和响应均为JSON）：
+    POST /run           提交工作流并等待执行完成，返回结果
+    POST /jobs          提交工作流，立即返回作业ID（202）
+    GET  /jobs/<ID>     查询作业状态和结果
+    GET  /stats         工作进程数和作业统计
+
+请求体就是WorkflowIO保存的JSON（包含nodes和connections）。结果格式：
+    {
+        "id": 1, "status": "done",
+        "outputs": {"<节点ID>": [输出引脚0的值, ...]},   # 无法转换为JSON的值使用repr
+        "stdout": "节点打印的内容",
+        "timing": {"queue": 秒, "load": 秒, "run": 秒, "total": 秒},
+        "worker": 工作进程pid, "cached": 是否复用了缓存的Graph
+    }
+执行出错时 status 为 "error"，error 字段为错误信息。
+
+命令行启动：
+    python -m WorkFlowEngine.Engine.JobServer --port 8765 --workers 4
+    python -m WorkFlowEngine.Engine.JobServer --unix /tmp/workflow.sock
+"""
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError  # Python 3.10中不是内置的TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..Canvas.Node.CustomNodes import node_dict
+from .Graph import Graph
+
+# 工作进程中缓存的Graph数量（按请求体的哈希）
+GRAPH_CACHE_SIZE = 64
+# 保留结果的已完成作业数量，超出后最早完成的作业被丢弃
+FINISHED_JOB_LIMIT = 1000
+# 请求体最大字节数
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+_graph_cache = OrderedDict()  # 工作进程中：请求体哈希 -> Graph
+
+
+def _warm_worker():
+    """工作进程初始化：导入所有节点模块，第一次执行作业时不再有导入开销"""
+    for node_name in node_dict:
+        try:
+            node_dict[node_name]
+        except Exception as e:
+            # 缺少依赖的节点只在使用时报错，不影响其他节点
+            print(f"预热节点 {node_name} 失败: {e}")
+    return os.getpid()
+
+
+def _warm_barrier(barrier):
+    """预热屏障任务：所有工作进程都执行到这里才返回，占住已启动的进程，进程池只能再启动新进程"""
+    barrier.wait()
+    return os.getpid()
+
+
+def _json_value(value):
+    """把节点输出转换为可以写入JSON的值"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _json_value(item) for key, item in value.items()}
+    return repr(value)
+
+
+def _load_graph(body):
+    """按请求体取得Graph，相同的工作流复用工作进程中缓存的Graph
+
+    Returns:
+        (Graph, 是否命中缓存)
+    """
+    key = hashlib.sha1(body).digest()
+    graph = _graph_cache.get(key)
+    if graph is not None:
+        _graph_cache.move_to_end(key)
+        return graph, True
+    workflow_data = json.loads(body)
+    if not isinstance(workflow_data, dict) or 'nodes' not in workflow_data:
+        raise ValueError("请求体不是WorkflowIO格式的工作流（缺少nodes）")
+    workflow_data.setdefault('connections', [])
+    graph = Graph.from_data(workflow_data)
+    _graph_cache[key] = graph
+    if len(_graph_cache) > GRAPH_CACHE_SIZE:
+        _graph_cache.popitem(last=False)
+    return graph, False
+
+
+def run_job(body, submit_time):
+    """在工作进程中执行一个作业
+
+    Args:
+        body: 工作流JSON（bytes）
+        submit_time: 提交时间（time.time()），用于计算排队时间
+
+    Returns:
+        dict: outputs、stdout、timing、worker和cached
+    """
+    start = time.time()
+    clock = time.perf_counter
+    begin = clock()
+    graph, cached = _load_graph(body)
+    loaded = clock()
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        runner = graph.run()
+    finished = clock()
+    outputs = {}
+    for node in graph.nodes:
+        outputs[str(node.id)] = [None] * len(node.output_pins)
+    for pin, value in runner.output_link.items():
+        outputs[str(pin.parentItem().id)][pin.index] = _json_value(value)
+    return {
+        'outputs': outputs,
+        'stdout': stdout.getvalue(),
+        'timing': {
+            'queue': max(0.0, start - submit_time),
+            'load': loaded - begin,
+            'run': finished - loaded,
+        },
+        'worker': os.getpid(),
+        'cached': cached,
+    }
+
+
+class Job:
+    """一个作业的状态"""
+    def __init__(self, job_id, future, submit_time):
+        self.id = job_id
+        self.future = future
+        self.submit_time = submit_time
+        self.finish_time = None
+
+    def to_dict(self):
+        """作业状态和结果"""
+        if not self.future.done():
+            return {'id': self.id, 'status': 'running' if self.future.running() else 'queued'}
+        error = self.future.exception()
+        if error is not None:
+            return {'id': self.id, 'status': 'error', 'error': f"{type(error).__name__}: {error}"}
+        # 完成回调可能还没执行，此时按当前时间计算总耗时
+        finish_time = self.finish_time or time.time()
+        result = dict(self.future.result())
+        result['timing'] = dict(result['timing'], total=finish_time - self.submit_time)
+        result.update(id=self.id, status='done')
+        return result
+
+
+class JobServer:
+    """作业服务 - 管理工作进程池和作业表，也可以不启动HTTP直接在代码中使用：
+
+        server = JobServer(workers=4)
+        job = server.submit(open("example/1.json", "rb").read())
+        print(server.wait(job))
+        server.close()
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        # 每个工作进程启动时由initializer导入所有节点模块，按需启动的进程也会先完成预热
+        self.executor = ProcessPoolExecutor(self.workers, initializer=_warm_worker)
+        self.jobs = {}  # 作业ID -> Job
+        self.finished = OrderedDict()  # 已完成作业的ID，按完成顺序
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.failed = 0
+        self.httpd = None
+        self.warm()
+
+    def warm(self, timeout=60):
+        """启动全部工作进程并等待它们完成预热（导入所有节点模块），返回各进程的pid
+
+        每个工作进程提交一个屏障任务，屏障任务要等所有进程都执行到才返回，
+        进程池只能为剩下的任务启动新进程，直到工作进程数达到workers。
+        """
+        with multiprocessing.Manager() as manager:
+            barrier = manager.Barrier(self.workers, timeout=timeout)
+            futures = [self.executor.submit(_warm_barrier, barrier) for _ in range(self.workers)]
+            return sorted(future.result() for future in futures)
+
+    def submit(self, body):
+        """提交工作流JSON（bytes或str），返回Job"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        submit_time = time.time()
+        with self.lock:
+            job_id = next(self.ids)
+            self.submitted += 1
+            job = Job(job_id, self.executor.submit(run_job, body, submit_time), submit_time)
+            self.jobs[job_id] = job
+        job.future.add_done_callback(lambda future: self._finish(job))
+        return job
+
+    def _finish(self, job):
+        """作业完成：记录完成时间，丢弃超出数量限制的旧作业"""
+        job.finish_time = time.time()
+        with self.lock:
+            if job.future.exception() is not None:
+                self.failed += 1
+            self.finished[job.id] = None
+            while len(self.finished) > FINISHED_JOB_LIMIT:
+                old_id, _ = self.finished.popitem(last=False)
+                self.jobs.pop(old_id, None)
+
+    def get(self, job_id):
+        """按ID查找作业，不存在（或已被丢弃）时返回None"""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def wait(self, job, timeout=None):
+        """等待作业完成并返回结果字典"""
+        try:
+            job.future.exception(timeout)
+        except FutureTimeoutError:
+            pass
+        return job.to_dict()
+
+    def stats(self):
+        """作业统计"""
+        with self.lock:
+            pending = sum(1 for job in self.jobs.values() if not job.future.done())
+            return {'workers': self.workers, 'submitted': self.submitted, 'failed': self.failed,
+                    'pending': pending}
+
+    def serve(self, host="127.0.0.1", port=8765, unix_path=None):
+        """启动HTTP服务并阻塞，直到调用shutdown"""
+        if unix_path:
+            self.httpd = UnixHTTPServer(unix_path, JobRequestHandler)
+            address = unix_path
+        else:
+            self.httpd = ThreadingHTTPServer((host, port), JobRequestHandler)
+            address = f"http://{host}:{self.httpd.server_port}"
+        self.httpd.job_server = self
+        print(f"工作流作业服务已启动: {address}（{self.workers}个工作进程）")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def shutdown(self):
+        """停止HTTP服务（可以从其他线程调用）"""
+        if self.httpd is not None:
+            self.httpd.shutdown()
+
+    def close(self):
+        """关闭工作进程池"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class UnixHTTPServer(ThreadingHTTPServer):
+    """监听Unix套接字的HTTP服务"""
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """作业服务的HTTP请求处理"""
+    protocol_version = "HTTP/1.1"  # 保持连接，高频提交时不必每次重新建立连接
+
+    def _send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        """读取请求体，长度无效时返回None"""
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            return None
+        if length < 0 or length > MAX_BODY_SIZE:
+            return None
+        return self.rfile.read(length)
+
+    def do_POST(self):
+        job_server = self.server.job_server
+        if self.path not in ("/run", "/jobs"):
+            self._send_json(404, {'error': "未知路径"})
+            return
+        body = self._read_body()
+        if body is None:
+            self._send_json(411, {'error': "需要有效的Content-Length"})
+            return
+        job = job_server.submit(body)
+        if self.path == "/jobs":
+            self._send_json(202, {'id': job.id, 'status': 'queued'})
+            return
+        result = job_server.wait(job)
+        self._send_json(200 if result['status'] == 'done' else 500, result)
+
+    def do_GET(self):
+        job_server = self.server.job_server
+        if self.path == "/stats":
+            self._send_json(200, job_server.stats())
+            return
+        match = re.fullmatch(r"/jobs/(\d+)", self.path)
+        if match is None:
+            self._send_json(404, {'error': "未知路径"})
+            return
+        job = job_server.get(int(match.group(1)))
+        if job is None:
+            self._send_json(404, {'error': "作业不存在"})
+            return
+        self._send_json(200, job.to_dict())
+
+    def log_message(self, format, *args):
+        # 高频请求时不逐条打印访问日志
+        pass
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="本地工作流作业服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="监听Unix套接字路径（代替TCP端口）")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数，默认为CPU核数")
+    args = parser.parse_args(argv)
+    server = JobServer(args.workers)
+    try:
+        server.serve(args.host, args.port, args.unix)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import threading
+import time
+from ..Canvas.Node.RunNodes import Run
+
+
+class LoopRun:
+    """循环执行工作流 - 复用已编译的执行计划，按目标帧率重复执行
+
+    用法：
+        loop = LoopRun(Graph.load("flow.json"), target_fps=30)
+        loop.start()            # 在后台线程中循环执行
+        ...
+        loop.stop()
+        print(loop.stats())
+
+    在界面中使用时不调用start，而是由QTimer定时调用step（节点可能需要在GUI线程执行）。
+    """
+    def __init__(self, graph, target_fps=None):
+        """
+        Args:
+            graph: CanvasScene或Graph，图结构变化时自动使用新的执行计划
+            target_fps: 目标每秒迭代次数，None表示尽可能快
+        """
+        self.graph = graph
+        self.target_fps = target_fps
+        self.runner = None
+        self.revision = None
+        self.iterations = 0
+        self.elapsed = 0.0  # 所有迭代累计执行耗时（秒）
+        self.first_time = None  # 第一次迭代开始的时间
+        self.last_time = None  # 最近一次迭代结束的时间
+        self.durations = []  # 每个节点累计耗时
+        self.counts = []  # 每个节点累计执行次数
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _prepare(self):
+        """图结构变化时更新执行计划，并重置节点耗时统计"""
+        if self.runner is None or self.revision != self.graph.revision:
+            self.runner = Run.from_graph(self.graph)
+            self.revision = self.graph.revision
+            self.durations = [0.0] * len(self.runner.plan.runs)
+            self.counts = [0] * len(self.runner.plan.runs)
+
+    def step(self):
+        """执行一次迭代"""
+        self._prepare()
+        start = time.perf_counter()
+        if self.first_time is None:
+            self.first_time = start
+        self.runner.run_node_timed(self.durations, self.counts)
+        self.last_time = time.perf_counter()
+        self.elapsed += self.last_time - start
+        self.iterations += 1
+        return self.runner
+
+    def run(self, max_iterations=None):
+        """在当前线程中循环执行，直到调用stop或达到max_iterations"""
+        self._stop_event.clear()
+        interval = 1.0 / self.target_fps if self.target_fps else 0.0
+        next_time = time.perf_counter()
+        count = 0
+        while not self._stop_event.is_set():
+            if max_iterations is not None and count >= max_iterations:
+                break
+            self.step()
+            count += 1
+            if interval:
+                next_time += interval
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    # 用Event等待，stop时可以立即返回
+                    self._stop_event.wait(delay)
+                else:
+                    # 落后于目标帧率时不追赶，从当前时间重新计时
+                    next_time = time.perf_counter()
+
+    def start(self, max_iterations=None):
+        """在后台线程中循环执行"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, args=(max_iterations,), daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """停止循环，后台线程会在当前迭代结束后退出"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stats(self):
+        """返回执行统计
+
+        Returns:
+            dict: iterations - 迭代次数；
+                  iterations_per_second - 实际达到的每秒迭代次数（包含帧间等待）；
+                  max_iterations_per_second - 只按执行耗时计算的每秒迭代次数；
+                  nodes - 每个节点的执行次数和平均耗时（毫秒）
+        """
+        nodes = []
+        if self.runner is not None:
+            plan = self.runner.plan
+            for step, node_idx in enumerate(plan.order):
+                count = self.counts[step]
+                nodes.append({
+                    'name': plan.nodes[node_idx].name,
+                    'count': count,
+                    'avg_ms': self.durations[step] / count * 1000 if count else 0.0,
+                })
+        wall = self.last_time - self.first_time if self.iterations else 0.0
+        return {
+            'iterations': self.iterations,
+            'iterations_per_second': self.iterations / wall if wall else 0.0,
+            'max_iterations_per_second': self.iterations / self.elapsed if self.elapsed else 0.0,
+            'nodes': nodes,
+        }
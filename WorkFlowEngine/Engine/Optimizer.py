@@ -0,0 +1,180 @@
+import inspect
+import weakref
+from ..Canvas.Node.RunNodes import ExecutionPlan, Run
+
+
+class ConstantRun:
+    """折叠后仍需保留的步骤：直接返回编译时计算出的输出
+
+    只用于输出第一项为False（要求停止执行）的常量节点，保留该步骤才能在原来的位置停止执行。
+    """
+    __slots__ = ("output",)
+
+    def __init__(self, output):
+        self.output = output
+
+    def __call__(self, _input):
+        return self.output
+
+
+def parse_literal(pin, value):
+    """按引脚的数据类型预先解析输入框中的字面值，无法解析时保留原字符串（执行时由节点报错）"""
+    parse = {"int": int, "float": float}.get(pin.data_type)
+    if parse is None or not isinstance(value, str):
+        return value
+    try:
+        return parse(value)
+    except ValueError:
+        return value
+
+
+class Optimizer:
+    """执行计划优化 - 在编译之后、执行之前改写ExecutionPlan
+
+    1. 预先读取并解析引脚字面值：字面值放入常量槽位，int/float引脚的值只解析一次
+    2. 常量折叠：输入全部为常量的纯节点（NodeInfo.pure）在优化时执行一次，输出放入常量槽位
+    3. 删除无用节点：执行顺序中位于所有有副作用的节点（非纯节点）之后的纯节点不再执行，
+       它们的输出不会被使用
+
+    优化后的计划固定了字面值和类型下拉框的选择，修改后需要重新优化（optimized_plan_for按
+    图的value_revision自动处理）。没有折叠的纯节点执行时可能输出False要求停止执行，
+    删除它会让之后的节点照常执行，所以其他纯节点即使输出没有被使用也保留；
+    折叠后输出False的节点保留为常量步骤，作为执行顺序中的屏障：依赖它之前的所有步骤，
+    之后的所有步骤都依赖它，ParallelRun/AsyncRun也在原来的位置停止执行。
+
+    用法：
+        optimizer = Optimizer(Run.plan_for(graph))
+        runner = Run(plan=optimizer.optimize())
+        print(optimizer.summary())
+    """
+    def __init__(self, plan, prune=True, fold=True):
+        """
+        Args:
+            plan: 编译好的ExecutionPlan
+            prune: 是否删除无用的纯节点
+            fold: 是否折叠输入全部为常量的纯节点
+        """
+        self.plan = plan
+        self.prune = prune
+        self.fold = fold
+        self.literal_count = 0  # 预先解析的字面值数量
+        self.folded = []  # 被折叠的节点
+        self.pruned = []  # 被删除的节点
+
+    def _is_pure(self, step):
+        info = self.plan.nodes[self.plan.order[step]].NodeInfo
+        return info.pure and not inspect.iscoroutinefunction(info.run)
+
+    def optimize(self):
+        """返回优化后的新ExecutionPlan（原计划不变）"""
+        plan = self.plan
+        step_count = len(plan.runs)
+        output_pins = list(plan.output_pins)
+        initial_values = list(plan.initial_values)
+        constant = {ExecutionPlan.EMPTY}  # 值在优化时已知的槽位
+
+        # 1. 字面值放入常量槽位
+        inputs = []
+        for step_inputs in plan.inputs:
+            new_inputs = []
+            for slot, pin in step_inputs:
+                if slot == ExecutionPlan.LITERAL:
+                    slot = len(output_pins)
+                    output_pins.append(None)
+                    initial_values.append(parse_literal(pin, pin.literal()))
+                    constant.add(slot)
+                    self.literal_count += 1
+                new_inputs.append((slot, pin))
+            inputs.append(tuple(new_inputs))
+
+        # 2. 常量折叠（按执行顺序，折叠结果可以继续向下游传播）
+        folded = set()
+        stops = {}  # 折叠后要求停止执行的步骤 -> 输出
+        if self.fold:
+            for step in range(step_count):
+                if not self._is_pure(step) or not all(slot in constant for slot, _ in inputs[step]):
+                    continue
+                try:
+                    _output = plan.runs[step]([initial_values[slot] for slot, _ in inputs[step]])
+                except Exception:
+                    # 执行出错的节点不折叠，执行时照常报错
+                    continue
+                if _output and _output[0]==False:
+                    # 原计划执行到这里就会停止，之后的节点不再折叠
+                    stops[step] = _output
+                    break
+                folded.add(step)
+                self.folded.append(plan.nodes[plan.order[step]])
+                for slot, value in zip(plan.outputs[step], _output):
+                    initial_values[slot] = value
+                    constant.add(slot)
+
+        # 3. 从后向前标记需要执行的步骤：非纯节点、停止步骤和它们之前的所有步骤。
+        #    没有折叠的纯节点执行时可能要求停止执行，它之后还有需要执行的步骤时不能删除，
+        #    所以只删除执行顺序中位于最后一个需要执行的步骤之后的纯节点（它们的输出不会被使用）
+        live = [False] * step_count
+        later_live = False  # 之后是否有需要执行的步骤
+        for step in reversed(range(step_count)):
+            if step in folded:
+                continue
+            live[step] = later_live or step in stops or not self._is_pure(step) or not self.prune
+            if live[step]:
+                later_live = True
+            else:
+                self.pruned.append(plan.nodes[plan.order[step]])
+        self.pruned.reverse()
+
+        # 4. 按保留的步骤重建执行计划
+        kept = [step for step in range(step_count) if live[step]]
+        new_step = {step: i for i, step in enumerate(kept)}
+        producer = {}  # 槽位 -> 写入它的新步骤
+        for step in kept:
+            for slot in plan.outputs[step]:
+                producer[slot] = new_step[step]
+        runs, new_inputs, dependencies = [], [], []
+        barrier = None  # 停止步骤的新下标
+        for step in kept:
+            if step in stops:
+                runs.append(ConstantRun(stops[step]))
+                new_inputs.append(())
+                # 常量步骤没有输入，并行执行时会立即调度；顺序执行时它之前的步骤都已执行、之后的都不执行，
+                # 所以让它依赖之前的所有步骤，之后的步骤都依赖它
+                barrier = len(dependencies)
+                dependencies.append(set(range(barrier)))
+            else:
+                runs.append(plan.runs[step])
+                new_inputs.append(inputs[step])
+                deps = set(producer[slot] for slot, _ in inputs[step] if slot in producer)
+                if barrier is not None:
+                    deps.add(barrier)
+                dependencies.append(deps)
+        successors = [[] for _ in kept]
+        for i, deps in enumerate(dependencies):
+            for dep in sorted(deps):
+                successors[dep].append(i)
+        return ExecutionPlan(plan.nodes, [plan.order[step] for step in kept], runs, new_inputs,
+                             [plan.outputs[step] for step in kept], output_pins, successors,
+                             [len(deps) for deps in dependencies], initial_values)
+
+    def summary(self):
+        """优化结果摘要"""
+        return (f"执行计划优化: {len(self.plan.runs)} -> {len(self.plan.runs) - len(self.folded) - len(self.pruned)} 步，"
+                f"折叠 {len(self.folded)} 个节点，删除 {len(self.pruned)} 个节点，预解析 {self.literal_count} 个字面值")
+
+
+# 每个图对应的 (revision, value_revision, 优化后的ExecutionPlan)
+_optimized_cache = weakref.WeakKeyDictionary()
+
+
+def optimized_plan_for(graph):
+    """返回图当前的优化后执行计划，图结构和引脚值都没有变化时返回缓存的同一个对象
+
+    Args:
+        graph: CanvasScene或Graph，需要提供revision、value_revision和get_all_node()
+    """
+    cached = _optimized_cache.get(graph)
+    if cached is not None and cached[0] == graph.revision and cached[1] == graph.value_revision:
+        return cached[2]
+    plan = Optimizer(Run.plan_for(graph)).optimize()
+    _optimized_cache[graph] = (graph.revision, graph.value_revision, plan)
+    return plan
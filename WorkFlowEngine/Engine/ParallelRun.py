@@ -0,0 +1,99 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from ..Canvas.Node.RunNodes import Run
+
+
+class ParallelRun(Run):
+    """并行执行引擎 - 互不依赖的分支同时执行
+
+    节点的输入全部就绪后立即调度，调度位置由 NodeInfo.run_mode 决定：
+        'gui'    - 在调用线程（通常是GUI线程）中直接执行
+        'inline' - 计算量很小的节点，同样在调用线程中直接执行
+        'cpu'    - 配置了进程池时放入进程池，否则放入线程池
+        'io'     - 放入线程池
+    引脚字面值始终在调用线程中读取，工作线程不会接触Qt控件。
+
+    与顺序执行的Run不同：节点要求停止（第一个输出为False）后只是不再调度新节点，
+    依赖它的节点不会执行，但与它互不依赖、执行顺序在它之后的节点可能已经开始或执行完毕
+    （包括副作用和输出值）。需要在停止位置之后什么都不执行时使用Run；
+    Optimizer折叠出的停止步骤是执行顺序中的屏障，不受此影响。
+
+    进程池在第一次执行时创建，之后的执行复用同一个进程池，不再需要时调用close()关闭：
+        with ParallelRun(plan=plan, use_processes=True) as runner:
+            runner.run_node()
+            runner.run_node()
+    """
+    def __init__(self, nodes=None, plan=None, max_workers=None, use_processes=False, executor=None,
+                 process_executor=None):
+        """
+        Args:
+            nodes: 要执行的节点列表
+            plan: 已编译的执行计划
+            max_workers: 线程池/进程池的最大工作数
+            use_processes: 是否为'cpu'节点创建进程池（节点的Info及输入必须可以pickle）
+            executor: 外部提供的线程池，传入时复用而不在每次执行后关闭
+            process_executor: 外部提供的进程池，传入时'cpu'节点放入该进程池，close()不会关闭它
+        """
+        super().__init__(nodes, plan)
+        self.max_workers = max_workers
+        self.use_processes = use_processes or process_executor is not None
+        self.executor = executor
+        self.process_executor = process_executor
+        self._own_process_pool = None  # 自己创建的进程池，多次执行复用，由close()关闭
+
+    def _process_pool(self):
+        """'cpu'节点使用的进程池，没有配置进程池时返回None"""
+        if self.process_executor is not None:
+            return self.process_executor
+        if not self.use_processes:
+            return None
+        if self._own_process_pool is None:
+            self._own_process_pool = ProcessPoolExecutor(self.max_workers)
+        return self._own_process_pool
+
+    def close(self):
+        """关闭自己创建的进程池"""
+        if self._own_process_pool is not None:
+            self._own_process_pool.shutdown(wait=True, cancel_futures=True)
+            self._own_process_pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def run_node(self):
+        """按依赖就绪顺序并行执行节点"""
+        plan = self.plan
+        values = self.values = list(plan.initial_values)
+        remaining = list(plan.dependency_counts)
+        ready = deque(step for step, count in enumerate(remaining) if count == 0)
+        pending = {}  # {future: step}
+        stopped = False
+
+        thread_pool = self.executor or ThreadPoolExecutor(self.max_workers)
+        process_pool = self._process_pool()
+        try:
+            while ready or pending:
+                # 分发所有就绪的节点；某个节点要求停止后不再分发新节点
+                while ready and not stopped:
+                    step = ready.popleft()
+                    _input = [values[slot] if slot >= 0 else pin.literal() for slot, pin in plan.inputs[step]]
+                    run_mode = plan.nodes[plan.order[step]].NodeInfo.run_mode
+                    if run_mode == "gui" or run_mode == "inline":
+                        stopped = not self._release(step, plan.runs[step](_input), remaining, ready)
+                    else:
+                        pool = process_pool if run_mode == "cpu" and process_pool else thread_pool
+                        pending[pool.submit(plan.runs[step], _input)] = step
+                if stopped:
+                    ready.clear()
+                if pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        step = pending.pop(future)
+                        if not self._release(step, future.result(), remaining, ready):
+                            stopped = True
+        finally:
+            if self.executor is None:
+                thread_pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,152 @@
+import json
+import sys
+import time
+import tracemalloc
+
+
+def payload_size(value):
+    """估算节点输出的数据量（字节）
+
+    支持缓冲区协议的对象（bytes、numpy数组等）按实际缓冲区大小计算，
+    ImageValue按像素缓冲区计算，list/tuple逐项累加，其它对象使用sys.getsizeof
+    """
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    buffer = getattr(value, "buffer", None)
+    try:
+        return memoryview(value if buffer is None else buffer).nbytes
+    except TypeError:
+        return sys.getsizeof(value)
+
+
+class NodeProfile:
+    """一个节点一次执行的性能记录"""
+    __slots__ = ("run_index", "step", "node", "name", "start", "wall", "cpu", "alloc", "payload")
+
+    def __init__(self, run_index, step, node, start, wall, cpu, alloc, payload):
+        self.run_index = run_index  # 第几次执行
+        self.step = step  # 执行计划中的步骤
+        self.node = node
+        self.name = node.name
+        self.start = start  # 相对Profiler创建时间的开始时间（秒）
+        self.wall = wall  # 墙钟耗时（秒）
+        self.cpu = cpu  # 当前线程的CPU耗时（秒）
+        self.alloc = alloc  # 执行期间新分配内存的峰值（字节），未跟踪内存时为None
+        self.payload = payload  # 输出数据量（字节）
+
+
+class Profiler:
+    """节点级性能分析器
+
+    记录每次执行中每个节点的墙钟耗时、CPU耗时、内存分配和输出数据量：
+        profiler = Profiler()
+        runner.run_node_profiled(profiler)
+        profiler.summary()                       # 按节点汇总
+        profiler.export_chrome_trace("trace.json")  # 用 chrome://tracing 或 Perfetto 打开
+    """
+    def __init__(self, trace_memory=True):
+        """
+        Args:
+            trace_memory: 是否用tracemalloc统计内存分配（会明显降低执行速度）
+        """
+        self.trace_memory = trace_memory
+        self.records = []
+        self.runs = 0
+        self.origin = time.perf_counter()
+        self._started_tracing = False
+
+    def begin_run(self):
+        """一次执行开始"""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def end_run(self):
+        """一次执行结束"""
+        self.runs += 1
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def measure(self, step, node, run, _input):
+        """执行一个节点并记录性能数据，返回节点的输出"""
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+        _output = run(_input)
+        wall = time.perf_counter() - start
+        cpu = time.thread_time() - cpu_start
+        alloc = tracemalloc.get_traced_memory()[1] - before if tracing else None
+        self.records.append(NodeProfile(self.runs, step, node, start - self.origin, wall, cpu, alloc,
+                                        payload_size(_output)))
+        return _output
+
+    def clear(self):
+        """清空记录"""
+        self.records = []
+        self.runs = 0
+        self.origin = time.perf_counter()
+
+    def summary(self):
+        """按节点汇总，按总耗时从大到小排序
+
+        Returns:
+            list: [{node, name, count, wall_ms, avg_wall_ms, cpu_ms, alloc_bytes, payload_bytes}, ...]
+                  wall_ms/cpu_ms为累计值，alloc_bytes为单次执行的最大值，payload_bytes为最近一次的输出大小
+        """
+        totals = {}
+        for record in self.records:
+            item = totals.get(record.node)
+            if item is None:
+                item = totals[record.node] = {
+                    'node': record.node, 'name': record.name, 'count': 0,
+                    'wall_ms': 0.0, 'cpu_ms': 0.0, 'alloc_bytes': None, 'payload_bytes': 0,
+                }
+            item['count'] += 1
+            item['wall_ms'] += record.wall * 1000
+            item['cpu_ms'] += record.cpu * 1000
+            if record.alloc is not None:
+                item['alloc_bytes'] = max(item['alloc_bytes'] or 0, record.alloc)
+            item['payload_bytes'] = record.payload
+        result = sorted(totals.values(), key=lambda item: item['wall_ms'], reverse=True)
+        for item in result:
+            item['avg_wall_ms'] = item['wall_ms'] / item['count']
+        return result
+
+    def print_summary(self):
+        """打印汇总表"""
+        print(f"{'节点':<12}{'次数':>6}{'平均耗时ms':>12}{'CPU ms':>10}{'内存分配B':>12}{'输出B':>10}")
+        for item in self.summary():
+            alloc = "-" if item['alloc_bytes'] is None else item['alloc_bytes']
+            print(f"{item['name']:<12}{item['count']:>6}{item['avg_wall_ms']:>12.3f}"
+                  f"{item['cpu_ms']:>10.3f}{alloc:>12}{item['payload_bytes']:>10}")
+
+    def to_chrome_trace(self):
+        """转换为Chrome trace-event格式（时间单位为微秒）"""
+        events = []
+        for record in self.records:
+            events.append({
+                'name': record.name,
+                'cat': 'node',
+                'ph': 'X',
+                'ts': record.start * 1e6,
+                'dur': record.wall * 1e6,
+                'pid': 1,
+                'tid': 1,
+                'args': {
+                    'run': record.run_index,
+                    'step': record.step,
+                    'cpu_ms': record.cpu * 1000,
+                    'alloc_bytes': record.alloc,
+                    'payload_bytes': record.payload,
+                },
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, file_path):
+        """导出Chrome trace-event JSON文件"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
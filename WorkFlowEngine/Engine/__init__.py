@@ -0,0 +1,11 @@
+"""无界面执行引擎 - 不依赖画布直接加载并执行工作流"""
+from .Graph import Graph, GraphNode, GraphPin, GraphConnection, run_workflow
+from .GraphIndex import GraphIndex
+from .ParallelRun import ParallelRun
+from .AsyncRun import AsyncRun
+from .LoopRun import LoopRun
+from .BatchRun import BatchRun
+from .Profiler import Profiler
+from .Optimizer import Optimizer, optimized_plan_for
+from .Fusion import Fuser, fused_plan_for, fuser_for
+from .Compiler import WorkflowCompiler, CompiledRun
@@ -0,0 +1,69 @@
+"""命令行执行工作流：python -m WorkFlowEngine.Engine example/1.json [更多文件...] [--trace trace.json] [--optimize] [--fuse] [--show-fused] [--compiled]
+
+把工作流编译为独立的Python模块：python -m WorkFlowEngine.Engine compile example/1.json flow1.py
+"""
+import sys
+from .Graph import Graph, run_workflow
+from .Profiler import Profiler
+from .Fusion import fuser_for
+from .Compiler import compile_workflow
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else list(argv)
+    if args and args[0] == "compile":
+        if len(args) != 3:
+            print("用法: python -m WorkFlowEngine.Engine compile <工作流.json|.wfb> <输出模块.py>")
+            return 1
+        compile_workflow(args[1], args[2])
+        return 0
+    trace_path = None
+    # --optimize 使用折叠常量、删除无用节点后的执行计划
+    optimize = "--optimize" in args
+    if optimize:
+        args.remove("--optimize")
+    # --fuse 把相邻的可融合纯节点合并为生成的函数执行，--show-fused 同时打印生成的代码
+    show_fused = "--show-fused" in args
+    if show_fused:
+        args.remove("--show-fused")
+    fuse = show_fused or "--fuse" in args
+    if "--fuse" in args:
+        args.remove("--fuse")
+    # --compiled 把执行计划编译为Python函数执行
+    compiled = "--compiled" in args
+    if compiled:
+        args.remove("--compiled")
+    if "--trace" in args:
+        # --trace 记录每个节点的性能数据并导出Chrome trace-event JSON
+        index = args.index("--trace")
+        if index + 1 >= len(args):
+            print("--trace 需要指定输出文件")
+            return 1
+        trace_path = args[index + 1]
+        del args[index:index + 2]
+    paths = args
+    if not paths:
+        print("用法: python -m WorkFlowEngine.Engine <工作流.json|.wfb> [...] [--trace trace.json] [--optimize] [--fuse] [--show-fused] [--compiled]")
+        return 1
+    if trace_path is None:
+        for path in paths:
+            if not show_fused:
+                run_workflow(path, optimize, fuse, compiled)
+                continue
+            # 打印的代码与执行的是同一个融合计划（同样经过--optimize）
+            graph = Graph.load(path)
+            fuser = fuser_for(graph, optimize)
+            print(fuser.summary())
+            print(fuser.source())
+            graph.run(optimize, fuse, compiled)
+        return 0
+    profiler = Profiler()
+    for path in paths:
+        Graph.load(path).run_profiled(profiler)
+    profiler.print_summary()
+    profiler.export_chrome_trace(trace_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,16 @@
+import os
 from .Packages import *
 from .Canvas.CanvasWidget import CanvasWidget
 from .Menu.NodeListPanel import NodeListPanel
 from .Canvas.Node.Node import Node, NodePin
-from .Canvas.Node.RunNodes import Run
-from .WorkflowIO import WorkflowIO
+from .Canvas.Node.RunNodes import Run, CycleError
+from .WorkflowIO import WorkflowIO, WorkflowAutosave
+from .Engine.ParallelRun import ParallelRun
+from .Engine.AsyncRun import AsyncRun
+from .Engine.LoopRun import LoopRun
+from .Engine.Profiler import Profiler
+from .Engine.Optimizer import Optimizer
+from .AsyncBridge import QtAsyncBridge
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
 class MainWindow(QMainWindow):
     """主窗口类"""
@@ -65,6 +72,28 @@ class MainWindow(QMainWindow):
         # 初始时折叠侧边栏
         #self.node_list_panel.toggle_collapse()
         
+        # 在Qt事件循环中驱动异步执行
+        self.async_bridge = QtAsyncBridge(parent=self)
+        self.async_bridge.failed.connect(lambda e: print(f"异步执行失败: {e}"))
+        
+        # 循环执行（由定时器在GUI线程中驱动）
+        self.loop_fps = 30  # 循环执行的目标帧率
+        self.loop_runner = None
+        self.loop_timer = QTimer(self)
+        self.loop_timer.timeout.connect(self._loop_step)
+        
+        # 增量执行使用的Run，保留上一次的输出
+        self.incremental_runner = None
+        
+        # 最近一次性能分析的结果
+        self.profiler = None
+        
+        # 保存或导入工作流后，定期增量自动保存到同目录的 <文件名>.autosave.json
+        self.autosave = None
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setInterval(30000)
+        self.autosave_timer.timeout.connect(self._autosave)
+        
         # 添加一些示例节点
         self.canvas.scene.add_node("Start", -400, -300)
     
@@ -106,12 +135,47 @@ class MainWindow(QMainWindow):
         debug_action = edit_menu.addAction("调试输出")
         debug_action.triggered.connect(self.debug_output)
         
+        # 优化执行动作
+        optimized_action = edit_menu.addAction("优化运行")
+        optimized_action.triggered.connect(self.optimized_output)
+        
+        # 增量执行动作
+        incremental_action = edit_menu.addAction("增量运行")
+        incremental_action.triggered.connect(self.incremental_output)
+        
+        # 并行调试输出动作
+        parallel_debug_action = edit_menu.addAction("并行调试输出")
+        parallel_debug_action.triggered.connect(self.parallel_debug_output)
+        
+        # 异步调试输出动作
+        async_debug_action = edit_menu.addAction("异步调试输出")
+        async_debug_action.triggered.connect(self.async_debug_output)
+        
+        # 循环执行动作
+        loop_action = edit_menu.addAction("循环运行")
+        loop_action.triggered.connect(self.start_loop)
+        stop_loop_action = edit_menu.addAction("停止循环")
+        stop_loop_action.triggered.connect(self.stop_loop)
+        
+        # 性能分析动作
+        profile_action = edit_menu.addAction("性能分析")
+        profile_action.triggered.connect(self.profile_output)
+        export_trace_action = edit_menu.addAction("导出执行追踪")
+        export_trace_action.triggered.connect(self.export_trace)
+        clear_profile_action = edit_menu.addAction("清除性能分析")
+        clear_profile_action.triggered.connect(self.canvas.scene.clear_profile)
+        
         # 视图菜单
         view_menu = menubar.addMenu("视图")
         
         # 重置视图动作
         reset_view_action = view_menu.addAction("重置视图")
         reset_view_action.triggered.connect(self.reset_view)
+        
+        # 大图模式动作
+        large_graph_action = view_menu.addAction("大图模式")
+        large_graph_action.setCheckable(True)
+        large_graph_action.toggled.connect(self.canvas.set_large_graph_mode)
     
     def create_tool_bar(self):
         """创建工具栏"""
@@ -141,11 +205,23 @@ class MainWindow(QMainWindow):
     def clear_scene(self):
         """清空场景"""
         self.canvas.scene.clear()
-        self.canvas.scene.connections = []
     
     def new_scene(self):
         """新建场景"""
         self.clear_scene()
+        self.autosave = None
+        self.autosave_timer.stop()
+    
+    def start_autosave(self, file_path):
+        """开始为工作流文件定期自动保存"""
+        autosave_path = os.path.splitext(file_path)[0] + '.autosave.json'
+        self.autosave = WorkflowAutosave(self.canvas.scene, autosave_path)
+        self.autosave_timer.start()
+    
+    def _autosave(self):
+        """定时器回调：只在工作流有变化时写入自动保存文件"""
+        if self.autosave is not None:
+            self.autosave.save()
     
     def reset_view(self):
         """重置视图"""
@@ -169,21 +245,133 @@ class MainWindow(QMainWindow):
     
     def debug_output(self):
         """调试输出节点连接状态"""
-        # 获取场景中的所有节点实例
-        # 遍历场景中的所有图形项，筛选出Node类型的实例
-        nodes = self.canvas.scene.get_all_node()
-        runner = Run(nodes)
+        # 图结构没有变化时复用已编译的执行计划
+        try:
+            runner = Run.from_graph(self.canvas.scene)
+        except CycleError as e:
+            print(e)
+            return
         runner.debug_()
+        self.show_pin_values(runner)
         #print(res)
     
+    def optimized_output(self):
+        """折叠常量、删除无用节点后执行工作流"""
+        try:
+            optimizer = Optimizer(Run.plan_for(self.canvas.scene))
+            runner = Run(plan=optimizer.optimize())
+        except CycleError as e:
+            print(e)
+            return
+        print(optimizer.summary())
+        runner.run_node()
+        self.show_pin_values(runner)
+    
+    def incremental_output(self):
+        """增量执行：只重新执行输入被修改的节点及其下游节点"""
+        scene = self.canvas.scene
+        try:
+            plan = Run.plan_for(scene)
+        except CycleError as e:
+            print(e)
+            return
+        if self.incremental_runner is None or self.incremental_runner.plan is not plan:
+            # 图结构变化后所有节点都需要重新执行
+            self.incremental_runner = Run(plan=plan)
+        self.incremental_runner.run_incremental(scene.take_dirty())
+        self.show_pin_values(self.incremental_runner)
+    
+    def parallel_debug_output(self):
+        """并行执行工作流，互不依赖的分支同时执行"""
+        try:
+            runner = ParallelRun.from_graph(self.canvas.scene)
+        except CycleError as e:
+            print(e)
+            return
+        runner.run_node()
+        self.show_pin_values(runner)
+    
+    def profile_output(self):
+        """执行一次工作流并记录每个节点的性能数据，结果显示在节点下方"""
+        try:
+            runner = Run.from_graph(self.canvas.scene)
+        except CycleError as e:
+            print(e)
+            return
+        self.profiler = runner.run_node_profiled(Profiler())
+        self.show_pin_values(runner)
+        self.canvas.scene.show_profile(self.profiler)
+        self.profiler.print_summary()
+    
+    def export_trace(self):
+        """把最近一次性能分析导出为Chrome trace-event JSON"""
+        if self.profiler is None:
+            print("请先执行性能分析")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "导出执行追踪", "", "Chrome Trace (*.json)")
+        if file_path:
+            if not file_path.endswith('.json'):
+                file_path += '.json'
+            self.profiler.export_chrome_trace(file_path)
+    
+    def show_pin_values(self, runner):
+        """把执行结果显示到引脚控件上（如截图预览）"""
+        for pin, value in zip(runner.plan.output_pins, runner.values):
+            if pin is not None and pin.editor == 'img':
+                pin.show_value(value)
+    
+    def async_debug_output(self):
+        """异步执行工作流，执行期间编辑器保持响应"""
+        if self.async_bridge.is_running():
+            print("工作流正在执行")
+            return
+        try:
+            runner = AsyncRun.from_graph(self.canvas.scene)
+        except CycleError as e:
+            print(e)
+            return
+        self.async_bridge.submit(self._run_async(runner))
+    
+    async def _run_async(self, runner):
+        await runner.run_async()
+        self.show_pin_values(runner)
+    
+    def start_loop(self):
+        """按目标帧率循环执行工作流"""
+        if self.loop_timer.isActive():
+            return
+        self.loop_runner = LoopRun(self.canvas.scene, self.loop_fps)
+        self.loop_timer.start(int(1000 / self.loop_fps) if self.loop_fps else 0)
+    
+    def _loop_step(self):
+        try:
+            runner = self.loop_runner.step()
+        except CycleError as e:
+            print(e)
+            self.stop_loop()
+            return
+        self.show_pin_values(runner)
+    
+    def stop_loop(self):
+        """停止循环执行并输出统计信息"""
+        if not self.loop_timer.isActive():
+            return
+        self.loop_timer.stop()
+        stats = self.loop_runner.stats()
+        print(f"循环执行 {stats['iterations']} 次，{stats['iterations_per_second']:.1f} 次/秒")
+        for node in stats['nodes']:
+            print(f"  {node['name']}: {node['avg_ms']:.3f} ms")
+    
     def save_workflow(self):
         """保存工作流"""
-        file_path, _ = QFileDialog.getSaveFileName(self, "保存工作流", "", "工作流文件 (*.json)")
+        file_path, _ = QFileDialog.getSaveFileName(self, "保存工作流", "", "工作流文件 (*.json);;二进制工作流 (*.wfb)")
         if file_path:
-            if not file_path.endswith('.json'):
+            if not file_path.endswith(('.json', '.wfb')):
                 file_path += '.json'
             
             success = WorkflowIO.save_workflow(self.canvas.scene, file_path)
+            if success:
+                self.start_autosave(file_path)
             #if success:
             #    QMessageBox.information(self, "保存成功", "工作流已成功保存！")
             #else:
@@ -191,9 +379,14 @@ class MainWindow(QMainWindow):
     
     def import_workflow(self):
         """导入工作流"""
-        file_path, _ = QFileDialog.getOpenFileName(self, "导入工作流", "", "工作流文件 (*.json)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "导入工作流", "", "工作流文件 (*.json *.wfb)")
         if file_path:
             success = WorkflowIO.load_workflow(self.canvas.scene, file_path)
+            if success:
+                scene = self.canvas.scene
+                self.statusBar().showMessage(f"导入 {len(scene.nodes)} 个节点、{len(scene.connections)} 条连接，"
+                                             f"用时 {WorkflowIO.last_load_time:.2f} 秒", 5000)
+                self.start_autosave(file_path)
             #if success:
             #    QMessageBox.information(self, "导入成功", "工作流已成功导入！")
             #else:
@@ -0,0 +1,59 @@
+from ..Canvas.Node.CustomNodes import node_dict
+
+
+class NodeDescriptor:
+    """节点类型描述 - 菜单和节点列表显示节点类型所需的信息，由NodeCatalog创建一次后复用"""
+    __slots__ = ("node_name", "zh_name", "input", "output", "run_mode", "pure", "search_key")
+
+    def __init__(self, meta):
+        self.node_name = meta["node_name"]
+        self.zh_name = meta["zh_name"] or self.node_name
+        self.input = meta["input"]
+        self.output = meta["output"]
+        self.run_mode = meta["run_mode"]
+        self.pure = meta["pure"]
+        # 搜索时同时匹配中文名和节点名称（不区分大小写）
+        self.search_key = f"{self.zh_name}\n{self.node_name}".lower()
+
+    def matches(self, text):
+        """是否匹配搜索文本（按空格分隔的每个词都出现在名称中）"""
+        return all(word in self.search_key for word in text.lower().split())
+
+
+class NodeCatalog:
+    """节点类型目录 - 按节点清单的元数据创建一次所有节点类型的描述，不导入节点模块
+
+    右键菜单和节点列表共用同一个目录：
+        catalog = NodeCatalog.instance()
+        for descriptor in catalog.search("加法"):
+            print(descriptor.zh_name, descriptor.node_name)
+    """
+    _instance = None
+
+    def __init__(self, registry=node_dict):
+        self.descriptors = [NodeDescriptor(registry.meta(node_name)) for node_name in registry]
+        self.by_name = {descriptor.node_name: descriptor for descriptor in self.descriptors}
+        self.by_zh_name = {descriptor.zh_name: descriptor for descriptor in self.descriptors}
+
+    @classmethod
+    def instance(cls):
+        """全局共用的目录（第一次使用时创建）"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def get(self, node_name):
+        """按节点名称查找描述，不存在时返回None"""
+        return self.by_name.get(node_name)
+
+    def search(self, text):
+        """按搜索文本过滤节点类型，文本为空时返回全部"""
+        if not text.strip():
+            return list(self.descriptors)
+        return [descriptor for descriptor in self.descriptors if descriptor.matches(text)]
+
+    def __iter__(self):
+        return iter(self.descriptors)
+
+    def __len__(self):
+        return len(self.descriptors)
@@ -1,6 +1,6 @@
 from ..Packages import *
 from . import setStyleSheet
-from ..Canvas.Node.CustomNodes import node_dict
+from .NodeCatalog import NodeCatalog
 class NodeListPanel(QWidget):
     """可折叠的侧边菜单组件 - 节点列表面板"""
     # 定义信号
@@ -35,8 +35,15 @@ class NodeListPanel(QWidget):
         content_layout.setContentsMargins(0, 0, 0, 0)
         content_layout.setSpacing(5)
         
+        # 搜索框
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("搜索节点")
+        self.search_box.setClearButtonEnabled(True)
+        content_layout.addWidget(self.search_box)
+        
         # 节点列表
         self.node_list = NodeListWidget()
+        self.search_box.textChanged.connect(self.node_list.filter)
         content_layout.addWidget(self.node_list)
         
         # 添加内容到主布局
@@ -78,31 +85,43 @@ class NodeListWidget(QListWidget):
     """自定义的节点列表控件，重写拖拽事件以正确设置MIME数据"""
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.search_dic={}
+        self.catalog = NodeCatalog.instance()
         """ self.addItem("加法节点")
         self.addItem("减法节点")
         self.addItem("乘法节点")
         self.addItem("除法节点") """
-        for node_name in node_dict.keys():
-            self.addItem(node_dict[node_name].Info().zh_name)
-            self.search_dic[node_dict[node_name].Info().zh_name]=node_name
+        # 列表项按节点目录创建一次，节点名称保存在列表项的UserRole数据中
+        self.node_items = []
+        for descriptor in self.catalog:
+            self.addItem(descriptor.zh_name)
+            item = self.item(self.count() - 1)
+            item.setData(Qt.ItemDataRole.UserRole, descriptor.node_name)
+            self.node_items.append((descriptor, item))
         self.setAcceptDrops(True)
         self.setDragEnabled(True)
         self.setDragDropMode(QListWidget.DragDropMode.DragOnly)
         self.setDefaultDropAction(Qt.DropAction.CopyAction)
+    def filter(self, text):
+        """按搜索文本隐藏不匹配的节点类型"""
+        text = text.strip()
+        for descriptor, item in self.node_items:
+            hidden = bool(text) and not descriptor.matches(text)
+            if item.isHidden() != hidden:
+                item.setHidden(hidden)
+
     def mimeData(self, items):
         """重写mimeData方法，设置正确的MIME数据"""
         if not items:
             return None
-        # 获取第一个选中项的文本
+        # 获取第一个选中项的节点名称
         item = items[0]
-        node_name = item.text()
+        node_name = item.data(Qt.ItemDataRole.UserRole)
         
         # 创建MIME数据
         mime_data = QMimeData()
         
         # 设置文本数据（作为备用）
-        mime_data.setText(self.search_dic[node_name])
+        mime_data.setText(node_name)
         
         """ # 创建标准的QAbstractItemModel拖拽数据格式
         # 格式：行(4字节) + 列(4字节) + 角色(4字节) + 值长度(4字节) + 值
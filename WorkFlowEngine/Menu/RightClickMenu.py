@@ -1,17 +1,66 @@
-from ..Packages import QMenu
+from ..Packages import QMenu, QLineEdit, QWidgetAction
 from . import setStyleSheet
-from ..Canvas.Node.CustomNodes import node_dict
+from .NodeCatalog import NodeCatalog
 class RightClickMenu(QMenu):
-    def __init__(self, parent,create_new_node):
+    """画布右键菜单 - 创建一次后重复使用
+
+    菜单顶部是搜索框，输入文字时在菜单中直接列出匹配的节点类型；
+    "新建节点"子菜单列出所有节点类型。菜单项只在创建时按NodeCatalog生成一次，
+    每次打开只需要清空搜索框，搜索只切换已有菜单项的可见性。
+    """
+    def __init__(self, parent,create_new_node,catalog=None):
         super().__init__(parent)
         self.setStyleSheet(setStyleSheet)
-    
+        self.catalog = catalog or NodeCatalog.instance()
+        self.create_new_node = create_new_node
+
+        # 搜索框
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("搜索节点")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(self.filter)
+        self.search_box.returnPressed.connect(self.create_first_match)
+        search_action = QWidgetAction(self)
+        search_action.setDefaultWidget(self.search_box)
+        self.addAction(search_action)
+
+        # 搜索结果：每个节点类型一个菜单项，默认隐藏
+        self.result_actions = []
+        for descriptor in self.catalog:
+            action = self.addAction(descriptor.zh_name)
+            action.setVisible(False)
+            action.triggered.connect(lambda checked, name=descriptor.node_name: self.create_new_node(name))
+            self.result_actions.append((descriptor, action))
+        self.separator = self.addSeparator()
+
         # 创建新建节点子菜单
-        new_node_menu = self.addMenu("新建节点")
-        
-        # 在新建节点子菜单下添加加法节点选项
-        for node_name in node_dict.keys():
-            new_node = new_node_menu.addAction(node_dict[node_name].Info().zh_name)
-            new_node.triggered.connect(lambda checked, name=node_name: create_new_node(node_dict[name].Info().node_name))
-        # 可以继续添加其他类型的节点到新建节点子菜单下
-        # self.other_node_action = self.new_node_menu.addAction("其他节点")
+        self.new_node_menu = self.addMenu("新建节点")
+        for descriptor in self.catalog:
+            new_node = self.new_node_menu.addAction(descriptor.zh_name)
+            new_node.triggered.connect(lambda checked, name=descriptor.node_name: self.create_new_node(name))
+        self.matches = []
+
+    def filter(self, text):
+        """按搜索文本显示匹配的节点类型，只改变可见性发生变化的菜单项"""
+        text = text.strip()
+        self.matches = []
+        for descriptor, action in self.result_actions:
+            visible = bool(text) and descriptor.matches(text)
+            if visible:
+                self.matches.append(descriptor)
+            if action.isVisible() != visible:
+                action.setVisible(visible)
+        self.separator.setVisible(bool(self.matches))
+
+    def create_first_match(self):
+        """在搜索框中按回车时创建第一个匹配的节点"""
+        if self.matches:
+            self.create_new_node(self.matches[0].node_name)
+            self.close()
+
+    def popup_at(self, global_pos):
+        """清空搜索框并显示菜单"""
+        self.search_box.clear()
+        self.filter("")
+        self.search_box.setFocus()
+        self.exec(global_pos)
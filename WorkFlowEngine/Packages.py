@@ -4,7 +4,8 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QWidget,
                              QGraphicsRectItem, QGraphicsEllipseItem, 
                              QGraphicsTextItem, QGraphicsLineItem, QStyle,
                              QMenu, QHBoxLayout, QListWidget, QPushButton,
-                             QLineEdit,QGraphicsProxyWidget,QGraphicsPolygonItem,QComboBox
+                             QLineEdit,QGraphicsProxyWidget,QGraphicsPolygonItem,QComboBox,
+                             QGraphicsSimpleTextItem,QWidgetAction
                             )
-from PyQt6.QtCore import Qt, QPointF, QRectF, pyqtSignal, QObject,QTimer,QMimeData
-from PyQt6.QtGui import QPen, QColor, QBrush, QPainter, QFont, QPainterPath, QPainterPathStroker ,QPixmap, QImage
\ No newline at end of file
+from PyQt6.QtCore import Qt, QPointF, QRectF, QSizeF, pyqtSignal, QObject,QTimer,QMimeData
+from PyQt6.QtGui import QPen, QColor, QBrush, QPainter, QFont, QPainterPath, QPainterPathStroker ,QPixmap, QImage, QTransform
\ No newline at end of file
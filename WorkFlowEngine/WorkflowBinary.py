@@ -0,0 +1,292 @@
+"""紧凑的二进制工作流格式（.wfb）
+
+与WorkflowIO的JSON格式保存相同的内容（节点类型、位置、引脚值和连接），
+但字符串只保存一次，连接按uint32数组打包，文件更小、读取更快。
+
+文件结构（小端）：
+    MAGIC                               文件头，load_workflow据此自动识别格式（最后一个字节为版本号）
+    记录*                               每条记录以1字节类型开头
+        b'S' <I长度> utf-8字节           定义字符串，编号按出现顺序从1开始（0固定为空字符串）
+        b'N' <QIIdd> <HH> <QII>*         节点：ID、类型、名称、x、y，输入/输出引脚数，
+                                         每个引脚的(ID, 输入框值, 下拉框值字符串编号)
+        b'C' <I数量> <I>*数量*5 <Q>*数量  一批连接：起始节点、结束节点、起始引脚、结束引脚、颜色字符串编号，
+                                         之后是每条连接的ID
+        b'E'                             文件结束
+ID为GraphIndex分配的持久ID，0表示没有ID。
+
+JSON格式的持久ID以顶层的"persistent_ids": true标记，没有该标记的旧文件中的id是保存时的
+Python id()，读取时忽略（由GraphIndex重新编号）。
+
+写入和读取都是流式的：WorkflowWriter逐个写入节点和连接，
+WorkflowReader逐条产出与JSON格式相同的node_data/connection_data字典。
+
+命令行转换：
+    python -m WorkFlowEngine.WorkflowBinary example/1.json example/1.wfb
+    python -m WorkFlowEngine.WorkflowBinary example/1.wfb example/1.json
+    python -m WorkFlowEngine.WorkflowBinary example             # 把目录中的所有.json转换为.wfb
+"""
+import json
+import os
+import struct
+import sys
+from array import array
+from itertools import zip_longest
+
+MAGIC = b"WFB\x01"
+_MAGIC_PREFIX = MAGIC[:3]
+
+# JSON工作流中标记id字段为GraphIndex持久ID的顶层键
+PERSISTENT_IDS = "persistent_ids"
+_ID_KEYS = ('id', 'input_pin_ids', 'output_pin_ids')
+
+_STRING = b"S"
+_NODE = b"N"
+_CONNECTIONS = b"C"
+_END = b"E"
+
+_u32 = struct.Struct("<I")
+_node_head = struct.Struct("<QIIddHH")
+_pin = struct.Struct("<QII")
+
+# 连接数组中每条连接占用的uint32个数
+_CONNECTION_FIELDS = 5
+
+
+def _without_ids(data):
+    """去掉节点/连接数据中的ID字段"""
+    return {key: value for key, value in data.items() if key not in _ID_KEYS}
+
+
+def strip_legacy_ids(workflow_data):
+    """没有持久ID标记的工作流数据去掉所有ID（旧文件中的id是保存时的Python id()，不能作为持久ID）
+
+    Returns:
+        带有持久ID标记的工作流数据（有标记时原样返回）
+    """
+    if workflow_data.get(PERSISTENT_IDS):
+        return workflow_data
+    return {
+        'nodes': [_without_ids(node_data) for node_data in workflow_data['nodes']],
+        'connections': [_without_ids(connection_data) for connection_data in workflow_data['connections']],
+        PERSISTENT_IDS: True,
+    }
+
+
+def _u32s(data, typecode='I'):
+    """把小端字节串解码为uint32（typecode为'Q'时为uint64）数组"""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+class WorkflowWriter:
+    """流式写入二进制工作流
+
+    用法：
+        with open(path, 'wb') as f:
+            writer = WorkflowWriter(f)
+            for node_data in nodes:
+                writer.write_node(node_data)
+            writer.write_connections(connections)
+            writer.close()
+    """
+    def __init__(self, f):
+        self.f = f
+        self.strings = {"": 0}  # 已写入的字符串 -> 编号
+        self.node_count = 0
+        f.write(MAGIC)
+
+    def _ref(self, text):
+        """返回字符串编号，第一次出现时先写入字符串定义记录"""
+        ref = self.strings.get(text)
+        if ref is None:
+            ref = self.strings[text] = len(self.strings)
+            data = str(text).encode('utf-8')
+            self.f.write(_STRING + _u32.pack(len(data)) + data)
+        return ref
+
+    def _pins(self, ids, values, combo_values):
+        """每个引脚的(ID, 输入框值, 下拉框值)，列表长度不同时用0和空字符串补齐"""
+        return [(pin_id or 0, self._ref(value), self._ref(combo)) for pin_id, value, combo in
+                zip_longest(ids, values, combo_values, fillvalue="")]
+
+    def write_node(self, node_data):
+        """写入一个节点（与JSON格式相同的node_data字典）"""
+        inputs = self._pins(node_data.get('input_pin_ids', ()), node_data.get('input_pin_values', ()),
+                            node_data.get('input_pin_combo_values', ()))
+        outputs = self._pins(node_data.get('output_pin_ids', ()), node_data.get('output_pin_values', ()),
+                             node_data.get('output_pin_combo_values', ()))
+        node_type = self._ref(node_data['node_type'])
+        name = self._ref(node_data.get('name', ""))
+        parts = [_NODE, _node_head.pack(node_data.get('id') or 0, node_type, name,
+                                         node_data.get('x', 0), node_data.get('y', 0),
+                                         len(inputs), len(outputs))]
+        parts.extend(_pin.pack(*refs) for refs in inputs + outputs)
+        self.f.write(b"".join(parts))
+        self.node_count += 1
+
+    def write_connections(self, connections):
+        """写入一批连接（与JSON格式相同的connection_data字典）"""
+        packed = array('I')
+        ids = array('Q')
+        for connection_data in connections:
+            packed.extend((connection_data['start_node'], connection_data['end_node'],
+                           connection_data['start_pin'], connection_data['end_pin'],
+                           self._ref(connection_data.get('color') or "")))
+            ids.append(connection_data.get('id') or 0)
+        if sys.byteorder != 'little':
+            packed.byteswap()
+            ids.byteswap()
+        self.f.write(_CONNECTIONS + _u32.pack(len(ids)))
+        self.f.write(packed.tobytes())
+        self.f.write(ids.tobytes())
+
+    def close(self):
+        """写入结束标记（不关闭文件）"""
+        self.f.write(_END)
+
+
+class WorkflowReader:
+    """流式读取二进制工作流
+
+    迭代时逐条产出 ('node', node_data) 或 ('connection', connection_data)，
+    字典格式与WorkflowIO保存的JSON相同。
+    """
+    def __init__(self, f):
+        self.f = f
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("不是二进制工作流文件，或版本不支持")
+        self.strings = [""]
+
+    def _read(self, size):
+        data = self.f.read(size)
+        if len(data) != size:
+            raise ValueError("二进制工作流文件不完整")
+        return data
+
+    def __iter__(self):
+        strings = self.strings
+        read = self._read
+        while True:
+            tag = read(1)
+            if tag == _NODE:
+                node_id, node_type, name, x, y, input_count, output_count = _node_head.unpack(
+                    read(_node_head.size))
+                pins = list(_pin.iter_unpack(read(_pin.size * (input_count + output_count))))
+                pin_ids = [pin_id for pin_id, _, _ in pins]
+                # 引脚字符串编号按 输入框值, 下拉框值 交替排列，先输入引脚后输出引脚
+                refs = [strings[ref] for _, value, combo in pins for ref in (value, combo)]
+                split = input_count * 2
+                node_data = {
+                    'name': strings[name],
+                    'x': x,
+                    'y': y,
+                    'node_type': strings[node_type],
+                    'input_pin_values': refs[0:split:2],
+                    'output_pin_values': refs[split::2],
+                    'input_pin_combo_values': refs[1:split:2],
+                    'output_pin_combo_values': refs[split + 1::2],
+                }
+                if node_id:
+                    node_data['id'] = node_id
+                    node_data['input_pin_ids'] = pin_ids[:input_count]
+                    node_data['output_pin_ids'] = pin_ids[input_count:]
+                yield 'node', node_data
+            elif tag == _STRING:
+                size, = _u32.unpack(read(_u32.size))
+                strings.append(read(size).decode('utf-8'))
+            elif tag == _CONNECTIONS:
+                count, = _u32.unpack(read(_u32.size))
+                packed = _u32s(read(count * _CONNECTION_FIELDS * _u32.size))
+                ids = _u32s(read(count * 8), 'Q')
+                # 按列取出后逐条组合，避免逐个下标访问
+                columns = [packed[i::_CONNECTION_FIELDS] for i in range(_CONNECTION_FIELDS)]
+                for start_node, end_node, start_pin, end_pin, color, connection_id in zip(*columns, ids):
+                    connection_data = {
+                        'start_node': start_node,
+                        'end_node': end_node,
+                        'start_pin': start_pin,
+                        'end_pin': end_pin,
+                        'color': strings[color],
+                    }
+                    if connection_id:
+                        connection_data['id'] = connection_id
+                    yield 'connection', connection_data
+            elif tag == _END:
+                return
+            else:
+                raise ValueError(f"二进制工作流文件中有未知记录: {tag!r}")
+
+
+def dump(workflow_data, f):
+    """把工作流数据（nodes和connections）写入二进制文件对象"""
+    writer = WorkflowWriter(f)
+    for node_data in workflow_data['nodes']:
+        writer.write_node(node_data)
+    writer.write_connections(workflow_data['connections'])
+    writer.close()
+
+
+def iter_workflow(file_path):
+    """逐条读取工作流文件（自动识别JSON或二进制格式）
+
+    Yields:
+        ('node', node_data) 或 ('connection', connection_data)，节点全部在连接之前
+    """
+    with open(file_path, 'rb') as f:
+        if f.read(len(MAGIC))[:3] == _MAGIC_PREFIX:
+            f.seek(0)
+            yield from WorkflowReader(f)
+            return
+    with open(file_path, 'r', encoding='utf-8') as f:
+        workflow_data = strip_legacy_ids(json.load(f))
+    for node_data in workflow_data['nodes']:
+        yield 'node', node_data
+    for connection_data in workflow_data['connections']:
+        yield 'connection', connection_data
+
+
+def read_workflow(file_path):
+    """读取整个工作流文件（自动识别格式），返回包含nodes和connections的字典"""
+    # iter_workflow已去掉旧文件中的ID，剩下的都是持久ID
+    workflow_data = {'nodes': [], 'connections': [], PERSISTENT_IDS: True}
+    for kind, data in iter_workflow(file_path):
+        workflow_data['nodes' if kind == 'node' else 'connections'].append(data)
+    return workflow_data
+
+
+def convert(source_path, target_path):
+    """转换工作流文件格式：目标文件扩展名为.json时写JSON，否则写二进制"""
+    workflow_data = read_workflow(source_path)
+    if target_path.endswith('.json'):
+        with open(target_path, 'w', encoding='utf-8') as f:
+            json.dump(workflow_data, f, indent=4, ensure_ascii=False)
+    else:
+        with open(target_path, 'wb') as f:
+            dump(workflow_data, f)
+
+
+def convert_directory(folder):
+    """把目录中的所有JSON工作流转换为同名的.wfb文件，返回转换的文件数"""
+    count = 0
+    for name in sorted(os.listdir(folder)):
+        if name.endswith('.json'):
+            source_path = os.path.join(folder, name)
+            target_path = source_path[:-len('.json')] + '.wfb'
+            convert(source_path, target_path)
+            print(f"{source_path} -> {target_path}（{os.path.getsize(source_path)} -> {os.path.getsize(target_path)} 字节）")
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and os.path.isdir(sys.argv[1]):
+        convert_directory(sys.argv[1])
+    elif len(sys.argv) == 3:
+        convert(sys.argv[1], sys.argv[2])
+    else:
+        print("用法: python -m WorkFlowEngine.WorkflowBinary <源文件> <目标文件(.wfb或.json)>")
+        print("      python -m WorkFlowEngine.WorkflowBinary <目录>")
+        sys.exit(1)
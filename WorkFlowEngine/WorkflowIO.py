@@ -1,25 +1,109 @@
 # 导入所需的库和模块
 import json  # 用于JSON格式的数据序列化和反序列化
 import os    # 用于文件路径操作
+import time  # 用于统计导入耗时
 from .Packages import *  # 导入项目中的所有包和模块
-from .Canvas.Node.CustomNodes.pin_colors import pin_colors  # 导入引脚颜色配置
 from .Canvas.Node.Node import Node  # 导入节点类
 from .Canvas.Node.ConnectionLine import ConnectionLine  # 导入连接线类
+from . import WorkflowBinary  # 紧凑的二进制工作流格式
 
 class WorkflowIO:
     """工作流输入输出类 - 负责保存和导入工作流
     
     该类提供了两个主要功能：
-    1. save_workflow - 将当前工作流保存为JSON文件
-    2. load_workflow - 从JSON文件加载工作流
+    1. save_workflow - 将当前工作流保存为JSON文件（扩展名为.wfb时保存为二进制格式）
+    2. load_workflow - 从JSON或二进制文件加载工作流（按文件头自动识别）
     """
+    last_load_time = None  # 最近一次导入工作流的耗时（秒）
+    
+    @staticmethod
+    def _pin_values(pins):
+        """收集引脚的文本值和下拉框值（值保存在引脚上，不需要读取控件）
+        
+        Returns:
+            tuple: (文本值列表, 下拉框值列表)，没有对应控件的引脚为空字符串
+        """
+        values = []
+        combo_values = []
+        for pin in pins:
+            values.append(pin.value if pin.editor == 'line_edit' else "")
+            combo_values.append(pin.data_type if pin.editor == 'combo_box' else "")
+        return values, combo_values
+    
+    @staticmethod
+    def node_data(node):
+        """构建节点数据字典，包含节点的所有必要信息"""
+        input_pin_values, input_pin_combo_values = WorkflowIO._pin_values(node.input_pins)
+        output_pin_values, output_pin_combo_values = WorkflowIO._pin_values(node.output_pins)
+        pos = node.pos()
+        return {
+            'id': node.id,  # 节点的持久ID（GraphIndex）
+            'name': node.name,  # 节点名称
+            'x': pos.x(),  # 节点在场景中的X坐标
+            'y': pos.y(),  # 节点在场景中的Y坐标
+            'node_type': node.NodeInfo.node_name,  # 节点类型
+            'input_pin_values': input_pin_values,  # 输入引脚的文本值
+            'output_pin_values': output_pin_values,  # 输出引脚的文本值
+            'input_pin_combo_values': input_pin_combo_values,  # 输入引脚的下拉框值
+            'output_pin_combo_values': output_pin_combo_values,  # 输出引脚的下拉框值
+            'input_pin_ids': [pin.id for pin in node.input_pins],  # 输入引脚的持久ID
+            'output_pin_ids': [pin.id for pin in node.output_pins]  # 输出引脚的持久ID
+        }
+    
+    @staticmethod
+    def connection_data(scene, node_to_index):
+        """按scene.connections的顺序构建连接数据列表
+        
+        节点索引从node_to_index中查找，引脚索引直接读取pin.index，整个过程是线性的
+        """
+        connections = []
+        # 使用集合来跟踪已保存的连接，避免重复保存相同的连接
+        saved_connections = set()
+        for connection in scene.connections:
+            # 检查节点是否在映射中
+            start_node_index = node_to_index.get(connection.start_pin.parentItem())
+            end_node_index = node_to_index.get(connection.end_pin.parentItem())
+            if start_node_index is None or end_node_index is None:
+                continue
+            
+            # 创建连接的唯一标识符，用于检查重复连接
+            connection_id = (start_node_index, end_node_index, connection.start_pin.index, connection.end_pin.index)
+            if connection_id in saved_connections:
+                continue  # 跳过重复连接
+            saved_connections.add(connection_id)
+            
+            # 构建连接数据字典，包含连接的所有必要信息
+            connections.append({
+                'id': connection.id,  # 连接的持久ID
+                'start_node': start_node_index,  # 起始节点索引
+                'end_node': end_node_index,      # 结束节点索引
+                'start_pin': connection.start_pin.index,    # 起始引脚索引
+                'end_pin': connection.end_pin.index,        # 结束引脚索引
+                'color': connection.color.name() # 连接线颜色
+            })
+        return connections
+    
+    @staticmethod
+    def workflow_data(scene):
+        """构建工作流数据字典，包含所有节点和连接信息
+        
+        节点按scene.nodes的顺序保存，节点索引即在该列表中的位置
+        """
+        nodes = scene.nodes
+        node_to_index = {node: index for index, node in enumerate(nodes)}
+        return {
+            WorkflowBinary.PERSISTENT_IDS: True,  # id字段为GraphIndex的持久ID
+            'nodes': [WorkflowIO.node_data(node) for node in nodes],          # 节点数据列表
+            'connections': WorkflowIO.connection_data(scene, node_to_index)  # 连接数据列表
+        }
     
     @staticmethod
     def save_workflow(scene, file_path):
         """保存工作流到文件
         
         该方法将当前场景中的所有节点和连接线信息保存为JSON格式的文件，
-        以便后续可以重新加载工作流。
+        以便后续可以重新加载工作流。文件扩展名为.wfb时使用WorkflowBinary的二进制格式。
+        只遍历scene.nodes和scene.connections各一次，耗时与节点数和连接数成正比。
         
         Args:
             scene: CanvasScene对象，包含所有节点和连接
@@ -29,129 +113,16 @@ class WorkflowIO:
             bool: 保存是否成功
         """
         try:
-            # 获取场景中的所有节点，并建立节点到索引的映射
-            nodes = []
-            node_to_index = {}  # 节点对象到索引的映射
+            workflow_data = WorkflowIO.workflow_data(scene)
             
-            for item in scene.items():
-                # 检查场景中的每个项目是否是节点对象
-                if isinstance(item, Node):
-                    # 为节点分配索引
-                    node_index = len(nodes)
-                    node_to_index[item] = node_index
-                    
-                    # 收集输入引脚的文本值和下拉框值
-                    input_pin_values = []  # 存储输入引脚的文本值
-                    input_pin_combo_values = []  # 存储输入引脚的下拉框选择值
-                    for pin in item.input_pins:
-                        # 检查引脚是否有文本输入框
-                        if pin.line_edit:
-                            input_pin_values.append(pin.line_edit.text())
-                            input_pin_combo_values.append("")
-                        # 检查引脚是否有下拉选择框
-                        elif pin.combo_box:
-                            input_pin_values.append("")
-                            input_pin_combo_values.append(pin.combo_box.currentText())
-                        # 如果引脚既没有文本输入框也没有下拉框，则添加空值
-                        else:
-                            input_pin_values.append("")
-                            input_pin_combo_values.append("")
-                    
-                    # 收集输出引脚的文本值和下拉框值
-                    output_pin_values = []  # 存储输出引脚的文本值
-                    output_pin_combo_values = []  # 存储输出引脚的下拉框选择值
-                    for pin in item.output_pins:
-                        # 检查引脚是否有文本输入框
-                        if pin.line_edit:
-                            output_pin_values.append(pin.line_edit.text())
-                            output_pin_combo_values.append("")
-                        # 检查引脚是否有下拉选择框
-                        elif pin.combo_box:
-                            output_pin_values.append("")
-                            output_pin_combo_values.append(pin.combo_box.currentText())
-                        # 如果引脚既没有文本输入框也没有下拉框，则添加空值
-                        else:
-                            output_pin_values.append("")
-                            output_pin_combo_values.append("")
-                    
-                    # 构建节点数据字典，包含节点的所有必要信息
-                    node_data = {
-                        'name': item.name,  # 节点名称
-                        'x': item.pos().x(),  # 节点在场景中的X坐标
-                        'y': item.pos().y(),  # 节点在场景中的Y坐标
-                        'node_type': item.NodeInfo.node_name,  # 节点类型
-                        'input_pin_values': input_pin_values,  # 输入引脚的文本值
-                        'output_pin_values': output_pin_values,  # 输出引脚的文本值
-                        'input_pin_combo_values': input_pin_combo_values,  # 输入引脚的下拉框值
-                        'output_pin_combo_values': output_pin_combo_values  # 输出引脚的下拉框值
-                    }
-                    nodes.append(node_data)  # 将节点数据添加到节点列表
-            
-            # 获取场景中的所有连接
-            connections = []
-            # 使用集合来跟踪已保存的连接，避免重复保存相同的连接
-            saved_connections = set()
-            
-            # 遍历场景中的所有连接
-            for connection in scene.connections:
-                # 获取起始节点和结束节点
-                start_node = connection.start_pin.parentItem()
-                end_node = connection.end_pin.parentItem()
-                
-                # 检查节点是否在映射中
-                if start_node not in node_to_index or end_node not in node_to_index:
-                    continue
-                
-                start_node_index = node_to_index[start_node]
-                end_node_index = node_to_index[end_node]
-                
-                # 获取引脚索引
-                start_pin_index = -1
-                end_pin_index = -1
-                
-                # 查找起始引脚在起始节点输出引脚列表中的索引
-                for i, pin in enumerate(start_node.output_pins):
-                    if pin == connection.start_pin:
-                        start_pin_index = i
-                        break
-                
-                # 查找结束引脚在结束节点输入引脚列表中的索引
-                for i, pin in enumerate(end_node.input_pins):
-                    if pin == connection.end_pin:
-                        end_pin_index = i
-                        break
-                
-                # 如果找到了起始引脚和结束引脚
-                if start_pin_index != -1 and end_pin_index != -1:
-                    # 创建连接的唯一标识符，用于检查重复连接
-                    connection_id = (start_node_index, end_node_index, start_pin_index, end_pin_index)
-                    
-                    # 检查是否已经保存了相同的连接
-                    if connection_id in saved_connections:
-                        continue  # 跳过重复连接
-                    
-                    # 将连接添加到已保存连接集合中
-                    saved_connections.add(connection_id)
-                    
-                    # 构建连接数据字典，包含连接的所有必要信息
-                    connection_data = {
-                        'start_node': start_node_index,  # 起始节点索引
-                        'end_node': end_node_index,      # 结束节点索引
-                        'start_pin': start_pin_index,    # 起始引脚索引
-                        'end_pin': end_pin_index,        # 结束引脚索引
-                        'color': connection.color.name() # 连接线颜色
-                    }
-                    connections.append(connection_data)  # 将连接数据添加到连接列表
-            
-            # 构建工作流数据字典，包含所有节点和连接信息
-            workflow_data = {
-                'nodes': nodes,          # 节点数据列表
-                'connections': connections  # 连接数据列表
-            }
-            
-            # 将工作流数据保存到JSON文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(workflow_data, f, indent=4, ensure_ascii=False)  # 使用UTF-8编码，缩进4个空格，不转义ASCII字符
+            if file_path.endswith('.wfb'):
+                # 保存为二进制格式
+                with open(file_path, 'wb') as f:
+                    WorkflowBinary.dump(workflow_data, f)
+            else:
+                # 将工作流数据保存到JSON文件
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    json.dump(workflow_data, f, indent=4, ensure_ascii=False)  # 使用UTF-8编码，缩进4个空格，不转义ASCII字符
             
             return True  # 保存成功，返回True
         except Exception as e:
@@ -159,11 +130,30 @@ class WorkflowIO:
             print(f"保存工作流失败: {e}")
             return False  # 保存失败，返回False
     
+    @staticmethod
+    def _restore_pin_values(node, node_data):
+        """恢复节点引脚的文本值和下拉框值"""
+        for pins, values_key, combo_key in ((node.input_pins, 'input_pin_values', 'input_pin_combo_values'),
+                                            (node.output_pins, 'output_pin_values', 'output_pin_combo_values')):
+            # 恢复引脚的文本值（确保索引在范围内且引脚有文本输入框）
+            for pin, value in zip(pins, node_data.get(values_key, ())):
+                if pin.editor == 'line_edit':
+                    pin.set_value(value)
+            # 恢复引脚的下拉框值（不在下拉框选项中的值会被忽略）
+            for pin, value in zip(pins, node_data.get(combo_key, ())):
+                if pin.editor == 'combo_box' and value:
+                    pin.set_data_type(value)
+    
     @staticmethod
     def load_workflow(scene, file_path):
         """从文件导入工作流
         
-        该方法从JSON文件中读取工作流数据，并在场景中重建节点和连接线。
+        该方法从JSON或二进制文件中读取工作流数据（WorkflowBinary.iter_workflow按文件头识别格式，
+        二进制文件边读取边创建节点），并在场景中重建节点和连接线。
+        所有节点和连接线先在场景外创建，连接按节点/引脚索引直接查找，
+        最后通过scene.add_items_bulk一次性加入场景（插入期间关闭索引和视图刷新），
+        文件中保存的ID也在这时登记；导入失败时清空场景，不会留下只导入了一部分的工作流。
+        导入耗时保存在WorkflowIO.last_load_time中。
         
         Args:
             scene: CanvasScene对象，用于导入节点和连接
@@ -173,92 +163,32 @@ class WorkflowIO:
             bool: 导入是否成功
         """
         try:
+            start_time = time.perf_counter()
             # 清空当前场景，为导入新工作流做准备
-            scene.clear()  # 清除场景中的所有项目
-            scene.connections = []  # 清空连接列表
-            
-            # 从JSON文件中读取工作流数据
-            with open(file_path, 'r', encoding='utf-8') as f:
-                workflow_data = json.load(f)  # 加载JSON数据
+            scene.clear()  # 清除场景中的所有项目、节点列表和连接列表
             
-            # 导入节点
-            nodes = []  # 用于存储创建的节点对象
-            for node_data in workflow_data['nodes']:
-                # 根据节点类型和位置在场景中创建节点
-                node = scene.add_node(node_data['node_type'], node_data['x'], node_data['y'])
-                
-                # 恢复输入引脚的文本值
-                if 'input_pin_values' in node_data:
-                    for i, value in enumerate(node_data['input_pin_values']):
-                        # 确保索引在范围内且引脚有文本输入框
-                        if i < len(node.input_pins) and node.input_pins[i].line_edit:
-                            node.input_pins[i].line_edit.setText(value)  # 设置文本值
-                
-                # 恢复输入引脚的下拉框值
-                if 'input_pin_combo_values' in node_data:
-                    for i, value in enumerate(node_data['input_pin_combo_values']):
-                        # 确保索引在范围内且引脚有下拉框且值不为空
-                        if i < len(node.input_pins) and node.input_pins[i].combo_box and value:
-                            index = node.input_pins[i].combo_box.findText(value)  # 查找值在下拉框中的索引
-                            if index >= 0:
-                                node.input_pins[i].combo_box.setCurrentIndex(index)  # 设置下拉框当前索引
-                                # 更新引脚颜色以反映数据类型
-                                node.input_pins[i].data_type = value
-                                node.input_pins[i].color = pin_colors[value]
-                                node.input_pins[i].update_appearance()  # 更新引脚外观
-                
-                # 恢复输出引脚的文本值
-                if 'output_pin_values' in node_data:
-                    for i, value in enumerate(node_data['output_pin_values']):
-                        # 确保索引在范围内且引脚有文本输入框
-                        if i < len(node.output_pins) and node.output_pins[i].line_edit:
-                            node.output_pins[i].line_edit.setText(value)  # 设置文本值
-                
-                # 恢复输出引脚的下拉框值
-                if 'output_pin_combo_values' in node_data:
-                    for i, value in enumerate(node_data['output_pin_combo_values']):
-                        # 确保索引在范围内且引脚有下拉框且值不为空
-                        if i < len(node.output_pins) and node.output_pins[i].combo_box and value:
-                            index = node.output_pins[i].combo_box.findText(value)  # 查找值在下拉框中的索引
-                            if index >= 0:
-                                node.output_pins[i].combo_box.setCurrentIndex(index)  # 设置下拉框当前索引
-                                # 更新引脚颜色以反映数据类型
-                                node.output_pins[i].data_type = value
-                                node.output_pins[i].color = pin_colors[value]
-                                node.output_pins[i].update_appearance()  # 更新引脚外观
-                
-                nodes.append(node)  # 将创建的节点添加到节点列表
-            
-            # 导入连接
+            nodes = []  # 用于存储创建的节点对象，列表下标即文件中的节点索引
+            node_ids = []  # 与nodes对应的文件中保存的节点ID和引脚ID
             # 使用集合来跟踪已创建的连接，避免重复创建相同的连接
             existing_connections = set()
+            connections = []
+            connection_ids = []  # 与connections对应的文件中保存的连接ID
+            connected_pins = []  # 需要更新外观的引脚，全部连接完成后每个引脚只更新一次
             
-            # 先清空所有引脚的连接状态
-            for node in nodes:
-                for pin in node.input_pins + node.output_pins:
-                    pin.connections = []
-                    pin.connected = False
-                    pin.update_appearance()
-            
-            # 清空场景中的连接列表
-            scene.connections = []
-            
-            # 遍历所有连接数据
-            for connection_data in workflow_data['connections']:
+            # 逐条读取节点和连接（节点全部在连接之前）
+            for kind, data in WorkflowBinary.iter_workflow(file_path):
+                if kind == 'node':
+                    # 在场景外创建节点（此时修改引脚值不会标记节点为脏，也不会触发重绘）
+                    node = Node(data['node_type'], data['x'], data['y'])
+                    WorkflowIO._restore_pin_values(node, data)
+                    # 沿用文件中保存的持久ID（旧文件的ID已被iter_workflow去掉，由GraphIndex分配新ID）
+                    node_ids.append((data.get('id'), data.get('input_pin_ids', ()), data.get('output_pin_ids', ())))
+                    nodes.append(node)
+                    continue
+                
+                # 导入连接
+                connection_data = data
                 try:
-                    # 获取起始节点和结束节点
-                    start_node = nodes[connection_data['start_node']]  # 起始节点
-                    end_node = nodes[connection_data['end_node']]      # 结束节点
-                    
-                    # 获取起始引脚和结束引脚
-                    start_pin = start_node.output_pins[connection_data['start_pin']]  # 起始引脚
-                    end_pin = end_node.input_pins[connection_data['end_pin']]          # 结束引脚
-                    
-                    # 检查引脚索引是否有效
-                    if connection_data['start_pin'] >= len(start_node.output_pins) or \
-                       connection_data['end_pin'] >= len(end_node.input_pins):
-                        continue
-                    
                     # 创建连接的唯一标识符，基于节点索引和引脚索引
                     connection_id = (connection_data['start_node'], 
                                    connection_data['end_node'], 
@@ -269,6 +199,10 @@ class WorkflowIO:
                     if connection_id in existing_connections:
                         continue  # 跳过重复连接
                     
+                    # 按索引直接获取起始引脚和结束引脚
+                    start_pin = nodes[connection_id[0]].output_pins[connection_id[2]]  # 起始引脚
+                    end_pin = nodes[connection_id[1]].input_pins[connection_id[3]]      # 结束引脚
+                    
                     # 检查结束引脚是否已经被连接
                     if end_pin.connected:
                         continue  # 跳过已连接的输入引脚
@@ -276,32 +210,97 @@ class WorkflowIO:
                     # 将连接添加到已存在连接集合中
                     existing_connections.add(connection_id)
                     
-                    # 创建连接线对象
-                    connection = ConnectionLine(start_pin, end_pin, start_pin.color)
-                    connection.color = QColor(connection_data['color'])  # 设置连接线颜色
-                    connection.setPen(QPen(QColor(connection_data['color']), 8))  # 设置连接线画笔
-                    
-                    # 将连接添加到场景和连接列表
-                    scene.addItem(connection)  # 添加到场景
-                    scene.connections.append(connection)  # 添加到连接列表
+                    # 创建连接线对象（节点已定位，创建时即计算好连接线位置）
+                    color = QColor(connection_data['color'])
+                    connection = ConnectionLine(start_pin, end_pin, color)
+                    connection_ids.append(connection_data.get('id'))
+                    connections.append(connection)
                     
                     # 将连接添加到引脚的连接列表
                     start_pin.connections.append(connection)  # 添加到起始引脚的连接列表
                     end_pin.connections.append(connection)    # 添加到结束引脚的连接列表
                     
-                    # 更新引脚的连接状态和外观
-                    start_pin.connected = True  # 起始引脚标记为已连接
+                    # 更新引脚的连接状态
+                    if not start_pin.connected:
+                        start_pin.connected = True  # 起始引脚标记为已连接
+                        connected_pins.append(start_pin)
                     end_pin.connected = True    # 结束引脚标记为已连接
-                    start_pin.update_appearance()  # 更新起始引脚外观
-                    end_pin.update_appearance()    # 更新结束引脚外观
+                    connected_pins.append(end_pin)
                     
                 except (IndexError, KeyError) as e:
                     # 捕获索引错误，避免程序崩溃
                     print(f"跳过无效连接: {e}")
                     continue
             
+            for pin in connected_pins:
+                pin.update_appearance()  # 更新引脚外观
+            
+            # 一次性加入场景，同时使缓存的执行计划失效
+            scene.add_items_bulk(nodes, connections, node_ids, connection_ids)
+            
+            WorkflowIO.last_load_time = time.perf_counter() - start_time
             return True  # 导入成功，返回True
         except Exception as e:
             # 捕获并打印异常信息
             print(f"导入工作流失败: {e}")
-            return False  # 导入失败，返回False
\ No newline at end of file
+            scene.clear()
+            return False  # 导入失败，返回False
+
+
+class WorkflowAutosave:
+    """增量自动保存
+    
+    缓存每个节点序列化后的JSON文本，只重新序列化上次保存后移动过、重命名或修改过输入值的节点
+    （CanvasScene.take_unsaved）；连接列表只在图结构变化（scene.revision改变）时重新生成；
+    图没有任何变化时不写文件。节省的是序列化的时间：有变化时仍然把缓存的文本拼接起来
+    写出完整的文件，与save_workflow的JSON格式相同，可以直接导入。
+    
+    用法：
+        autosave = WorkflowAutosave(scene, "flow.autosave.json")
+        autosave.save()  # 由定时器定期调用
+    """
+    def __init__(self, scene, file_path):
+        self.scene = scene
+        self.file_path = file_path
+        self.fragments = {}  # 节点 -> 序列化后的JSON文本
+        self.connections = None  # 序列化后的连接列表
+        self.revision = None  # 上次保存时的图结构版本号
+    
+    def save(self):
+        """保存变化的部分，返回是否写入了文件"""
+        scene = self.scene
+        changed = scene.take_unsaved()
+        if not changed and self.revision == scene.revision:
+            return False
+        try:
+            for node in changed:
+                self.fragments.pop(node, None)
+            if self.revision != scene.revision:
+                # 图结构变化：丢弃已删除节点的缓存，重新生成连接列表（节点索引可能已变化）
+                self.fragments = {node: self.fragments[node] for node in scene.nodes if node in self.fragments}
+                node_to_index = {node: index for index, node in enumerate(scene.nodes)}
+                self.connections = json.dumps(WorkflowIO.connection_data(scene, node_to_index), ensure_ascii=False)
+            
+            parts = []
+            for node in scene.nodes:
+                fragment = self.fragments.get(node)
+                if fragment is None:
+                    fragment = self.fragments[node] = json.dumps(WorkflowIO.node_data(node), ensure_ascii=False)
+                parts.append(fragment)
+            
+            # 先写临时文件再替换，保存中途出错时不会损坏上一次的自动保存
+            temp_path = self.file_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write('{"%s": true, "nodes": [\n' % WorkflowBinary.PERSISTENT_IDS)
+                f.write(',\n'.join(parts))
+                f.write('\n], "connections": ')
+                f.write(self.connections)
+                f.write('}\n')
+            os.replace(temp_path, self.file_path)
+            self.revision = scene.revision
+            return True
+        except Exception as e:
+            # 下次保存时重新序列化这些节点
+            scene.unsaved_nodes.update(changed)
+            print(f"自动保存失败: {e}")
+            return False
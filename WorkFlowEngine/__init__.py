@@ -1,3 +1,21 @@
-from .MainWindow import MainWindow
-from .Canvas.CanvasWidget import CanvasWidget, CanvasScene, ConnectionLine
-from .Canvas.Node.Node import Node, NodePin
+import importlib
+
+# 编辑器相关的类依赖PyQt6，改为首次访问时再导入，
+# 这样无界面执行引擎（WorkFlowEngine.Engine）可以在不加载Qt的情况下使用
+_lazy_imports = {
+    "MainWindow": ".MainWindow",
+    "CanvasWidget": ".Canvas.CanvasWidget",
+    "CanvasScene": ".Canvas.CanvasWidget",
+    "ConnectionLine": ".Canvas.CanvasWidget",
+    "Node": ".Canvas.Node.Node",
+    "NodePin": ".Canvas.Node.Node",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_imports:
+        module = importlib.import_module(_lazy_imports[name], __name__)
+        # 导入子模块时包属性会被设置为同名模块（如MainWindow），这里覆盖为类本身
+        globals()[name] = getattr(module, name)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
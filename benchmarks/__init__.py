@@ -0,0 +1,4 @@
+"""性能基准测试 - 用合成工作流测量执行计划编译、节点执行、保存/加载和内存占用
+
+运行：python -m benchmarks [--sizes 1000 10000 100000] [--compare 旧结果.json]
+"""
@@ -0,0 +1,50 @@
+"""python -m benchmarks [--sizes 1000 10000 100000] [--cases chain diamond] [--output 结果.json] [--compare 旧结果.json]"""
+import argparse
+import json
+import os
+import sys
+import time
+# 保存/加载测量需要创建Qt场景，没有显示环境时使用offscreen平台
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from .bench import run_benchmarks, compare
+from .generators import GENERATORS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="工作流引擎性能基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="节点数量")
+    parser.add_argument("--cases", nargs="+", choices=list(GENERATORS), help="只运行指定的图结构")
+    parser.add_argument("--repeat", type=int, default=3, help="每项测量的重复次数，取最小值")
+    parser.add_argument("--io-max-nodes", type=int, default=2000, help="超过该节点数时跳过保存/加载测量")
+    parser.add_argument("--no-memory", action="store_true", help="不测量内存峰值")
+    parser.add_argument("--output", help="结果JSON文件，默认保存到 benchmarks/results/")
+    parser.add_argument("--compare", help="与之前的结果JSON比较")
+    parser.add_argument("--threshold", type=float, default=0.1, help="比较时视为变慢的比例")
+    args = parser.parse_args(argv)
+
+    # 菱形和随机DAG的结果是很大的整数，打印节点需要转换为字符串
+    if hasattr(sys, "set_int_max_str_digits"):
+        sys.set_int_max_str_digits(0)
+
+    report = run_benchmarks(args.sizes, args.cases, args.repeat, args.io_max_nodes, not args.no_memory)
+
+    output = args.output
+    if output is None:
+        folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+        os.makedirs(folder, exist_ok=True)
+        output = os.path.join(folder, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"结果已保存到 {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} 项指标变慢超过 {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""基准测试主体
+
+每种生成器、每个规模测量：
+    graph_build_s   - Graph.from_data 构建无界面图
+    plan_s          - Run.compile 编译执行计划（依赖图 + 拓扑排序 + 槽位分配）
+    execute_cold_s  - 第一次执行（纯节点没有缓存）
+    execute_warm_s  - 再次执行（纯节点命中缓存）
+    per_node_us     - 第一次执行时平均每个节点的耗时（微秒）
+    save_s / load_s - WorkflowIO.save_workflow / load_workflow（需要创建Qt场景，规模超过io_max_nodes时跳过，默认2000）
+    file_bytes      - 保存的文件大小
+    peak_memory_bytes - 构建图、编译、执行过程中tracemalloc统计的内存峰值
+时间取repeat次中的最小值。
+"""
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from .generators import GENERATORS
+from WorkFlowEngine.Engine import Graph
+from WorkFlowEngine.Canvas.Node.RunNodes import Run
+
+
+def best_of(repeat, func):
+    """执行repeat次，返回最短耗时（秒）和最后一次的返回值"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def measure_engine(data, repeat):
+    """测量无界面图的构建、编译和执行"""
+    result = {}
+    result['graph_build_s'], graph = best_of(repeat, lambda: Graph.from_data(data))
+    result['plan_s'], plan = best_of(repeat, lambda: Run.compile(graph.nodes))
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        # 每次使用新图，避免纯节点缓存影响第一次执行的耗时
+        cold = []
+        for _ in range(repeat):
+            fresh = Run(plan=Run.compile(Graph.from_data(data).nodes))
+            gc.collect()
+            start = time.perf_counter()
+            fresh.run_node()
+            cold.append(time.perf_counter() - start)
+        result['execute_cold_s'] = min(cold)
+        runner = Run(plan=plan)
+        runner.run_node()
+        result['execute_warm_s'], _ = best_of(repeat, runner.run_node)
+    result['per_node_us'] = result['execute_cold_s'] / len(data['nodes']) * 1e6
+    return result
+
+
+def measure_memory(data):
+    """测量构建图、编译、执行整个过程的内存峰值"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        graph = Graph.from_data(data)
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            Run(plan=Run.compile(graph.nodes)).run_node()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_io(data, repeat):
+    """测量WorkflowIO在Qt场景上的保存和加载"""
+    from PyQt6.QtWidgets import QApplication
+    from WorkFlowEngine.Canvas.CanvasScene import CanvasScene
+    from WorkFlowEngine.WorkflowIO import WorkflowIO
+    app = QApplication.instance() or QApplication([])
+    result = {}
+    with tempfile.TemporaryDirectory() as folder:
+        source = os.path.join(folder, 'source.json')
+        target = os.path.join(folder, 'target.json')
+        with open(source, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        scene = CanvasScene()
+        result['load_s'], _ = best_of(repeat, lambda: WorkflowIO.load_workflow(scene, source))
+        result['save_s'], _ = best_of(repeat, lambda: WorkflowIO.save_workflow(scene, target))
+        result['file_bytes'] = os.path.getsize(target)
+        scene.clear()
+    return result
+
+
+def run_benchmarks(sizes, cases=None, repeat=3, io_max_nodes=2000, memory=True):
+    """执行基准测试
+
+    Args:
+        sizes: 节点数量列表
+        cases: 生成器名称列表，None表示全部
+        repeat: 每项测量的重复次数
+        io_max_nodes: 超过该节点数时跳过WorkflowIO测量（需要创建大量Qt控件）
+        memory: 是否测量内存峰值
+
+    Returns:
+        dict: {'meta': 运行环境, 'results': [每个用例的结果, ...]}
+    """
+    results = []
+    for case in cases or list(GENERATORS):
+        for size in sizes:
+            data = GENERATORS[case](size)
+            result = {'case': case, 'size': size,
+                      'nodes': len(data['nodes']), 'connections': len(data['connections'])}
+            result.update(measure_engine(data, repeat))
+            if memory:
+                result['peak_memory_bytes'] = measure_memory(data)
+            if size <= io_max_nodes:
+                result.update(measure_io(data, repeat))
+            print(format_result(result), flush=True)
+            results.append(result)
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def format_result(result):
+    """单个结果的一行摘要"""
+    text = (f"{result['case']:<11}{result['nodes']:>8} 节点  "
+            f"编译 {result['plan_s'] * 1000:9.2f} ms  "
+            f"执行 {result['execute_cold_s'] * 1000:9.2f} ms ({result['per_node_us']:.2f} us/节点)  "
+            f"缓存执行 {result['execute_warm_s'] * 1000:9.2f} ms")
+    if 'peak_memory_bytes' in result:
+        text += f"  内存峰值 {result['peak_memory_bytes'] / 1024 / 1024:.1f} MB"
+    if 'load_s' in result:
+        text += f"  加载 {result['load_s'] * 1000:.1f} ms  保存 {result['save_s'] * 1000:.1f} ms"
+    return text
+
+
+# 比较时检查的指标（越小越好）
+COMPARE_KEYS = ('graph_build_s', 'plan_s', 'execute_cold_s', 'execute_warm_s',
+                'load_s', 'save_s', 'peak_memory_bytes')
+
+
+def compare(old, new, threshold=0.1):
+    """比较两次结果，打印变化并返回变慢超过threshold的指标
+
+    Returns:
+        list: [(case, size, key, old_value, new_value), ...]
+    """
+    old_results = {(item['case'], item['size']): item for item in old['results']}
+    regressions = []
+    for item in new['results']:
+        previous = old_results.get((item['case'], item['size']))
+        if previous is None:
+            continue
+        for key in COMPARE_KEYS:
+            if key not in item or not previous.get(key):
+                continue
+            ratio = item[key] / previous[key]
+            mark = ""
+            if ratio > 1 + threshold:
+                mark = "  <-- 变慢"
+                regressions.append((item['case'], item['size'], key, previous[key], item[key]))
+            elif ratio < 1 - threshold:
+                mark = "  变快"
+            print(f"{item['case']:<11}{item['size']:>8} {key:<18}{ratio:8.2f}x{mark}")
+    return regressions
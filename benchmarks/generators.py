@@ -0,0 +1,146 @@
+"""合成工作流生成器
+
+生成WorkflowIO格式的工作流数据（与保存的JSON文件结构相同），只使用现有的
+Start / Add(int) / TypeChange / Print 节点，可以直接交给 Graph.from_data 或写入文件后用 WorkflowIO 加载。
+"""
+import random
+from WorkFlowEngine.Canvas.Node.CustomNodes import node_dict
+from WorkFlowEngine.Canvas.Node.CustomNodes.pin_colors import pin_colors
+
+# 连接线颜色，与画布上按起始引脚类型着色一致
+LOGIC_COLOR = pin_colors["logic"].name()
+INT_COLOR = pin_colors["int"].name()
+STR_COLOR = pin_colors["str"].name()
+
+
+class WorkflowBuilder:
+    """按索引构建工作流数据"""
+    def __init__(self):
+        self.nodes = []
+        self.connections = []
+        self._pin_counts = {}
+
+    def pin_counts(self, node_type):
+        """节点类型的 (输入引脚数, 输出引脚数)"""
+        counts = self._pin_counts.get(node_type)
+        if counts is None:
+            meta = node_dict.meta(node_type)
+            counts = self._pin_counts[node_type] = (len(meta['input']), len(meta['output']))
+        return counts
+
+    def add(self, node_type, x=0, y=0, input_values=None, input_combos=None, output_combos=None):
+        """添加节点，返回节点索引"""
+        input_count, output_count = self.pin_counts(node_type)
+        self.nodes.append({
+            'name': node_dict.meta(node_type)['zh_name'],
+            'x': x,
+            'y': y,
+            'node_type': node_type,
+            'input_pin_values': input_values or [""] * input_count,
+            'output_pin_values': [""] * output_count,
+            'input_pin_combo_values': input_combos or [""] * input_count,
+            'output_pin_combo_values': output_combos or [""] * output_count,
+        })
+        return len(self.nodes) - 1
+
+    def add_int(self, x=0, y=0, a="1", b="1"):
+        """添加 Add(int) 节点"""
+        return self.add("Add(int)", x, y, input_values=[a, b])
+
+    def connect(self, start_node, start_pin, end_node, end_pin, color):
+        self.connections.append({
+            'start_node': start_node,
+            'end_node': end_node,
+            'start_pin': start_pin,
+            'end_pin': end_pin,
+            'color': color,
+        })
+
+    def finish(self, start, value_node):
+        """在末尾加上 类型转换(int→str) → 打印，打印最后的结果"""
+        x = self.nodes[value_node]['x'] + 200
+        y = self.nodes[value_node]['y']
+        change = self.add("TypeChange", x, y, input_combos=["", "int"], output_combos=["", "str"])
+        printer = self.add("Print", x + 200, y)
+        self.connect(start, 0, change, 0, LOGIC_COLOR)
+        self.connect(value_node, 0, change, 1, INT_COLOR)
+        self.connect(change, 0, printer, 0, LOGIC_COLOR)
+        self.connect(change, 1, printer, 1, STR_COLOR)
+
+    def data(self):
+        return {'nodes': self.nodes, 'connections': self.connections}
+
+
+def chain(size):
+    """长链：开始 → 加 → 加 → ... → 类型转换 → 打印"""
+    builder = WorkflowBuilder()
+    start = builder.add("Start", 0, 0)
+    previous = builder.add_int(200, 0, "0", "1")
+    for i in range(1, max(size - 3, 1)):
+        node = builder.add_int(200 + i * 200, 0, "", "1")
+        builder.connect(previous, 0, node, 0, INT_COLOR)
+        previous = node
+    builder.finish(start, previous)
+    return builder.data()
+
+
+def fan_out(size):
+    """宽扇出：一个加法节点的输出连接到其余所有加法节点"""
+    builder = WorkflowBuilder()
+    start = builder.add("Start", 0, 0)
+    root = builder.add_int(200, 0, "1", "1")
+    for i in range(max(size - 4, 0)):
+        node = builder.add_int(400, i * 100, "", str(i))
+        builder.connect(root, 0, node, 0, INT_COLOR)
+    builder.finish(start, len(builder.nodes) - 1 if size > 4 else root)
+    return builder.data()
+
+
+def diamond(size):
+    """菱形串联：a → (b, c) → d，每个d作为下一个菱形的a"""
+    builder = WorkflowBuilder()
+    start = builder.add("Start", 0, 0)
+    top = builder.add_int(200, 0, "1", "1")
+    for i in range(max((size - 4) // 3, 0)):
+        x = 400 + i * 400
+        left = builder.add_int(x, -100, "", "0")
+        right = builder.add_int(x, 100, "", "0")
+        bottom = builder.add_int(x + 200, 0, "", "")
+        builder.connect(top, 0, left, 0, INT_COLOR)
+        builder.connect(top, 0, right, 0, INT_COLOR)
+        builder.connect(left, 0, bottom, 0, INT_COLOR)
+        builder.connect(right, 0, bottom, 1, INT_COLOR)
+        top = bottom
+    builder.finish(start, top)
+    return builder.data()
+
+
+def random_dag(size, link_probability=0.7, window=1000, seed=0):
+    """随机DAG：每个加法节点的两个输入以一定概率连接到之前（window范围内）的节点
+
+    Args:
+        link_probability: 输入引脚连接到之前节点的概率，否则使用字面值
+        window: 只从最近的window个节点中选择前驱，避免所有连接都集中在开头
+        seed: 随机种子，相同参数生成相同的图
+    """
+    rng = random.Random(seed)
+    builder = WorkflowBuilder()
+    start = builder.add("Start", 0, 0)
+    first = builder.add_int(200, 0, "1", "1")
+    for i in range(1, max(size - 3, 1)):
+        node = builder.add_int(200 + (i // 100) * 200, (i % 100) * 100, "1", "1")
+        for pin in range(2):
+            if rng.random() < link_probability:
+                provider = rng.randrange(max(first, node - window), node)
+                builder.nodes[node]['input_pin_values'][pin] = ""
+                builder.connect(provider, 0, node, pin, INT_COLOR)
+    builder.finish(start, len(builder.nodes) - 1)
+    return builder.data()
+
+
+GENERATORS = {
+    'chain': chain,
+    'fan_out': fan_out,
+    'diamond': diamond,
+    'random_dag': random_dag,
+}
@@ -0,0 +1,126 @@
+"""测试公共工具：示例工作流、按节点下标比较输出、构建小工作流"""
+import glob
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+EXAMPLES = sorted(glob.glob(os.path.join(ROOT, "example", "*.json")))
+
+
+@pytest.fixture(scope="module")
+def scene():
+    """无窗口的CanvasScene（offscreen平台），没有安装PyQt6时跳过"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    from WorkFlowEngine.Canvas.CanvasScene import CanvasScene
+    scene = CanvasScene()
+    yield scene
+    scene.clear()
+    app.processEvents()
+
+
+def node_outputs(graph, runner):
+    """{(节点下标, 输出引脚下标): 值}，不同Graph对象加载的同一个工作流可以直接比较"""
+    output_link = runner.output_link
+    return {(i, pin.index): output_link.get(pin)
+            for i, node in enumerate(graph.nodes) for pin in node.output_pins}
+
+
+def node(node_type, inputs=(), input_combos=(), output_combos=()):
+    """WorkflowIO格式的节点数据"""
+    return {
+        'name': node_type,
+        'node_type': node_type,
+        'input_pin_values': list(inputs),
+        'input_pin_combo_values': list(input_combos),
+        'output_pin_combo_values': list(output_combos),
+    }
+
+
+def connection(start_node, start_pin, end_node, end_pin):
+    """WorkflowIO格式的连接数据"""
+    return {'start_node': start_node, 'start_pin': start_pin, 'end_node': end_node, 'end_pin': end_pin}
+
+
+def stop_workflow():
+    """执行到一半停止的工作流
+
+    0 打印("before") <- 1 开始；2 加(1, -1) 输出0，要求停止执行。
+    顺序执行时开始、加之后停止，打印不会执行。
+    """
+    return {
+        'nodes': [
+            node("Print", ["", "before"]),
+            node("Start"),
+            node("Add(int)", ["1", "-1"]),
+        ],
+        'connections': [connection(1, 0, 0, 0)],
+    }
+
+
+def chain_workflow(count, stop_at=None):
+    """开始 -> count个加(int)串联 -> 类型转换(str) -> 打印
+
+    第一个加计算1+1，之后每个加把上一个的输出加1。
+    stop_at为加的下标（从0开始）时，该节点的第二个输入使和为0，执行到这里停止。
+    """
+    nodes = [node("Start")]
+    connections = []
+    total = 0
+    for i in range(count):
+        value = -total - (1 if i == 0 else 0) if i == stop_at else 1
+        if i == 0:
+            nodes.append(node("Add(int)", ["1", str(value)]))
+            total = 1 + value
+        else:
+            nodes.append(node("Add(int)", ["", str(value)]))
+            connections.append(connection(len(nodes) - 2, 0, len(nodes) - 1, 0))
+            total += value
+    last = len(nodes) - 1
+    nodes.append(node("TypeChange", [], ["", "int"], ["", "str"]))
+    connections.append(connection(0, 0, last + 1, 0))
+    connections.append(connection(last, 0, last + 1, 1))
+    nodes.append(node("Print"))
+    connections.append(connection(last + 1, 0, last + 2, 0))
+    connections.append(connection(last + 1, 1, last + 2, 1))
+    return {'nodes': nodes, 'connections': connections}
+
+
+def slow_stop_workflow(delay=0.2):
+    """并行执行时停止位置之后的独立分支可能执行的工作流，返回(Graph, 停止的节点下标)
+
+    0 开始 -> 1 加(开始, -1)要求停止，执行前等待delay秒并放入线程池；
+    2 打印(开始, 加的输出)依赖停止的节点；3 打印(开始, "independent")与加互不依赖，执行顺序在加之后。
+    """
+    import time
+    from WorkFlowEngine.Engine import Graph
+
+    graph = Graph.from_data({
+        'nodes': [
+            node("Start"),
+            node("Add(int)", ["", "-1"]),
+            node("Print", ["", ""]),
+            node("Print", ["", "independent"]),
+        ],
+        'connections': [
+            connection(0, 0, 1, 0),
+            connection(0, 0, 2, 0), connection(1, 0, 2, 1),
+            connection(0, 0, 3, 0),
+        ],
+    })
+    info = graph.nodes[1].NodeInfo
+    run = info.run
+
+    def slow_run(arg):
+        time.sleep(delay)
+        return run(arg)
+
+    info.run = slow_run
+    info.run_mode = "io"
+    return graph, 1
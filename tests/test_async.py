@@ -0,0 +1,77 @@
+"""AsyncRun：async节点并发等待、出错时取消，以及停止时与Run的差异（与Run的结果比较见test_runners.py）"""
+import asyncio
+import time
+
+import pytest
+
+from conftest import chain_workflow, connection, node, node_outputs, slow_stop_workflow
+from WorkFlowEngine.Engine import AsyncRun, Graph
+
+
+def parallel_adds(count):
+    """开始 -> count个互不依赖的加(开始, 1)"""
+    return Graph.from_data({
+        'nodes': [node("Start")] + [node("Add(int)", ["", "1"]) for _ in range(count)],
+        'connections': [connection(0, 0, i + 1, 0) for i in range(count)],
+    })
+
+
+def make_async(info, delay, finished=None, error=None):
+    """把节点的run替换为等待delay秒的协程（实例属性覆盖run，AsyncRun直接等待协程）"""
+    run = info.run
+
+    async def async_run(arg):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        if finished is not None:
+            finished.append(info)
+        return run(arg)
+
+    info.run = async_run
+
+
+def test_async_node():
+    graph = Graph.from_data(chain_workflow(3))
+    make_async(graph.nodes[2].NodeInfo, 0)
+    expected = node_outputs(graph, graph.run())
+    runner = AsyncRun.from_graph(graph)
+    runner.run_node()
+    assert node_outputs(graph, runner) == expected
+    assert expected[(3, 0)] == 4
+
+
+def test_async_nodes_wait_concurrently():
+    graph = parallel_adds(4)
+    for graph_node in graph.nodes[1:]:
+        make_async(graph_node.NodeInfo, 0.2)
+    runner = AsyncRun.from_graph(graph)
+    start = time.perf_counter()
+    runner.run_node()
+    # 4个节点各等待0.2秒，并发等待时总耗时接近0.2秒
+    assert time.perf_counter() - start < 0.6
+    assert [node_outputs(graph, runner)[(i, 0)] for i in range(1, 5)] == [2, 2, 2, 2]
+
+
+def test_error_cancels_pending_nodes():
+    graph = parallel_adds(2)
+    finished = []
+    make_async(graph.nodes[1].NodeInfo, 0.05, error=ValueError("failed"))
+    make_async(graph.nodes[2].NodeInfo, 1.0, finished)
+    runner = AsyncRun.from_graph(graph)
+    start = time.perf_counter()
+    with pytest.raises(ValueError):
+        runner.run_node()
+    # 出错后不再等待其他节点，未完成的协程被取消
+    assert time.perf_counter() - start < 0.5
+    assert finished == []
+
+
+def test_stop_does_not_wait_for_independent_branches(capsys):
+    """与ParallelRun相同：依赖停止节点的节点不执行，已经开始的独立分支照常执行完毕"""
+    graph, _ = slow_stop_workflow()
+    runner = AsyncRun.from_graph(graph)
+    runner.run_node()
+    assert capsys.readouterr().out == "independent\n"
+    outputs = node_outputs(graph, runner)
+    assert outputs[(1, 0)] is None and outputs[(2, 0)] is None
@@ -0,0 +1,81 @@
+"""BatchRun：每一行的结果与把该行参数填入输入框后逐个执行Run相同"""
+import pytest
+
+from conftest import chain_workflow, node_outputs
+from WorkFlowEngine.Engine import Graph
+
+np = pytest.importorskip("numpy")
+
+
+def per_row(data, node_index, pin_index, values):
+    """逐行修改输入框的值并执行Run"""
+    results = []
+    for value in values:
+        graph = Graph.from_data(data)
+        graph.set_value(graph.nodes[node_index].input_pins[pin_index], str(value))
+        results.append(node_outputs(graph, graph.run()))
+    return results
+
+
+def batch(data, node_index, pin_index, column):
+    graph = Graph.from_data(data)
+    runner = graph.run_batch({graph.nodes[node_index].input_pins[pin_index]: column})
+    columns = node_outputs(graph, runner)
+    return runner, columns
+
+
+def assert_rows_equal(columns, rows):
+    for i, expected in enumerate(rows):
+        for key, value in expected.items():
+            column = columns[key]
+            actual = column[i] if isinstance(column, np.ndarray) and column.ndim > 0 else column
+            assert actual == value, (i, key)
+            if isinstance(value, str):
+                assert type(actual) is str, (i, key)
+
+
+def test_matches_per_row_with_stopping_row(capsys):
+    data = chain_workflow(3)
+    # 第二行 1 + -1 = 0，在第一个加处停止
+    values = [1, -1, 5, 7]
+    runner, columns = batch(data, 1, 1, np.array(values))
+    rows = per_row(data, 1, 1, values)
+    assert_rows_equal(columns, rows)
+    assert runner.active.tolist() == [True, False, True, True]
+    # 停止的行在停止节点处的输出为None
+    assert columns[(1, 0)][1] is None
+    # 类型转换输出Python字符串
+    assert [type(value) for value in columns[(4, 1)].tolist() if value is not None] == [str] * 3
+
+
+def test_all_rows_stop():
+    data = chain_workflow(2)
+    runner, columns = batch(data, 1, 1, np.array([-1, -1]))
+    assert runner.active.tolist() == [False, False]
+    assert columns[(1, 0)].tolist() == [None, None]
+    assert columns[(3, 1)] is None
+
+
+def test_large_integers_do_not_overflow():
+    data = chain_workflow(3)
+    values = [2 ** 62, 2 ** 63 + 5, -(2 ** 70)]
+    _, columns = batch(data, 1, 1, values)
+    rows = per_row(data, 1, 1, values)
+    assert_rows_equal(columns, rows)
+    assert columns[(3, 0)].tolist() == [2 ** 62 + 3, 2 ** 63 + 8, -(2 ** 70) + 3]
+    assert columns[(4, 1)][1] == str(2 ** 63 + 8)
+
+
+def test_string_column():
+    data = chain_workflow(2)
+    values = ["3", "-1", "10"]
+    _, columns = batch(data, 1, 1, values)
+    assert_rows_equal(columns, per_row(data, 1, 1, values))
+
+
+def test_default_run_batch_is_row_by_row():
+    graph = Graph.from_data(chain_workflow(1))
+    info = graph.nodes[-1].NodeInfo  # 打印，不是向量化节点
+    assert not info.vectorized
+    output = info.run_batch([np.array([True, False]), np.array(["a", "b"], dtype=object)], 2)
+    assert output[0].tolist() == [True, True]
@@ -0,0 +1,36 @@
+"""CanvasScene拖拽连接时查找目标引脚（snap_target）"""
+import pytest
+
+QPointF = pytest.importorskip("PyQt6.QtCore").QPointF
+
+
+def nodes(scene):
+    """开始(0, 0)、打印(400, 0)、加(400, 300)"""
+    scene.clear()
+    return scene.add_node("Start", 0, 0), scene.add_node("Print", 400, 0), scene.add_node("Add(int)", 400, 300)
+
+
+def test_exact_hit_on_other_type(scene):
+    """正好落在其他类型的输入引脚上时与之前的精确命中相同，返回该引脚"""
+    start, _, add = nodes(scene)
+    pin = add.input_pins[0]
+    assert scene.snap_target(start.output_pins[0], pin.scenePos()) is pin
+
+
+def test_snap_prefers_same_type(scene):
+    start, printer, _ = nodes(scene)
+    logic, text = printer.input_pins[0], printer.input_pins[1]
+    # 在两个引脚之间、更靠近str引脚的位置，仍吸附到同类型的logic引脚
+    pos = logic.scenePos() + (text.scenePos() - logic.scenePos()) * 0.6 + QPointF(-10, 0)
+    assert scene.snap_target(start.output_pins[0], pos) is logic
+
+
+def test_snap_falls_back_to_other_type(scene):
+    start, _, add = nodes(scene)
+    pin = add.input_pins[0]
+    assert scene.snap_target(start.output_pins[0], pin.scenePos() + QPointF(-12, 0)) is pin
+
+
+def test_nothing_in_radius(scene):
+    start, printer, _ = nodes(scene)
+    assert scene.snap_target(start.output_pins[0], printer.input_pins[0].scenePos() + QPointF(-200, 0)) is None
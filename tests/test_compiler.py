@@ -0,0 +1,40 @@
+"""Compiler：编译函数缓存和导出的独立模块（编译执行的结果比较见test_runners.py）"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT, chain_workflow, node_outputs
+from WorkFlowEngine.Canvas.Node.RunNodes import Run
+from WorkFlowEngine.Engine import CompiledRun, Graph, WorkflowCompiler
+
+
+def test_function_is_cached():
+    graph = Graph.from_data(chain_workflow(4))
+    first = CompiledRun.from_graph(graph)
+    assert CompiledRun.from_graph(graph).function is first.function
+    graph.set_value(graph.nodes[1].input_pins[1], "5")
+    runner = CompiledRun.from_graph(graph)
+    assert runner.function is not first.function
+    runner.run_node()
+    assert node_outputs(graph, runner)[(4, 0)] == 9
+
+
+def test_standalone_module(tmp_path):
+    target = str(tmp_path / "flow1.py")
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # -W error：命令行入口不能产生runpy的RuntimeWarning
+    subprocess.run([sys.executable, "-W", "error", "-m", "WorkFlowEngine.Engine", "compile",
+                    os.path.join(ROOT, "example", "1.json"), target], check=True, cwd=ROOT, env=env)
+    result = subprocess.run([sys.executable, target], check=True, cwd=str(tmp_path), env=env,
+                            capture_output=True, text=True)
+    assert result.stdout == "3\n"
+
+
+def test_module_source_rejects_rewritten_plans():
+    from WorkFlowEngine.Engine import Optimizer
+    graph = Graph.from_data(chain_workflow(3))
+    plan = Optimizer(Run.plan_for(graph)).optimize()
+    with pytest.raises(ValueError):
+        WorkflowCompiler(plan).module_source()
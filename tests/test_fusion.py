@@ -0,0 +1,58 @@
+"""Fuser：融合分组、停止屏障和--show-fused（各执行引擎执行融合计划的结果比较见test_runners.py）"""
+import json
+
+from conftest import chain_workflow, node_outputs, stop_workflow
+from WorkFlowEngine.Canvas.Node.RunNodes import Run
+from WorkFlowEngine.Engine import Fuser, Graph, ParallelRun, fused_plan_for, fuser_for
+from WorkFlowEngine.Engine.__main__ import main
+
+
+def expected_outputs(graph):
+    return node_outputs(graph, graph.run())
+
+
+def test_chain_is_fused():
+    graph = Graph.from_data(chain_workflow(10))
+    fuser = Fuser(Run.plan_for(graph))
+    plan = fuser.fuse()
+    assert [len(group) for group in fuser.groups] == [10]
+    runner = Run(plan=plan)
+    runner.run_node()
+    assert node_outputs(graph, runner) == expected_outputs(graph)
+
+
+def test_stop_inside_group():
+    graph = Graph.from_data(chain_workflow(10, stop_at=4))
+    fuser = Fuser(Run.plan_for(graph))
+    plan = fuser.fuse()
+    # 停止的加仍在融合组中，由组后的检查步骤停止执行
+    assert [len(group) for group in fuser.groups] == [10]
+    runner = Run(plan=plan)
+    runner.run_node()
+    assert node_outputs(graph, runner) == expected_outputs(graph)
+
+
+def test_fused_optimized_plan_keeps_barrier(capsys):
+    graph = Graph.from_data(stop_workflow())
+    expected = expected_outputs(graph)
+    graph.nodes[2].NodeInfo.run_mode = "io"
+    plan = fused_plan_for(graph, optimize=True)
+    for _ in range(20):
+        runner = ParallelRun(plan=plan, max_workers=1)
+        runner.run_node()
+        assert node_outputs(graph, runner) == expected
+    assert "before" not in capsys.readouterr().out
+
+
+def test_show_fused_uses_the_executed_plan(tmp_path, capsys):
+    path = str(tmp_path / "chain.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chain_workflow(5), f)
+    graph = Graph.load(path)
+    assert main([path, "--show-fused"]) == 0
+    assert fuser_for(graph).summary() in capsys.readouterr().out
+    # 优化后加全部被折叠，没有可融合的节点
+    assert main([path, "--show-fused", "--optimize"]) == 0
+    output = capsys.readouterr().out
+    assert fuser_for(graph, optimize=True).summary() in output
+    assert "0 组" in output
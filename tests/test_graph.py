@@ -0,0 +1,43 @@
+"""无界面Graph加载并执行工作流"""
+import os
+
+from conftest import EXAMPLES, ROOT, chain_workflow, node_outputs, stop_workflow
+from WorkFlowEngine.Engine import Graph
+
+
+def test_example_1(capsys):
+    graph = Graph.load(os.path.join(ROOT, "example", "1.json"))
+    runner = graph.run()
+    values = {node.NodeInfo.node_name: [runner.output_link[pin] for pin in node.output_pins]
+              for node in graph.nodes}
+    assert values["Add(int)"] == [3]
+    assert values["TypeChange"] == [True, "3"]
+    assert capsys.readouterr().out == "3\n"
+
+
+def test_examples_run_every_node():
+    for path in EXAMPLES:
+        graph = Graph.load(path)
+        outputs = node_outputs(graph, graph.run())
+        assert None not in outputs.values(), path
+
+
+def test_chain():
+    graph = Graph.from_data(chain_workflow(5))
+    outputs = node_outputs(graph, graph.run())
+    assert [outputs[(i, 0)] for i in range(1, 6)] == [2, 3, 4, 5, 6]
+    assert outputs[(6, 1)] == "6"
+
+
+def test_stop(capsys):
+    graph = Graph.from_data(stop_workflow())
+    outputs = node_outputs(graph, graph.run())
+    # 加输出0后停止：它的输出不写入，之后的打印不执行
+    assert outputs == {(0, 0): None, (1, 0): True, (2, 0): None}
+    assert capsys.readouterr().out == ""
+
+
+def test_stop_in_chain():
+    graph = Graph.from_data(chain_workflow(5, stop_at=2))
+    outputs = node_outputs(graph, graph.run())
+    assert [outputs[(i, 0)] for i in range(1, 6)] == [2, 3, None, None, None]
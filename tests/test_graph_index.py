@@ -0,0 +1,67 @@
+"""GraphIndex持久ID：旧文件重新编号，保存的ID保持不变，重复的ID重新分配"""
+import io
+import os
+
+from conftest import ROOT, chain_workflow
+from WorkFlowEngine import WorkflowBinary
+from WorkFlowEngine.Engine import Graph
+
+
+def all_ids(graph):
+    ids = [node.id for node in graph.nodes]
+    ids += [pin.id for node in graph.nodes for pin in node.input_pins + node.output_pins]
+    ids += [connection.id for connection in graph.connections]
+    return ids
+
+
+def with_ids(graph):
+    """按Graph当前的ID生成带持久ID标记的工作流数据"""
+    data = chain_workflow(3)
+    for node_data, node in zip(data['nodes'], graph.nodes):
+        node_data['id'] = node.id
+        node_data['input_pin_ids'] = [pin.id for pin in node.input_pins]
+        node_data['output_pin_ids'] = [pin.id for pin in node.output_pins]
+    for connection_data, connection in zip(data['connections'], graph.connections):
+        connection_data['id'] = connection.id
+    data[WorkflowBinary.PERSISTENT_IDS] = True
+    return data
+
+
+def test_legacy_ids_are_renumbered():
+    # example/2.json中的id是旧版本保存的Python id()
+    graph = Graph.load(os.path.join(ROOT, "example", "2.json"))
+    ids = all_ids(graph)
+    assert sorted(ids) == list(range(1, len(ids) + 1))
+    assert graph.index.next_id == len(ids) + 1
+
+
+def test_persistent_ids_are_kept():
+    graph = Graph.from_data(chain_workflow(3))
+    data = with_ids(graph)
+    # 改为不连续的ID，确认加载时沿用文件中的值
+    for node_data in data['nodes']:
+        node_data['id'] += 1000
+    loaded = Graph.from_data(data)
+    assert [node.id for node in loaded.nodes] == [node.id + 1000 for node in graph.nodes]
+    assert [c.id for c in loaded.connections] == [c.id for c in graph.connections]
+
+
+def test_binary_keeps_ids():
+    graph = Graph.from_data(chain_workflow(3))
+    f = io.BytesIO()
+    WorkflowBinary.dump(with_ids(graph), f)
+    f.seek(0)
+    data = {'nodes': [], 'connections': [], WorkflowBinary.PERSISTENT_IDS: True}
+    for kind, item in WorkflowBinary.WorkflowReader(f):
+        data['nodes' if kind == 'node' else 'connections'].append(item)
+    assert all_ids(Graph.from_data(data)) == all_ids(graph)
+
+
+def test_duplicate_ids_are_reassigned(capsys):
+    graph = Graph.from_data(chain_workflow(3))
+    data = with_ids(graph)
+    data['nodes'][1]['id'] = data['nodes'][0]['id']
+    loaded = Graph.from_data(data)
+    ids = all_ids(loaded)
+    assert len(set(ids)) == len(ids)
+    assert f"节点ID {data['nodes'][0]['id']} 无效或重复" in capsys.readouterr().out
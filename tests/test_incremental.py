@@ -0,0 +1,52 @@
+"""增量执行：修改输入后只重新执行变化的节点及其下游，结果与重新完整执行的Run相同
+（没有修改时的结果比较见test_runners.py）"""
+from conftest import chain_workflow, node_outputs
+from WorkFlowEngine.Engine import Graph
+
+
+def count_calls(graph):
+    """统计每个节点的run被调用的次数（实例属性覆盖run）"""
+    calls = {}
+    for i, graph_node in enumerate(graph.nodes):
+        info = graph_node.NodeInfo
+        calls[i] = 0
+
+        def counted(arg, run=info.run, i=i):
+            calls[i] += 1
+            return run(arg)
+
+        info.run = counted
+    return calls
+
+
+def test_only_changed_nodes_run():
+    graph = Graph.from_data(chain_workflow(5))
+    calls = count_calls(graph)
+    graph.run_incremental()
+    assert set(calls.values()) == {1}
+    graph.run_incremental()
+    assert set(calls.values()) == {1}
+    # 修改第3个加，只有它和下游节点重新执行
+    graph.set_value(graph.nodes[3].input_pins[1], "2")
+    graph.run_incremental()
+    assert [calls[i] for i in range(len(graph.nodes))] == [1, 1, 1, 2, 2, 2, 2, 2]
+
+
+def test_value_change_reaches_downstream():
+    graph = Graph.from_data(chain_workflow(5))
+    graph.run_incremental()
+    graph.set_value(graph.nodes[1].input_pins[1], "11")
+    runner = graph.run_incremental()
+    assert node_outputs(graph, runner) == node_outputs(graph, graph.run())
+    assert runner.output_link.get(graph.nodes[6].output_pins[1]) == "16"
+
+
+def test_stop():
+    graph = Graph.from_data(chain_workflow(6))
+    graph.run_incremental()
+    # 修改后执行到第4个加停止
+    graph.set_value(graph.nodes[4].input_pins[1], "-4")
+    assert node_outputs(graph, graph.run_incremental()) == node_outputs(graph, graph.run())
+    # 恢复后停止之后的节点重新执行
+    graph.set_value(graph.nodes[4].input_pins[1], "1")
+    assert node_outputs(graph, graph.run_incremental()) == node_outputs(graph, graph.run())
@@ -0,0 +1,91 @@
+"""作业服务：提交的工作流在工作进程中执行，结果与直接执行相同"""
+import http.client
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import EXAMPLES, ROOT, stop_workflow
+from WorkFlowEngine.Engine import Graph
+from WorkFlowEngine.Engine.JobServer import JobServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = JobServer(workers=1)
+    yield server
+    server.close()
+
+
+def expected_outputs(path):
+    graph = Graph.load(path)
+    runner = graph.run()
+    return {str(node.id): [runner.output_link.get(pin) for pin in node.output_pins] for node in graph.nodes}
+
+
+def test_submit_and_wait(server):
+    for path in EXAMPLES:
+        with open(path, "rb") as f:
+            body = f.read()
+        first = server.wait(server.submit(body))
+        assert first['status'] == 'done', first
+        assert first['outputs'] == expected_outputs(path)
+        # 同一个工作流再次提交时复用工作进程中缓存的Graph
+        assert server.wait(server.submit(body))['cached']
+    assert "333" in first['stdout']
+
+
+def test_stop_workflow(server):
+    result = server.wait(server.submit(json.dumps(stop_workflow())))
+    assert result['status'] == 'done'
+    assert list(result['outputs'].values()) == [[None], [True], [None]]
+
+
+def test_wait_timeout_returns_status(server):
+    job = server.submit(json.dumps(stop_workflow()))
+    result = server.wait(job, timeout=0)
+    assert result['status'] in ('queued', 'running', 'done')
+    assert server.wait(job)['status'] == 'done'
+
+
+def test_invalid_workflow(server):
+    result = server.wait(server.submit(b'{"connections": []}'))
+    assert result['status'] == 'error'
+
+
+def test_http(server):
+    thread = threading.Thread(target=server.serve, kwargs={'port': 0}, daemon=True)
+    thread.start()
+    while server.httpd is None:
+        time.sleep(0.01)
+    try:
+        with open(os.path.join(ROOT, "example", "1.json"), "rb") as f:
+            body = f.read()
+        connection = http.client.HTTPConnection("127.0.0.1", server.httpd.server_port, timeout=30)
+        connection.request("POST", "/run", body)
+        response = connection.getresponse()
+        result = json.loads(response.read())
+        assert response.status == 200
+        assert result['stdout'] == "3\n"
+        connection.request("GET", "/stats")
+        assert json.loads(connection.getresponse().read())['workers'] == 1
+        connection.close()
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def test_warm_starts_every_worker():
+    server = JobServer(workers=2)
+    try:
+        # 构造时已经启动并预热了所有工作进程
+        assert len(server.executor._processes) == 2
+        pids = server.warm()
+        assert len(set(pids)) == 2
+        assert set(pids) == set(server.executor._processes)
+        with open(EXAMPLES[0], "rb") as f:
+            assert server.wait(server.submit(f.read()))['worker'] in pids
+    finally:
+        server.close()
@@ -0,0 +1,47 @@
+"""LoopRun的迭代状态：执行统计、执行计划更新和后台线程（与Run的结果比较见test_runners.py）"""
+import time
+
+from conftest import chain_workflow, node_outputs
+from WorkFlowEngine.Engine import Graph, LoopRun
+
+
+def test_stats_count_executed_nodes():
+    graph = Graph.from_data(chain_workflow(6, stop_at=3))
+    loop = LoopRun(graph)
+    loop.run(max_iterations=4)
+    stats = loop.stats()
+    assert stats['iterations'] == 4
+    # 停止节点之后的节点不会执行
+    assert [item['count'] for item in stats['nodes']].count(4) == 5
+
+
+def test_plan_follows_graph_changes():
+    graph = Graph.from_data(chain_workflow(2))
+    loop = LoopRun(graph)
+    loop.step()
+    graph.add_node("Start")
+    assert node_outputs(graph, loop.step()) == node_outputs(graph, graph.run())
+
+
+def test_start_and_stop():
+    loop = LoopRun(Graph.from_data(chain_workflow(2)), target_fps=200)
+    loop.start()
+    deadline = time.perf_counter() + 5
+    while loop.iterations < 3 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    loop.stop(timeout=5)
+    assert not loop.is_running()
+    iterations = loop.iterations
+    assert iterations >= 3
+    time.sleep(0.05)
+    assert loop.iterations == iterations
+
+
+def test_max_iterations_in_background():
+    loop = LoopRun(Graph.from_data(chain_workflow(2)))
+    loop.start(max_iterations=5)
+    deadline = time.perf_counter() + 5
+    while loop.is_running() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert loop.iterations == 5
+    assert not loop.is_running()
@@ -0,0 +1,26 @@
+"""纯节点的输出缓存（MemoRun）"""
+import gc
+import weakref
+
+from conftest import chain_workflow
+from WorkFlowEngine.Canvas.Node.RunNodes import MemoRun
+from WorkFlowEngine.Engine import Graph
+
+
+def test_same_info_shares_memo():
+    graph = Graph.from_data(chain_workflow(2))
+    info = graph.nodes[1].NodeInfo
+    assert MemoRun.of(info) is MemoRun.of(info)
+
+
+def test_memo_is_freed_with_graph():
+    graph = Graph.from_data(chain_workflow(3))
+    graph.run()
+    info = graph.nodes[1].NodeInfo
+    memo = MemoRun.of(info)
+    assert memo.cache
+    info_ref, memo_ref = weakref.ref(info), weakref.ref(memo)
+    del graph, info, memo
+    gc.collect()
+    assert info_ref() is None
+    assert memo_ref() is None
@@ -0,0 +1,60 @@
+"""节点注册表的清单缓存"""
+import json
+import os
+
+import pytest
+
+from WorkFlowEngine.Canvas.Node import CustomNodes
+from WorkFlowEngine.Canvas.Node.CustomNodes import META_FIELDS, NodeRegistry
+
+
+@pytest.fixture
+def manifest_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache" / "node_manifest.json")
+    monkeypatch.setattr(CustomNodes, "MANIFEST_PATH", path)
+    return path
+
+
+def new_registry():
+    return NodeRegistry(CustomNodes.__name__, os.path.dirname(CustomNodes.__file__))
+
+
+def test_manifest_is_written_to_cache(manifest_path):
+    registry = new_registry()
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["template"]["fields"] == list(META_FIELDS)
+    assert registry.meta("Add(int)")["vectorized"] is True
+    # 只留下清单，临时文件已被替换
+    assert os.listdir(os.path.dirname(manifest_path)) == [os.path.basename(manifest_path)]
+
+
+def test_manifest_is_reused(manifest_path):
+    new_registry()
+    registry = new_registry()
+    # 清单有效时不导入节点模块
+    assert not registry.is_loaded("ScreenShot")
+    assert set(META_FIELDS) <= set(registry.meta("Start"))
+
+
+def test_changed_fields_invalidate_manifest(manifest_path):
+    new_registry()
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    # 模拟旧版本的清单：缺少vectorized
+    manifest["template"]["fields"].remove("vectorized")
+    for entry in manifest["nodes"].values():
+        del entry["meta"]["vectorized"]
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    registry = new_registry()
+    assert registry.meta("Add(int)")["vectorized"] is True
+
+
+def test_unwritable_cache_is_ignored(tmp_path, monkeypatch, capsys):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    monkeypatch.setattr(CustomNodes, "MANIFEST_PATH", str(blocker / "node_manifest.json"))
+    registry = new_registry()
+    assert "Add(int)" in registry
+    assert capsys.readouterr().out == ""
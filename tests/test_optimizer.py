@@ -0,0 +1,78 @@
+"""Optimizer：折叠、删除无用节点和停止屏障（各执行引擎执行优化计划的结果比较见test_runners.py）"""
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import chain_workflow, connection, node, node_outputs, stop_workflow
+from WorkFlowEngine.Canvas.Node.RunNodes import Run
+from WorkFlowEngine.Engine import AsyncRun, Graph, Optimizer, ParallelRun, optimized_plan_for
+
+
+def expected_outputs(graph):
+    return node_outputs(graph, graph.run())
+
+
+def test_chain_is_folded():
+    graph = Graph.from_data(chain_workflow(20))
+    optimizer = Optimizer(Run.plan_for(graph))
+    plan = optimizer.optimize()
+    assert len(optimizer.folded) == 20  # 类型转换的逻辑输入来自开始，不折叠
+    runner = Run(plan=plan)
+    runner.run_node()
+    assert node_outputs(graph, runner)[(21, 1)] == "21"
+
+
+def test_literal_change_invalidates_plan():
+    graph = Graph.from_data(chain_workflow(3))
+    plan = optimized_plan_for(graph)
+    assert optimized_plan_for(graph) is plan
+    graph.set_value(graph.nodes[1].input_pins[1], "10")
+    runner = Run(plan=optimized_plan_for(graph))
+    runner.run_node()
+    assert node_outputs(graph, runner)[(4, 1)] == "13"
+
+
+def test_parallel_and_async_stop(capsys):
+    """折叠后要求停止的步骤没有输入，ParallelRun/AsyncRun也必须在同一位置停止"""
+    graph = Graph.from_data(stop_workflow())
+    expected = expected_outputs(graph)
+    # 让停止步骤和开始都放入线程池（单线程），开始先完成时打印不能被调度
+    graph.nodes[2].NodeInfo.run_mode = "io"
+    plan = optimized_plan_for(graph)
+    for _ in range(20):
+        runner = ParallelRun(plan=plan, max_workers=1)
+        runner.run_node()
+        assert node_outputs(graph, runner) == expected
+        with ThreadPoolExecutor(1) as executor:
+            runner = AsyncRun(plan=plan, executor=executor)
+            runner.run_node()
+        assert node_outputs(graph, runner) == expected
+    assert "before" not in capsys.readouterr().out
+
+
+
+def test_unused_pure_node_still_stops(capsys):
+    """输出没有被使用、但执行时要求停止的纯节点不能删除"""
+    # 0 加(开始, -1) <- 1 开始 -> 2 打印("before")；加的输入来自开始（不是常量），不会被折叠，
+    # 执行顺序为开始、加、打印，加执行时1+(-1)=0要求停止
+    data = {
+        'nodes': [node("Add(int)", ["", "-1"]), node("Start"), node("Print", ["", "before"])],
+        'connections': [connection(1, 0, 0, 0), connection(1, 0, 2, 0)],
+    }
+    graph = Graph.from_data(data)
+    expected = expected_outputs(graph)
+    optimizer = Optimizer(Run.plan_for(graph))
+    runner = Run(plan=optimizer.optimize())
+    runner.run_node()
+    assert optimizer.pruned == []
+    assert node_outputs(graph, runner) == expected
+    assert "before" not in capsys.readouterr().out
+
+
+def test_trailing_pure_nodes_are_pruned():
+    data = chain_workflow(2)
+    # 最后添加一个输出没有被使用的加，输入来自打印，执行顺序在打印之后
+    data['nodes'].append(node("Add(int)", ["", "1"]))
+    data['connections'].append(connection(4, 0, 5, 0))
+    graph = Graph.from_data(data)
+    optimizer = Optimizer(Run.plan_for(graph))
+    optimizer.optimize()
+    assert [pruned.name for pruned in optimizer.pruned] == [graph.nodes[-1].name]
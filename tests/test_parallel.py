@@ -0,0 +1,48 @@
+"""ParallelRun：进程池复用、调度位置，以及停止时与Run的差异（与Run的结果比较见test_runners.py）"""
+from concurrent.futures import ProcessPoolExecutor
+
+from conftest import chain_workflow, node_outputs, slow_stop_workflow
+from WorkFlowEngine.Canvas.Node.RunNodes import Run
+from WorkFlowEngine.Engine import Graph, ParallelRun
+
+
+def test_process_pool_is_reused():
+    graph = Graph.from_data(chain_workflow(4))
+    with ParallelRun(plan=Run.plan_for(graph), use_processes=True) as runner:
+        runner.run_node()
+        pool = runner._own_process_pool
+        runner.run_node()
+        assert runner._own_process_pool is pool
+    assert runner._own_process_pool is None
+
+
+def test_external_process_pool_is_not_closed():
+    graph = Graph.from_data(chain_workflow(4))
+    expected = node_outputs(graph, graph.run())
+    with ProcessPoolExecutor(1) as executor:
+        with ParallelRun(plan=Run.plan_for(graph), process_executor=executor) as runner:
+            runner.run_node()
+            assert node_outputs(graph, runner) == expected
+        # close()只关闭自己创建的进程池
+        assert executor.submit(int, "1").result() == 1
+
+
+def test_trivial_nodes_run_inline():
+    graph = Graph.from_data(chain_workflow(2))
+    modes = set(node.NodeInfo.run_mode for node in graph.nodes if node.NodeInfo.node_name in ("Add(int)", "TypeChange"))
+    assert modes == {"inline"}
+
+
+def test_stop_does_not_wait_for_independent_branches(capsys):
+    """停止只阻止调度新节点：依赖停止节点的节点不执行，执行顺序在它之后的独立分支可能已经执行"""
+    graph, stop = slow_stop_workflow()
+    plan = Run.plan_for(graph)
+    assert plan.order.index(stop) < plan.order.index(3)
+    graph.run()
+    assert capsys.readouterr().out == ""
+    runner = ParallelRun(plan=plan, max_workers=2)
+    runner.run_node()
+    assert capsys.readouterr().out == "independent\n"
+    outputs = node_outputs(graph, runner)
+    assert outputs[(1, 0)] is None and outputs[(2, 0)] is None
+    assert outputs[(3, 0)] is True
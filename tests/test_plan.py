@@ -0,0 +1,52 @@
+"""执行计划编译：循环依赖检查和按图结构版本缓存"""
+import pytest
+
+from conftest import chain_workflow, connection, node
+from WorkFlowEngine.Canvas.Node.RunNodes import CycleError, Run
+from WorkFlowEngine.Engine import Graph
+
+
+def test_cycle_lists_only_cycle_nodes():
+    # 0 开始 -> 1 加 <-> 2 加 -> 3 加（环的下游）；4 打印与环无关
+    graph = Graph.from_data({
+        'nodes': [
+            node("Start"),
+            node("Add(int)", ["", ""]),
+            node("Add(int)", ["", "1"]),
+            node("Add(int)", ["", "1"]),
+            node("Print", ["", "x"]),
+        ],
+        'connections': [
+            connection(2, 0, 1, 0), connection(1, 0, 2, 0),
+            connection(2, 0, 3, 0),
+            connection(0, 0, 4, 0),
+        ],
+    })
+    with pytest.raises(CycleError) as error:
+        Run.plan_for(graph)
+    assert error.value.nodes == [graph.nodes[1], graph.nodes[2]]
+
+
+def test_plan_is_cached_until_structure_changes():
+    graph = Graph.from_data(chain_workflow(2))
+    plan = Run.plan_for(graph)
+    assert Run.plan_for(graph) is plan
+    # 修改字面值不改变图结构，执行计划不变
+    graph.set_value(graph.nodes[1].input_pins[1], "5")
+    assert Run.plan_for(graph) is plan
+
+    added = graph.add_node("Add(int)")
+    after_add = Run.plan_for(graph)
+    assert after_add is not plan and len(after_add.runs) == len(plan.runs) + 1
+    assert Run.plan_for(graph) is after_add
+
+    link = graph.create_connection(graph.nodes[0].output_pins[0], added.input_pins[0])
+    after_connect = Run.plan_for(graph)
+    assert after_connect is not after_add
+    assert Run.plan_for(graph) is after_connect
+
+    graph.remove_connection(link)
+    after_remove = Run.plan_for(graph)
+    assert after_remove is not after_connect
+    assert not added.input_pins[0].connected
+    assert Run.plan_for(graph) is after_remove
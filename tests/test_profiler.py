@@ -0,0 +1,64 @@
+"""Profiler：每个执行节点的记录字段、汇总和Chrome trace导出（与Run的结果比较见test_runners.py）"""
+import json
+import tracemalloc
+
+from conftest import chain_workflow
+from WorkFlowEngine.Canvas.Node.RunNodes import Run
+from WorkFlowEngine.Engine import Graph, Profiler
+
+
+def run_profiled(graph, profiler=None):
+    runner = Run.from_graph(graph)
+    return runner, runner.run_node_profiled(profiler)
+
+
+def test_one_record_per_executed_step():
+    runner, profiler = run_profiled(Graph.from_data(chain_workflow(4)))
+    assert [record.step for record in profiler.records] == list(range(len(runner.plan.runs)))
+    # 停止节点之后的节点不会执行，也没有记录
+    runner, profiler = run_profiled(Graph.from_data(chain_workflow(6, stop_at=3)))
+    assert len(profiler.records) == runner.plan.order.index(4) + 1
+
+
+def test_memory_fields():
+    graph = Graph.from_data(chain_workflow(3))
+    _, profiler = run_profiled(graph, Profiler(trace_memory=True))
+    assert all(record.alloc is not None and record.alloc >= 0 for record in profiler.records)
+    assert all(record.payload > 0 for record in profiler.records)
+    assert all(record.wall >= 0 and record.cpu >= 0 for record in profiler.records)
+    # 只在执行期间开启tracemalloc
+    assert not tracemalloc.is_tracing()
+    _, profiler = run_profiled(graph, Profiler(trace_memory=False))
+    assert all(record.alloc is None for record in profiler.records)
+    assert all(item['alloc_bytes'] is None for item in profiler.summary())
+
+
+def test_summary_and_trace(tmp_path):
+    graph = Graph.from_data(chain_workflow(3))
+    profiler = Profiler(trace_memory=False)
+    run_profiled(graph, profiler)
+    run_profiled(graph, profiler)
+    summary = profiler.summary()
+    assert len(summary) == len(graph.nodes)
+    assert all(item['count'] == 2 for item in summary)
+    assert [item['wall_ms'] for item in summary] == sorted((item['wall_ms'] for item in summary), reverse=True)
+    path = tmp_path / "trace.json"
+    profiler.export_chrome_trace(str(path))
+    with open(path, encoding="utf-8") as f:
+        events = json.load(f)['traceEvents']
+    assert len(events) == 2 * len(graph.nodes)
+    assert {event['args']['run'] for event in events} == {0, 1}
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+    assert set(events[0]['args']) == {'run', 'step', 'cpu_ms', 'alloc_bytes', 'payload_bytes'}
+
+
+def test_timed_counts():
+    graph = Graph.from_data(chain_workflow(6, stop_at=3))
+    runner = Run.from_graph(graph)
+    steps = len(runner.plan.runs)
+    durations, counts = [0.0] * steps, [0] * steps
+    runner.run_node_timed(durations, counts)
+    runner.run_node_timed(durations, counts)
+    executed = runner.plan.order.index(4) + 1
+    assert counts == [2] * executed + [0] * (steps - executed)
+    assert all(duration == 0.0 for duration in durations[executed:])
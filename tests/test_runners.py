@@ -0,0 +1,101 @@
+"""所有执行引擎与顺序执行的Run结果相同
+
+每个执行引擎分别执行示例工作流和中途停止的工作流，按节点下标比较输出。
+改写执行计划的引擎（Optimizer）会跳过被折叠、删除的纯节点，只比较执行了的节点和有副作用的节点。
+新增执行引擎时在RUNNERS或OPTIMIZED_RUNNERS中加一项；各引擎自己的行为（进程池、并发、统计等）
+放在对应的测试文件中。
+"""
+import os
+
+import pytest
+
+from conftest import EXAMPLES, chain_workflow, node_outputs, stop_workflow
+from WorkFlowEngine.Canvas.Node.RunNodes import Run
+from WorkFlowEngine.Engine import AsyncRun, Graph, LoopRun, ParallelRun, fused_plan_for, optimized_plan_for
+
+
+def run_plan(runner):
+    runner.run_node()
+    return runner
+
+
+def run_profiled(graph):
+    runner = Run.from_graph(graph)
+    runner.run_node_profiled()
+    return runner
+
+
+def run_timed(graph):
+    runner = Run.from_graph(graph)
+    steps = len(runner.plan.runs)
+    runner.run_node_timed([0.0] * steps, [0] * steps)
+    return runner
+
+
+def run_loop(graph):
+    # 第二次迭代复用第一次的执行计划，结果不能受上一次迭代影响
+    loop = LoopRun(graph)
+    loop.step()
+    return loop.step()
+
+
+def run_incremental(graph):
+    # 第二次增量执行没有变化的节点，沿用上一次的输出
+    graph.run_incremental()
+    return graph.run_incremental()
+
+
+RUNNERS = {
+    "parallel": lambda graph: run_plan(ParallelRun.from_graph(graph)),
+    "async": lambda graph: run_plan(AsyncRun.from_graph(graph)),
+    "loop": run_loop,
+    "incremental": run_incremental,
+    "profiled": run_profiled,
+    "timed": run_timed,
+    "fused": lambda graph: graph.run(fuse=True),
+    "fused-parallel": lambda graph: run_plan(ParallelRun(plan=fused_plan_for(graph), max_workers=1)),
+    "fused-async": lambda graph: run_plan(AsyncRun(plan=fused_plan_for(graph))),
+    "compiled": lambda graph: graph.run(compiled=True),
+    "fused-compiled": lambda graph: graph.run(fuse=True, compiled=True),
+}
+
+OPTIMIZED_RUNNERS = {
+    "optimized": lambda graph: graph.run(optimize=True),
+    "optimized-parallel": lambda graph: run_plan(ParallelRun(plan=optimized_plan_for(graph), max_workers=1)),
+    "optimized-async": lambda graph: run_plan(AsyncRun(plan=optimized_plan_for(graph))),
+    "optimized-fused": lambda graph: graph.run(optimize=True, fuse=True),
+    "optimized-fused-parallel": lambda graph: run_plan(ParallelRun(plan=fused_plan_for(graph, True), max_workers=1)),
+    "optimized-compiled": lambda graph: graph.run(optimize=True, compiled=True),
+}
+
+WORKFLOWS = {os.path.basename(path): (lambda path=path: Graph.load(path)) for path in EXAMPLES}
+WORKFLOWS.update({
+    "stop": lambda: Graph.from_data(stop_workflow()),
+    "chain": lambda: Graph.from_data(chain_workflow(10)),
+    "chain-stop-first": lambda: Graph.from_data(chain_workflow(10, stop_at=0)),
+    "chain-stop-middle": lambda: Graph.from_data(chain_workflow(10, stop_at=4)),
+    "chain-stop-last": lambda: Graph.from_data(chain_workflow(10, stop_at=9)),
+})
+
+
+@pytest.mark.parametrize("workflow", WORKFLOWS)
+@pytest.mark.parametrize("runner", RUNNERS)
+def test_matches_run(runner, workflow):
+    graph = WORKFLOWS[workflow]()
+    expected = node_outputs(graph, graph.run())
+    assert node_outputs(graph, RUNNERS[runner](graph)) == expected
+
+
+@pytest.mark.parametrize("workflow", WORKFLOWS)
+@pytest.mark.parametrize("runner", OPTIMIZED_RUNNERS)
+def test_optimized_matches_run(runner, workflow):
+    graph = WORKFLOWS[workflow]()
+    expected = node_outputs(graph, graph.run())
+    actual = node_outputs(graph, OPTIMIZED_RUNNERS[runner](graph))
+    for key, value in expected.items():
+        if not graph.nodes[key[0]].NodeInfo.pure:
+            # 有副作用的节点（开始、打印）与Run完全相同，包括因停止而没有执行
+            assert actual[key] == value, key
+        elif actual[key] is not None:
+            # 纯节点被折叠或删除时没有输出，执行了的输出相同
+            assert actual[key] == value, key
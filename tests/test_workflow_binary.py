@@ -0,0 +1,59 @@
+"""二进制工作流格式：写入后读出的数据与JSON相同，加载后的执行结果相同"""
+import io
+import json
+
+import pytest
+
+from conftest import EXAMPLES, chain_workflow, node_outputs
+from WorkFlowEngine import WorkflowBinary
+from WorkFlowEngine.Engine import Graph
+
+
+def round_trip(workflow_data):
+    f = io.BytesIO()
+    WorkflowBinary.dump(workflow_data, f)
+    f.seek(0)
+    result = {'nodes': [], 'connections': []}
+    for kind, data in WorkflowBinary.WorkflowReader(f):
+        result['nodes' if kind == 'node' else 'connections'].append(data)
+    return result
+
+
+def test_round_trip_keeps_fields():
+    data = chain_workflow(3)
+    for node_data in data['nodes']:
+        node_data.update(x=1.5, y=-2.0)
+    result = round_trip(data)
+    assert len(result['nodes']) == len(data['nodes'])
+    for original, loaded in zip(data['nodes'], result['nodes']):
+        assert loaded['node_type'] == original['node_type']
+        assert loaded['name'] == original['name']
+        assert (loaded['x'], loaded['y']) == (1.5, -2.0)
+        # 引脚值按引脚数补齐为空字符串
+        count = len(loaded['input_pin_values'])
+        assert loaded['input_pin_values'] == (original['input_pin_values'] + [""] * count)[:count]
+    assert [(c['start_node'], c['start_pin'], c['end_node'], c['end_pin']) for c in result['connections']] == \
+        [(c['start_node'], c['start_pin'], c['end_node'], c['end_pin']) for c in data['connections']]
+
+
+def test_file_round_trip_runs_the_same(tmp_path):
+    for path in EXAMPLES:
+        target = tmp_path / "flow.wfb"
+        WorkflowBinary.convert(path, str(target))
+        back = tmp_path / "flow.json"
+        WorkflowBinary.convert(str(target), str(back))
+        with open(back, encoding='utf-8') as f:
+            assert len(json.load(f)['nodes']) == len(WorkflowBinary.read_workflow(path)['nodes'])
+        expected_graph = Graph.load(path)
+        expected = node_outputs(expected_graph, expected_graph.run())
+        for loaded_path in (target, back):
+            graph = Graph.load(str(loaded_path))
+            assert node_outputs(graph, graph.run()) == expected, (path, loaded_path)
+
+
+def test_truncated_file_is_rejected():
+    f = io.BytesIO()
+    WorkflowBinary.dump(chain_workflow(2), f)
+    truncated = io.BytesIO(f.getvalue()[:-5])
+    with pytest.raises(ValueError):
+        list(WorkflowBinary.WorkflowReader(truncated))
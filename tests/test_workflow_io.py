@@ -0,0 +1,80 @@
+"""WorkflowIO保存/导入和增量自动保存：保存后重新加载的工作流执行结果相同"""
+import json
+
+from conftest import EXAMPLES, node_outputs
+from WorkFlowEngine.Engine import Graph
+
+
+def outputs_of(path):
+    graph = Graph.load(path)
+    return node_outputs(graph, graph.run())
+
+
+def test_json_round_trip(scene, tmp_path):
+    from WorkFlowEngine.WorkflowIO import WorkflowIO
+    for path in EXAMPLES:
+        assert WorkflowIO.load_workflow(scene, path)
+        target = str(tmp_path / "flow.json")
+        assert WorkflowIO.save_workflow(scene, target)
+        assert outputs_of(target) == outputs_of(path), path
+        # 再导入一次，保存的ID保持不变
+        ids = [node.id for node in scene.nodes]
+        assert WorkflowIO.load_workflow(scene, target)
+        assert [node.id for node in scene.nodes] == ids
+
+
+def test_binary_save(scene, tmp_path):
+    from WorkFlowEngine.WorkflowIO import WorkflowIO
+    for path in EXAMPLES:
+        assert WorkflowIO.load_workflow(scene, path)
+        target = str(tmp_path / "flow.wfb")
+        assert WorkflowIO.save_workflow(scene, target)
+        assert outputs_of(target) == outputs_of(path), path
+
+
+def test_autosave_matches_full_save(scene, tmp_path):
+    from WorkFlowEngine.WorkflowIO import WorkflowAutosave, WorkflowIO
+    assert WorkflowIO.load_workflow(scene, EXAMPLES[0])
+    autosave = WorkflowAutosave(scene, str(tmp_path / "flow.autosave.json"))
+    assert autosave.save()
+    # 没有变化时不写文件
+    assert not autosave.save()
+    node = scene.nodes[0]
+    pin = next(pin for pin in node.input_pins if pin.editor == 'line_edit')
+    pin.set_value("5")
+    assert autosave.save()
+    full = str(tmp_path / "flow.json")
+    assert WorkflowIO.save_workflow(scene, full)
+    with open(autosave.file_path, encoding='utf-8') as f:
+        saved = json.load(f)
+    with open(full, encoding='utf-8') as f:
+        assert saved == json.load(f)
+
+
+def test_autosave_after_rename(scene, tmp_path):
+    from WorkFlowEngine.WorkflowIO import WorkflowAutosave, WorkflowIO
+    assert WorkflowIO.load_workflow(scene, EXAMPLES[0])
+    autosave = WorkflowAutosave(scene, str(tmp_path / "flow.autosave.json"))
+    assert autosave.save()
+    scene.nodes[0].rename("renamed")
+    assert autosave.save()
+    with open(autosave.file_path, encoding='utf-8') as f:
+        assert json.load(f)['nodes'][0]['name'] == "renamed"
+
+
+def test_failed_load_leaves_no_index_entries(scene, tmp_path):
+    from WorkFlowEngine.WorkflowIO import WorkflowIO
+    with open(EXAMPLES[0], encoding="utf-8") as f:
+        data = json.load(f)
+    # 已有节点之后出现不存在的节点类型，导入在中途失败
+    data['nodes'].append(dict(data['nodes'][0], node_type="NoSuchNode"))
+    path = str(tmp_path / "broken.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    assert WorkflowIO.load_workflow(scene, EXAMPLES[0])
+    assert not WorkflowIO.load_workflow(scene, path)
+    assert scene.nodes == [] and scene.connections == []
+    assert scene.index.nodes == {} and scene.index.pins == {} and scene.index.connections == {}
+    # 之后再导入，索引与场景中的节点一致
+    assert WorkflowIO.load_workflow(scene, EXAMPLES[0])
+    assert sorted(scene.index.nodes) == sorted(node.id for node in scene.nodes)